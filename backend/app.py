@@ -1,11 +1,30 @@
-from flask import Flask, request, jsonify
+from flask import Flask, request, jsonify, Response, stream_with_context
 from flask_cors import CORS
 import os
-import tempfile
+import io
+import gc
+import mmap
 import logging
 import re
 import json
+import itertools
+import threading
+import multiprocessing
+import unicodedata
+import zipfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from werkzeug.exceptions import HTTPException, BadRequest, RequestEntityTooLarge, UnsupportedMediaType
+try:
+    from re import _parser as sre_parse, _constants as sre_constants
+except ImportError:  # Python < 3.11
+    import sre_parse
+    import sre_constants
 from datetime import datetime
+from regex_guard import RegexGuard
+from cv_cache import LRUCache, content_hash
+from ingest import IntakeRequest, UPLOAD_KINDS, SNIFF_BYTES, check_magic, check_docx, document_stream
+from docx_stream import read_docx_form, FormGrid
 
 # Import CV processing libraries
 try:
@@ -14,14 +33,297 @@ try:
 except ImportError as e:
     print(f"Warning: Some libraries not available: {e}")
 
+class UploadRequest(IntakeRequest):
+    # The batch route streams one error line per rejected file instead of failing the request
+    per_file_endpoints = ('process_cv_batch',)
+
 app = Flask(__name__)
+app.request_class = UploadRequest  # Parse uploads from memory, checking type and size as they arrive
+app.config['MAX_CONTENT_LENGTH'] = int(os.environ.get('MAX_UPLOAD_MB', 50)) * 1024 * 1024
 CORS(app)
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+class PatternRegistry:
+    """Compiled regex rules, built once per processor instead of per request"""
+    def __init__(self):
+        self._compiled = {}
+        self._groups = {}
+
+    def compile(self, pattern, flags=0):
+        key = (pattern, flags)
+        rule = self._compiled.get(key)
+        if rule is None:
+            rule = re.compile(pattern, flags)
+            self._compiled[key] = rule
+        return rule
+
+    def register(self, name, patterns, flags=0):
+        self._groups[name] = [self.compile(pattern, flags) for pattern in patterns]
+        return self._groups[name]
+
+    def get(self, name):
+        return self._groups.get(name, [])
+
+    def __len__(self):
+        return len(self._compiled)
+
+    def __iter__(self):
+        return iter(self._compiled.values())
+
+    def fingerprint(self):
+        """Hash of every compiled pattern and group order; changes whenever a rule does"""
+        groups = sorted((name, [(rule.pattern, rule.flags) for rule in rules]) for name, rules in self._groups.items())
+        return content_hash(json.dumps([sorted(self._compiled), groups], ensure_ascii=False))
+
+def match_value(match):
+    """Captured value of a match; patterns without a group yield the whole match"""
+    return (match.group(1) if match.groups() else match.group(0)).strip()
+
+def build_shadow_table(limit=0x1F00):
+    """Map each lowercase letter to its base letter without Vietnamese diacritics (ệ -> e, đ -> d)"""
+    table = []
+    for code in range(limit):
+        char = chr(code)
+        decomposed = unicodedata.normalize('NFD', char)
+        if code >= 0x80 and decomposed[0].isascii() and decomposed[0].isalpha():
+            table.append(decomposed[0].lower())
+        else:
+            table.append(char)
+    table[ord('đ')] = table[ord('Đ')] = 'd'
+    # A str table is indexed in C; characters past its end raise IndexError and stay unchanged
+    return ''.join(table)
+
+class ShadowText:
+    """Case- and diacritic-folded copy of a document, used for matching.
+
+    The document is NFC-normalized first. Folding then maps every character
+    to exactly one character, so the offset map from shadow to original is
+    the identity: a match on the shadow is returned by slicing the same
+    span of the normalized original.
+    """
+    # Characters that re.IGNORECASE folds onto ASCII letters but str.lower() does not
+    CASE_FOLDS = (('İ', 'i'), ('ı', 'i'), ('ſ', 's'))
+    TABLE = build_shadow_table()
+
+    def __init__(self, text, label_index=None):
+        self.original = unicodedata.normalize('NFC', text)
+        self.text = self.fold(self.original)
+        self.labels = label_index.locate(self.text) if label_index else None
+
+    @classmethod
+    def fold(cls, text):
+        for char, replacement in cls.CASE_FOLDS:
+            if char in text:
+                text = text.replace(char, replacement)
+        return text.lower().translate(cls.TABLE)
+
+class FieldScanner:
+    """Resolve every regex field from one anchor index over the text.
+
+    Most field patterns start with a literal label ("ngày sinh", "email",
+    "giới tính", ...), and most of the others reach a literal within a few
+    characters ("/" after a one- or two-digit month, "84" or "0" after an
+    optional "+", "đại học" after one separator). Those literals and the
+    most characters that can precede them (the slack) are collected once
+    per pattern set and folded like the shadow text; per document each
+    anchor is located once in the shadow, so a pattern only runs from its
+    first anchor minus its slack and is skipped outright when none of its
+    anchors occur. Patterns with no literal at a bounded distance from the
+    start (the generic email pattern, the loosest experience fallback)
+    still search the whole text. Patterns are still tried in priority order
+    with finditer, so results are unchanged.
+    """
+    # Farther than this from the start of a match, a literal is not worth anchoring on
+    MAX_SLACK = 16
+
+    def __init__(self, field_rules):
+        self.field_rules = {field: rules for field, rules in field_rules.items() if rules}
+        self.anchors = {
+            field: [self.literal_anchors(rule) for rule in rules]
+            for field, rules in self.field_rules.items()
+        }
+
+    @classmethod
+    def literal_anchors(cls, rule):
+        """(literals, slack): every match has one of the literals at most `slack` characters after its start; or None"""
+        def sequence_prefixes(items):
+            prefixes = ['']
+            for op, av in items:
+                if op is sre_constants.LITERAL:
+                    prefixes = [prefix + chr(av) for prefix in prefixes]
+                    continue
+                if op is sre_constants.AT and prefixes == ['']:
+                    continue
+                if op is sre_constants.SUBPATTERN:
+                    inner = sequence_prefixes(av[-1])
+                    if inner:
+                        prefixes = [prefix + tail for prefix in prefixes for tail in inner]
+                elif op is sre_constants.BRANCH:
+                    branches = [sequence_prefixes(branch) for branch in av[1]]
+                    if all(branches):
+                        prefixes = [prefix + tail for prefix in prefixes for branch in branches for tail in branch]
+                break
+            return prefixes if all(prefixes) else None
+
+        try:
+            parsed = sre_parse.parse(rule.pattern, rule.flags)
+        except Exception:
+            return None
+        items = list(parsed.data)
+        slack = 0
+        while items:
+            op, av = items[0]
+            if op is sre_constants.SUBPATTERN:
+                # A group only groups; its contents lead the sequence
+                items = list(av[-1]) + items[1:]
+                continue
+            prefixes = sequence_prefixes(items)
+            if prefixes:
+                # Folding only merges spellings, so the folded anchors still cover every match
+                return [ShadowText.fold(prefix) for prefix in prefixes], slack
+            # Not a literal: step over it if it is short enough
+            slack += sre_parse.SubPattern(parsed.state, items[:1]).getwidth()[1]
+            if slack > cls.MAX_SLACK:
+                return None
+            items = items[1:]
+        return None
+
+    def scan(self, shadow, budget, skip=()):
+        text = shadow.original
+        offsets = {}
+
+        def first_offset(anchors):
+            found = []
+            for anchor in anchors:
+                if anchor not in offsets:
+                    offsets[anchor] = shadow.text.find(anchor)
+                if offsets[anchor] >= 0:
+                    found.append(offsets[anchor])
+            return min(found) if found else -1
+
+        results = {}
+        for field_name, rules in self.field_rules.items():
+            if field_name in skip:
+                continue
+            for rule, anchor in zip(rules, self.anchors[field_name]):
+                start = 0
+                if anchor:
+                    literals, slack = anchor
+                    start = first_offset(literals)
+                    if start < 0:
+                        continue
+                    start = max(0, start - slack)
+                for match in budget.finditer(rule, text, start):
+                    value = match_value(match)
+                    if value and len(value) > 1:
+                        results[field_name] = value
+                        break
+                if field_name in results:
+                    break
+        return results
+
+class LabelIndex:
+    """Compiled form-label locators.
+
+    Labels are matched on the shadow text with optional whitespace between
+    letters, because PDF extraction often joins or splits words. The offsets
+    found are therefore a superset of where the section patterns can anchor,
+    so a pattern whose labels are absent can be skipped and the others can
+    run inside the window the labels delimit.
+    """
+    def __init__(self, labels):
+        self.label_rules = {}
+        for key, variants in labels.items():
+            letters = [[char for char in ShadowText.fold(variant) if not char.isspace()] for variant in variants]
+            forward = '|'.join(r'\s*'.join(map(re.escape, chars)) for chars in letters)
+            backward = '|'.join(r'\s*'.join(map(re.escape, reversed(chars))) for chars in letters)
+            self.label_rules[key] = (re.compile(forward), re.compile(backward))
+
+    def locate(self, shadow_text):
+        return LabelOffsets(self.label_rules, shadow_text)
+
+class LabelOffsets:
+    """First and last offsets of each form label in one document.
+
+    Each label keeps its own literal-led pattern so re can skip ahead on the
+    first character; the last occurrence is found by searching the reversed
+    text. Results are computed on demand and cached for the document.
+    """
+    def __init__(self, label_rules, shadow_text):
+        self.label_rules = label_rules
+        self.folded = shadow_text
+        self._reversed = None
+        self._first = {}
+        self._last = {}
+
+    def first(self, key):
+        if key not in self._first:
+            match = self.label_rules[key][0].search(self.folded)
+            self._first[key] = match.span() if match else None
+        return self._first[key]
+
+    def last(self, key):
+        if key not in self._last:
+            if self._reversed is None:
+                self._reversed = self.folded[::-1]
+            match = self.label_rules[key][1].search(self._reversed)
+            size = len(self.folded)
+            self._last[key] = (size - match.end(), size - match.start()) if match else None
+        return self._last[key]
+
+    def window(self, opening, closing):
+        """Span from the first opening label to the end of the last closing label after it"""
+        first_opening = self.first(opening)
+        last_closing = self.last(closing) if first_opening else None
+        if not last_closing or last_closing[0] < first_opening[1]:
+            return None
+        return first_opening[0], last_closing[1]
+
+def extract_pdf_page_range(source, start, stop):
+    """Extract pages [start, stop) in a pool process from a path (memory-mapped) or raw bytes"""
+    if isinstance(source, str):
+        with open(source, 'rb') as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            pdf_reader = PyPDF2.PdfReader(mapped)
+            return [pdf_reader.pages[index].extract_text() + "\n" for index in range(start, stop)]
+    pdf_reader = PyPDF2.PdfReader(io.BytesIO(source))
+    return [pdf_reader.pages[index].extract_text() + "\n" for index in range(start, stop)]
+
+# Pool processes come from a forkserver (a clean, single-threaded process) instead of
+# being forked from a gthread worker, which would inherit any lock another thread holds
+POOL_CONTEXT = multiprocessing.get_context('forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn')
+
+# Long PDFs are split into page ranges across a process pool; created on first use
+PDF_WORKERS = int(os.environ.get('PDF_WORKERS', os.cpu_count() or 1))
+pdf_page_pool = None
+pdf_page_pool_lock = threading.Lock()
+
+def get_pdf_page_pool():
+    global pdf_page_pool
+    with pdf_page_pool_lock:
+        if pdf_page_pool is None:
+            pdf_page_pool = ProcessPoolExecutor(max_workers=PDF_WORKERS, mp_context=POOL_CONTEXT)
+        return pdf_page_pool
+
+def reset_pdf_page_pool(broken_pool):
+    """Drop a page pool whose worker died so the next long PDF starts a fresh one"""
+    global pdf_page_pool
+    with pdf_page_pool_lock:
+        if pdf_page_pool is broken_pool:
+            pdf_page_pool = None
+    broken_pool.shutdown(wait=False, cancel_futures=True)
+
 class SimpleCVProcessor:
+    # Bump when text extraction or match post-processing changes, so cached results are not reused
+    TEXT_REVISION = 2
+    RULES_REVISION = 1
+
+    # Page-wise PDF reading stops once every requested field reaches this confidence
+    EARLY_STOP_CONFIDENCE = float(os.environ.get('PDF_EARLY_STOP_CONFIDENCE', 0.8))
+    MAX_PDF_PAGES = int(os.environ.get('PDF_MAX_PAGES', 0)) or None
+
     def __init__(self):
         self.field_patterns = {
             'name': [
@@ -99,63 +401,327 @@ class SimpleCVProcessor:
                 r'Vị\s*trí\s*ứng\s*tuyển[\s\S]*?Nơi\s*làm\s*việc([\s\S]*?)(?:I\.\s*THÔNG\s*TIN|$)'
             ]
         }
+
+        # Matched against the shadow text, which folds case and diacritics,
+        # so one pattern covers "Họ và tên", "HO VA TEN", "hova ten", ...
+        self.name_section_patterns = [
+            # Between "Họ và tên (chữ in hoa)" and "Ngày sinh"
+            r'ho\s*va\s*ten\s*\([^)]*\)([\s\S]*?)ngay\s*sinh',
+            r'ho\s*va\s*ten([\s\S]*?)ngay\s*sinh',
+        ]
+
+        # Name fallback: general patterns
+        self.name_fallback_patterns = [
+            r'(?:họ\s*(?:và\s*)?tên|tên|name)\s*:?\s*([^\n\r]{2,50})',
+            r'([A-ZÁÀẢÃẠĂẮẰẲẴẶÂẤẦẨẪẬÉÈẺẼẸÊẾỀỂỄỆÍÌỈĨỊÓÒỎÕỌÔỐỒỔỖỘƠỚỜỞỠỢÚÙỦŨỤƯỨỪỬỮỰÝỲỶỸỴĐ]+\s+[A-ZÁÀẢÃẠĂẮẰẲẴẶÂẤẦẨẪẬÉÈẺẼẸÊẾỀỂỄỆÍÌỈĨỊÓÒỎÕỌÔỐỒỔỖỘƠỚỜỞỠỢÚÙỦŨỤƯỨỪỬỮỰÝỲỶỸỴĐ]+\s+[A-ZÁÀẢÃẠĂẮẰẲẴẶÂẤẦẨẪẬÉÈẺẼẸÊẾỀỂỄỆÍÌỈĨỊÓÒỎÕỌÔỐỒỔỖỘƠỚỜỞỠỢÚÙỦŨỤƯỨỪỬỮỰÝỲỶỸỴĐ]+)'
+        ]
+
+        # Properly formatted names, tried before splitting joined text
+        self.name_format_patterns = [
+            # Pattern for full Vietnamese names (3 words)
+            r'([A-ZÁÀẢÃẠĂẮẰẲẴẶÂẤẦẨẪẬÉÈẺẼẸÊẾỀỂỄỆÍÌỈĨỊÓÒỎÕỌÔỐỒỔỖỘƠỚỜỞỠỢÚÙỦŨỤƯỨỪỬỮỰÝỲỶỸỴĐ]{2,}\s+[A-ZÁÀẢÃẠĂẮẰẲẴẶÂẤẦẨẪẬÉÈẺẼẸÊẾỀỂỄỆÍÌỈĨỊÓÒỎÕỌÔỐỒỔỖỘƠỚỜỞỠỢÚÙỦŨỤƯỨỪỬỮỰÝỲỶỸỴĐ]{2,}\s+[A-ZÁÀẢÃẠĂẮẰẲẴẶÂẤẦẨẪẬÉÈẺẼẸÊẾỀỂỄỆÍÌỈĨỊÓÒỎÕỌÔỐỒỔỖỘƠỚỜỞỠỢÚÙỦŨỤƯỨỪỬỮỰÝỲỶỸỴĐ]{2,})',
+            # Pattern for 2-word names
+            r'([A-ZÁÀẢÃẠĂẮẰẲẴẶÂẤẦẨẪẬÉÈẺẼẸÊẾỀỂỄỆÍÌỈĨỊÓÒỎÕỌÔỐỒỔỖỘƠỚỜỞỠỢÚÙỦŨỤƯỨỪỬỮỰÝỲỶỸỴĐ]{2,}\s+[A-ZÁÀẢÃẠĂẮẰẲẴẶÂẤẦẨẪẬÉÈẺẼẸÊẾỀỂỄỆÍÌỈĨỊÓÒỎÕỌÔỐỒỔỖỘƠỚỜỞỠỢÚÙỦŨỤƯỨỪỬỮỰÝỲỶỸỴĐ]{2,})',
+            # Mixed case pattern
+            r'([A-Za-zÀ-ỹ]{2,}\s+[A-Za-zÀ-ỹ]{2,}\s+[A-Za-zÀ-ỹ]{2,})',
+            r'([A-Za-zÀ-ỹ]{2,}\s+[A-Za-zÀ-ỹ]{2,})'
+        ]
+
+        # Applied position: between markers, matched against the shadow text
+        self.position_section_patterns = [
+            # "Mã số Vị trí ứng tuyển Nơi làm việc ... I. THÔNG TIN BẢN THÂN", spaced or joined
+            r'ma\s*so\s*vi\s*tri\s*ung\s*tuyen\s*noi\s*lam\s*viec\s*([\s\S]*?)(?:i\.?\s*thong\s*tin\s*ban\s*than|thong\s*tin\s*ban\s*than|$)',
+            # Table format: "Vị trí ứng tuyển\n\nNơi làm việc\n\n\n\nMarketing\n\n\n\nTổ chức nhân sự\n\n\n\nTHÔNG TIN BẢN THÂN"
+            r'vi\s*tri\s*ung\s*tuyen\s*noi\s*lam\s*viec([\s\S]*?)(?:i\.\s*thong\s*tin\s*ban\s*than|thong\s*tin\s*ban\s*than|i\.\s*thong\s*tin|$)',
+            # Standard and joined formats with anything between the two labels
+            r'vi\s*tri\s*ung\s*tuyen[\s\S]*?noi?\s*lam\s*viec([\s\S]*?)(?:i\.?\s*thong\s*tin\s*ban\s*than|thong\s*tin\s*ban\s*than|i\.\s*thong\s*tin|$)',
+        ]
+
+        # Labels each section pattern needs: (opening label, label that must follow it)
+        self.position_section_labels = [('code', 'workplace')] + [('position', 'workplace')] * 2
+
+        # Form labels that delimit the name and applied-position sections
+        self.form_labels = {
+            'code': ['ma so'],
+            'position': ['vi tri ung tuyen'],
+            'workplace': ['noi lam viec', 'no lam viec'],
+            'name': ['ho va ten'],
+            'dob': ['ngay sinh'],
+        }
+
+        # DOCX forms: label cells (folded, punctuation and parentheses removed) whose
+        # neighbouring cell holds a field's value. Applied position joins the values
+        # of both groups, as the section patterns do with the flattened text.
+        self.grid_labels = {
+            'name': [['ho va ten', 'ho ten']],
+            'dob': [['ngay sinh']],
+            'email': [['email', 'e mail']],
+            'phone': [['dien thoai', 'so dien thoai', 'di dong']],
+            'appliedPosition': [['vi tri ung tuyen'], ['noi lam viec', 'no lam viec']],
+        }
+
+        # Applied position fallback: position patterns anywhere in text
+        self.position_fallback_patterns = [
+            r'(?:vị\s*trí\s*ứng\s*tuyển|ứng\s*tuyển\s*vị\s*trí)\s*:?\s*([^\n\r]{5,200})',
+            r'(?:applying\s*for|position\s*applied)\s*:?\s*([^\n\r]{5,200})'
+        ]
+
+        # Common header/footer words removed from position content (very conservative)
+        self.position_skip_patterns = [
+            r'\bmã\s*số\b',
+            r'\bhộ\s*khẩu\s*thường\s*trú\b',
+            r'\bnơi\s*ở\s*hiện\s*tại\b',
+            r'\bthông\s*tin\s*người\s*liên\s*hệ\b',
+            r'\btình\s*trạng\s*hôn\s*nhân\b',
+            r'\bsức\s*khỏe\b',
+            r'\bchiều\s*cao\b',
+            r'\bcân\s*nặng\b'
+        ]
+
+        # Common position-related words that might be joined
+        self.position_word_mappings = {
+            'marketing': 'Marketing',
+            'Marketing': 'Marketing',
+            'MARKETING': 'Marketing',
+            'tổchứcnhânsự': 'Tổ chức nhân sự',
+            'Tổchứcnhânsự': 'Tổ chức nhân sự', 
+            'TỔCHỨCNHÂNSỰ': 'Tổ chức nhân sự',
+            'tochucnhansu': 'Tổ chức nhân sự',
+            'TOCHUCNHANSU': 'Tổ chức nhân sự',
+            'nhânsự': 'nhân sự',
+            'nhansu': 'nhân sự',
+            'NHANSU': 'nhân sự',
+            'kếtoán': 'kế toán',
+            'ketoan': 'kế toán',
+            'KETOAN': 'kế toán',
+            'kinhdoanh': 'kinh doanh',
+            'KINHDOANH': 'kinh doanh'
+        }
+
+        # Compile every rule once; the hot paths below only use compiled patterns
+        # PDFs with at least this many pages are extracted in parallel (0 disables)
+        self.pdf_parallel_min_pages = int(os.environ.get('PDF_PARALLEL_MIN_PAGES', 16))
+        self.rules = PatternRegistry()
+        self.regex_guard = RegexGuard()
+        self.compile_rules()
+
+    def compile_rules(self):
+        """Compile all extraction patterns with the flags each hot path uses"""
+        rules = self.rules
+        for field_name, patterns in self.field_patterns.items():
+            rules.register(f'field:{field_name}', patterns, re.IGNORECASE | re.MULTILINE)
+        rules.register('name:section', self.name_section_patterns, re.MULTILINE | re.DOTALL)
+        rules.register('name:fallback', self.name_fallback_patterns, re.IGNORECASE | re.MULTILINE)
+        rules.register('name:format', self.name_format_patterns)
+        rules.register('position:section', self.position_section_patterns, re.MULTILINE | re.DOTALL)
+        rules.register('position:fallback', self.position_fallback_patterns, re.IGNORECASE | re.MULTILINE)
+        rules.register('position:skip', self.position_skip_patterns, re.IGNORECASE)
+        self.position_word_rules = [
+            (rules.compile(re.escape(joined), re.IGNORECASE), separated)
+            for joined, separated in self.position_word_mappings.items()
+        ]
+        self.whitespace_rule = rules.compile(r'\s+')
+        self.newline_rule = rules.compile(r'[\n\r]+')
+        self.edge_non_word_rule = rules.compile(r'^\W+|\W+$')
+        self.edge_separator_rule = rules.compile(r'^[:\-\s]+|[:\-\s]+$')
+        self.leading_punct_rule = rules.compile(r'^[:\-\s\.,;]+')
+        self.trailing_punct_rule = rules.compile(r'[:\-\s\.,;]+$')
+        self.standalone_number_rule = rules.compile(r'\b\d{1,10}\b(?!\w)')
+        self.letter_rule = rules.compile(r'[A-Za-zÀ-ỹ]')
+
+        # Name and applied position have dedicated extractors; every other field
+        # is resolved by one pass of the scanner
+        self.label_index = LabelIndex(self.form_labels)
+        self.scanner = FieldScanner({
+            field_name: rules.get(f'field:{field_name}')
+            for field_name in self.field_patterns
+            if field_name not in ('name', 'appliedPosition')
+        })
+
+        # Cached fields are keyed by this version, so changing a pattern only
+        # invalidates field results and never the (expensive) extracted text
+        self.rules_version = content_hash(json.dumps([
+            self.RULES_REVISION,
+            rules.fingerprint(),
+            self.form_labels,
+            self.grid_labels,
+            self.position_section_labels,
+            self.position_word_mappings
+        ], ensure_ascii=False))[:16]
+
+        cache_dir = os.environ.get('CV_CACHE_DIR')
+        disk_max_bytes = int(os.environ.get('CV_CACHE_DISK_MB', 512)) * 1024 * 1024
+        self.text_cache = LRUCache('text', int(os.environ.get('CV_CACHE_TEXT_MB', 64)) * 1024 * 1024, cache_dir, disk_max_bytes)
+        self.field_cache = LRUCache('fields', int(os.environ.get('CV_CACHE_FIELDS_MB', 16)) * 1024 * 1024, cache_dir, disk_max_bytes)
     
-    def extract_text_from_docx(self, file_path):
+    def precompile(self):
+        """Build the regex guard's engine patterns now rather than on first match"""
+        for rule in self.rules:
+            self.regex_guard.compile(rule)
+
+    def extract_text_from_docx(self, source):
+        """Extract DOCX text from a path, bytes or stream"""
+        return self.extract_docx_form(source)[0]
+
+    def extract_docx_form(self, source):
+        """Text and table cells of a DOCX in one streaming pass; docx2txt only if the body has no text"""
         try:
-            return docx2txt.process(file_path)
+            text, tables = read_docx_form(source)
+            if text.strip():
+                return text, tables
+            with document_stream(source) as stream:
+                return docx2txt.process(stream), []
         except Exception as e:
             logger.error(f"Error extracting DOCX: {e}")
-            return ""
+            return "", []
+
+    def form_grid(self, tables):
+        labels = [key for groups in self.grid_labels.values() for keys in groups for key in keys]
+        return FormGrid(tables, lambda text: ShadowText.fold(unicodedata.normalize('NFC', text)), labels)
+
+    def extract_grid_fields(self, grid, budget):
+        """Fields read straight from the label cells of a DOCX form"""
+        fields = {}
+        for field_name, groups in self.grid_labels.items():
+            values = [grid.value(keys) for keys in groups]
+            values = [value for value in values if value]
+            if not values:
+                continue
+            value = ' '.join(values)
+            if field_name == 'name':
+                value, confidence = self.clean_extracted_name(value), 0.9
+            elif field_name == 'appliedPosition':
+                value, confidence = self.process_applied_position_content(value), 0.95
+            else:
+                # The cell must still look like the field, e.g. a date for 'dob'
+                value, confidence = next((
+                    match_value(match)
+                    for rule in self.rules.get(f'field:{field_name}')
+                    for match in budget.finditer(rule, value)
+                    if match_value(match)
+                ), ""), 0.9
+            if value:
+                fields[field_name] = (value, confidence)
+        return fields
     
-    def extract_text_from_pdf(self, file_path):
+    def iter_pdf_pages(self, pdf_reader, max_pages=None):
+        """Yield page texts one at a time, so callers can stop before parsing the rest"""
+        for page in itertools.islice(pdf_reader.pages, max_pages):
+            yield page.extract_text() + "\n"
+
+    def extract_text_from_pdf(self, source, max_pages=None):
+        """Extract PDF text from a path, bytes or stream"""
         try:
-            text = ""
-            with open(file_path, 'rb') as file:
+            with document_stream(source) as file:
                 pdf_reader = PyPDF2.PdfReader(file)
-                for page in pdf_reader.pages:
-                    text += page.extract_text() + "\n"
-            return text
+                page_count = len(pdf_reader.pages) if max_pages is None else min(max_pages, len(pdf_reader.pages))
+                if self.use_parallel_pages(page_count):
+                    return "".join(self.extract_pages_parallel(source, file, page_count))
+                return "".join(self.iter_pdf_pages(pdf_reader, max_pages))
         except Exception as e:
             logger.error(f"Error extracting PDF: {e}")
             return ""
+
+    def use_parallel_pages(self, page_count):
+        return PDF_WORKERS > 1 and 0 < self.pdf_parallel_min_pages <= page_count
+
+    def extract_pages_parallel(self, source, stream, page_count):
+        """Shard the first `page_count` pages into one contiguous range per worker and reassemble them in order"""
+        if isinstance(source, (str, os.PathLike)):
+            shared = os.fspath(source)  # Workers memory-map the file themselves
+        else:
+            stream.seek(0)
+            shared = stream.read()
+        shard_count = min(PDF_WORKERS, page_count)
+        bounds = [page_count * shard // shard_count for shard in range(shard_count + 1)]
+        pool = get_pdf_page_pool()
+        try:
+            futures = [pool.submit(extract_pdf_page_range, shared, start, stop) for start, stop in zip(bounds, bounds[1:])]
+            return [page_text for future in futures for page_text in future.result()]
+        except BrokenProcessPool as e:
+            logger.error(f"PDF page worker died, reading pages serially: {e}")
+            reset_pdf_page_pool(pool)
+            return list(self.iter_pdf_pages(PyPDF2.PdfReader(stream), page_count))
+
+    def extract_pdf_until_confident(self, source, requested_fields=None, max_pages=None):
+        """Read PDF pages one by one until every requested field is confident.
+
+        With requested fields, only the fields still below
+        EARLY_STOP_CONFIDENCE are looked for after each page, and only in
+        that page plus the one before it (so values split by a page break
+        are still found); the pages read are then extracted once in full.
+        The rest of the document is never parsed once they are all confident.
+        Returns (text, (fields, confidence, regex timeouts) or None, page info).
+        """
+        parts = []
+        extracted = None
+        try:
+            with document_stream(source) as file:
+                pdf_reader = PyPDF2.PdfReader(file)
+                total = len(pdf_reader.pages)
+                page_count = total if max_pages is None else min(max_pages, total)
+                # Without fields to wait for every page is needed, so long documents go parallel
+                pages = self.iter_pdf_pages(pdf_reader, max_pages)
+                if not requested_fields and self.use_parallel_pages(page_count):
+                    pages = self.extract_pages_parallel(source, file, page_count)
+                pending = set(requested_fields or ())
+                found = {}
+                for page_text in pages:
+                    parts.append(page_text)
+                    if not requested_fields:
+                        continue
+                    window = "".join(parts[-2:])
+                    fields, confidence = self.extract_fields(window, self.regex_guard.budget(), wanted=pending)
+                    for field_name in list(pending):
+                        if confidence[field_name] >= self.EARLY_STOP_CONFIDENCE:
+                            found[field_name] = (fields[field_name], confidence[field_name])
+                            pending.discard(field_name)
+                    if not pending:
+                        break
+            text = "".join(parts)
+            if requested_fields:
+                budget = self.regex_guard.budget()
+                fields, confidence = self.extract_fields(text, budget)
+                # A confident value from a page window beats a weaker first match over the whole text
+                for field_name, (value, score) in found.items():
+                    if confidence[field_name] < score:
+                        fields[field_name], confidence[field_name] = value, score
+                extracted = (fields, confidence, budget.events)
+        except Exception as e:
+            logger.error(f"Error extracting PDF: {e}")
+            return "", None, None
+        return text, extracted, {'read': len(parts), 'total': total}
     
-    def extract_field_value(self, text, field_name):
+    def extract_field_value(self, text, field_name, shadow=None, budget=None):
         # Special handling for applied position
         if field_name == 'appliedPosition':
-            return self.extract_applied_position(text)
+            return self.extract_applied_position(text, shadow, budget)
         
         # Special handling for name
         if field_name == 'name':
-            return self.extract_name(text)
+            return self.extract_name(text, shadow, budget)
         
-        patterns = self.field_patterns.get(field_name, [])
-        for pattern in patterns:
-            matches = re.finditer(pattern, text, re.IGNORECASE | re.MULTILINE)
-            for match in matches:
-                value = match.group(1).strip()
+        budget = budget or self.regex_guard.budget()
+        for rule in self.rules.get(f'field:{field_name}'):
+            for match in budget.finditer(rule, text):
+                value = match_value(match)
                 if value and len(value) > 1:
                     return value, 0.8
         return "", 0.0
     
-    def extract_name(self, text):
+    def extract_name(self, text, shadow=None, budget=None):
         """Extract name between 'Họ và tên (chữ in hoa)' and 'Ngày sinh'"""
         try:
-            patterns = [
-                # Pattern 1: Between "Họ và tên (chữ in hoa)" and "Ngày sinh"
-                r'(?:họ\s*và\s*tên\s*\([^)]*\))([\s\S]*?)(?:ngày\s*sinh)',
-                r'(?:họ\s*và\s*tên)([\s\S]*?)(?:ngày\s*sinh)',
-                # Pattern 2: Without diacritics (for cases with encoding issues)
-                r'(?:ho\s*va\s*ten\s*\([^)]*\))([\s\S]*?)(?:ngay\s*sinh)',
-                r'(?:ho\s*va\s*ten)([\s\S]*?)(?:ngay\s*sinh)',
-                # Pattern 3: Mixed case variations
-                r'(?:Ho\s*va\s*ten\s*\([^)]*\))([\s\S]*?)(?:Ngay\s*sinh)',
-                r'(?:HO\s*VA\s*TEN\s*\([^)]*\))([\s\S]*?)(?:NGAY\s*SINH)',
-            ]
-            
-            for pattern in patterns:
-                matches = re.finditer(pattern, text, re.IGNORECASE | re.MULTILINE | re.DOTALL)
-                for match in matches:
-                    raw_content = match.group(1).strip()
+            if shadow is None:
+                shadow = ShadowText(text, self.label_index)
+            text = shadow.original
+            budget = budget or self.regex_guard.budget()
+
+            # Section patterns only run between the name label and the last 'Ngày sinh' after it
+            window = shadow.labels.window('name', 'dob')
+            for rule in self.rules.get('name:section') if window else []:
+                for match in budget.finditer(rule, shadow.text, *window):
+                    raw_content = text[match.start(1):match.end(1)].strip()
                     
                     # Clean the extracted content
                     cleaned_name = self.clean_extracted_name(raw_content)
@@ -163,14 +729,8 @@ class SimpleCVProcessor:
                         return cleaned_name, 0.9
             
             # Fallback to general patterns
-            fallback_patterns = [
-                r'(?:họ\s*(?:và\s*)?tên|tên|name)\s*:?\s*([^\n\r]{2,50})',
-                r'([A-ZÁÀẢÃẠĂẮẰẲẴẶÂẤẦẨẪẬÉÈẺẼẸÊẾỀỂỄỆÍÌỈĨỊÓÒỎÕỌÔỐỒỔỖỘƠỚỜỞỠỢÚÙỦŨỤƯỨỪỬỮỰÝỲỶỸỴĐ]+\s+[A-ZÁÀẢÃẠĂẮẰẲẴẶÂẤẦẨẪẬÉÈẺẼẸÊẾỀỂỄỆÍÌỈĨỊÓÒỎÕỌÔỐỒỔỖỘƠỚỜỞỠỢÚÙỦŨỤƯỨỪỬỮỰÝỲỶỸỴĐ]+\s+[A-ZÁÀẢÃẠĂẮẰẲẴẶÂẤẦẨẪẬÉÈẺẼẸÊẾỀỂỄỆÍÌỈĨỊÓÒỎÕỌÔỐỒỔỖỘƠỚỜỞỠỢÚÙỦŨỤƯỨỪỬỮỰÝỲỶỸỴĐ]+)'
-            ]
-            
-            for pattern in fallback_patterns:
-                matches = re.finditer(pattern, text, re.IGNORECASE | re.MULTILINE)
-                for match in matches:
+            for rule in self.rules.get('name:fallback'):
+                for match in budget.finditer(rule, text):
                     value = match.group(1).strip()
                     cleaned_name = self.clean_extracted_name(value)
                     if cleaned_name:
@@ -188,25 +748,15 @@ class SimpleCVProcessor:
             return ""
         
         # Remove extra whitespace and newlines
-        cleaned = re.sub(r'\s+', ' ', raw_text).strip()
+        cleaned = self.whitespace_rule.sub(' ', raw_text).strip()
         
         # Remove common unwanted patterns
-        cleaned = re.sub(r'^\W+|\W+$', '', cleaned)  # Remove leading/trailing non-word chars
-        cleaned = re.sub(r'^[:\-\s]+|[:\-\s]+$', '', cleaned)  # Remove colons, dashes at start/end
+        cleaned = self.edge_non_word_rule.sub('', cleaned)  # Remove leading/trailing non-word chars
+        cleaned = self.edge_separator_rule.sub('', cleaned)  # Remove colons, dashes at start/end
         
         # First, try to find already properly formatted names
-        name_patterns = [
-            # Pattern for full Vietnamese names (3 words)
-            r'([A-ZÁÀẢÃẠĂẮẰẲẴẶÂẤẦẨẪẬÉÈẺẼẸÊẾỀỂỄỆÍÌỈĨỊÓÒỎÕỌÔỐỒỔỖỘƠỚỜỞỠỢÚÙỦŨỤƯỨỪỬỮỰÝỲỶỸỴĐ]{2,}\s+[A-ZÁÀẢÃẠĂẮẰẲẴẶÂẤẦẨẪẬÉÈẺẼẸÊẾỀỂỄỆÍÌỈĨỊÓÒỎÕỌÔỐỒỔỖỘƠỚỜỞỠỢÚÙỦŨỤƯỨỪỬỮỰÝỲỶỸỴĐ]{2,}\s+[A-ZÁÀẢÃẠĂẮẰẲẴẶÂẤẦẨẪẬÉÈẺẼẸÊẾỀỂỄỆÍÌỈĨỊÓÒỎÕỌÔỐỒỔỖỘƠỚỜỞỠỢÚÙỦŨỤƯỨỪỬỮỰÝỲỶỸỴĐ]{2,})',
-            # Pattern for 2-word names
-            r'([A-ZÁÀẢÃẠĂẮẰẲẴẶÂẤẦẨẪẬÉÈẺẼẸÊẾỀỂỄỆÍÌỈĨỊÓÒỎÕỌÔỐỒỔỖỘƠỚỜỞỠỢÚÙỦŨỤƯỨỪỬỮỰÝỲỶỸỴĐ]{2,}\s+[A-ZÁÀẢÃẠĂẮẰẲẴẶÂẤẦẨẪẬÉÈẺẼẸÊẾỀỂỄỆÍÌỈĨỊÓÒỎÕỌÔỐỒỔỖỘƠỚỜỞỠỢÚÙỦŨỤƯỨỪỬỮỰÝỲỶỸỴĐ]{2,})',
-            # Mixed case pattern
-            r'([A-Za-zÀ-ỹ]{2,}\s+[A-Za-zÀ-ỹ]{2,}\s+[A-Za-zÀ-ỹ]{2,})',
-            r'([A-Za-zÀ-ỹ]{2,}\s+[A-Za-zÀ-ỹ]{2,})'
-        ]
-        
-        for pattern in name_patterns:
-            match = re.search(pattern, cleaned)
+        for rule in self.rules.get('name:format'):
+            match = rule.search(cleaned)
             if match:
                 name = match.group(1).strip()
                 # Validate: name should be 2-50 chars, contain at least one space
@@ -230,7 +780,7 @@ class SimpleCVProcessor:
             return ""
         
         # Remove spaces first to work with joined text
-        joined_text = re.sub(r'\s+', '', text).upper()
+        joined_text = self.whitespace_rule.sub('', text).upper()
         
         # Common Vietnamese surname patterns
         vietnamese_surnames = [
@@ -319,33 +869,23 @@ class SimpleCVProcessor:
         
         return ""
     
-    def extract_applied_position(self, text):
+    def extract_applied_position(self, text, shadow=None, budget=None):
         """Extract applied position from between 'Vị trí ứng tuyển Nơi làm việc' and 'THÔNG TIN BẢN THÂN'"""
         try:
-            # Main extraction: Between markers with comprehensive format support
-            section_patterns = [
-                # Joined text format: "MãsốVịtríứngtuyểnNơilàmviệc...I.THÔNGTINBẢNTHÂN"
-                r'(?:mãsố|masố|ma\s*so)\s*(?:vịtríứngtuyển|vitriungtuyen|vị\s*trí\s*ứng\s*tuyển)\s*(?:nơilàmviệc|noilamviec|nơi\s*làm\s*việc)\s*([\s\S]*?)(?:i\.\s*(?:thôngtinbảnthân|thongtinbanthan|thông\s*tin\s*bản\s*thân)|(?:thôngtinbảnthân|thongtinbanthan|thông\s*tin\s*bản\s*thân)|$)',
-                # Single line format: "Mã số Vị trí ứng tuyển Nơi làm việc ... I. THÔNG TIN BẢN THÂN"
-                r'mã\s*số\s*vị\s*trí\s*ứng\s*tuyển\s*nơi\s*làm\s*việc\s*([\s\S]*?)(?:i\.\s*thông\s*tin\s*bản\s*thân|thông\s*tin\s*bản\s*thân|$)',
-                # Table format: "Vị trí ứng tuyển\n\nNơi làm việc\n\n\n\nMarketing\n\n\n\nTổ chức nhân sự\n\n\n\nTHÔNG TIN BẢN THÂN"
-                r'vị\s*trí\s*ứng\s*tuyển\s*(?:\n|\r\n?)*\s*nơi\s*làm\s*việc([\s\S]*?)(?:i\.\s*thông\s*tin\s*bản\s*thân|thông\s*tin\s*bản\s*thân|i\.\s*thông\s*tin|$)',
-                # Standard format with various spacing
-                r'vị\s*trí\s*ứng\s*tuyển[\s\S]*?nơi\s*làm\s*việc([\s\S]*?)(?:i\.\s*thông\s*tin\s*bản\s*thân|thông\s*tin\s*bản\s*thân|i\.\s*thông\s*tin|$)',
-                # Without diacritics (encoding issues)
-                r'vi\s*tri\s*ung\s*tuyen[\s\S]*?noi\s*lam\s*viec([\s\S]*?)(?:i\.\s*thong\s*tin\s*ban\s*than|thong\s*tin\s*ban\s*than|i\.\s*thong\s*tin|$)',
-                # Mixed case variations
-                r'Vi\s*tri\s*ung\s*tuyen[\s\S]*?Noi\s*lam\s*viec([\s\S]*?)(?:I\.\s*Thong\s*tin\s*ban\s*than|Thong\s*tin\s*ban\s*than|I\.\s*THONG\s*TIN|$)',
-                r'VI\s*TRI\s*UNG\s*TUYEN[\s\S]*?NOI\s*LAM\s*VIEC([\s\S]*?)(?:I\.\s*THONG\s*TIN\s*BAN\s*THAN|THONG\s*TIN\s*BAN\s*THAN|I\.\s*THONG\s*TIN|$)',
-                # Joined text variations  
-                r'vitriungtuyennoi?lamviec([\s\S]*?)(?:i?thongtinbanthan|$)',
-                r'VITRIUNGTUYENNOI?LAMVIEC([\s\S]*?)(?:I?THONGTINBANTHAN|$)'
-            ]
-            
-            for pattern in section_patterns:
-                match = re.search(pattern, text, re.IGNORECASE | re.MULTILINE | re.DOTALL)
+            if shadow is None:
+                shadow = ShadowText(text, self.label_index)
+            text = shadow.original
+            budget = budget or self.regex_guard.budget()
+
+            # Main extraction: Between markers with comprehensive format support.
+            # A pattern is skipped unless its opening label is followed by 'Nơi làm việc'
+            for rule, (opening, closing) in zip(self.rules.get('position:section'), self.position_section_labels):
+                window = shadow.labels.window(opening, closing)
+                if not window:
+                    continue
+                match = budget.search(rule, shadow.text, window[0])
                 if match:
-                    raw_content = match.group(1).strip()
+                    raw_content = text[match.start(1):match.end(1)].strip()
                     
                     if len(raw_content) > 3:
                         # Process the extracted content
@@ -354,14 +894,8 @@ class SimpleCVProcessor:
                             return processed_content, 0.95
             
             # Fallback: Look for position patterns anywhere in text
-            fallback_patterns = [
-                r'(?:vị\s*trí\s*ứng\s*tuyển|ứng\s*tuyển\s*vị\s*trí)\s*:?\s*([^\n\r]{5,200})',
-                r'(?:applying\s*for|position\s*applied)\s*:?\s*([^\n\r]{5,200})'
-            ]
-            
-            for pattern in fallback_patterns:
-                matches = re.finditer(pattern, text, re.IGNORECASE | re.MULTILINE)
-                for match in matches:
+            for rule in self.rules.get('position:fallback'):
+                for match in budget.finditer(rule, text):
                     content = match.group(1).strip()
                     processed_content = self.process_applied_position_content(content)
                     if processed_content:
@@ -382,42 +916,31 @@ class SimpleCVProcessor:
         logger.info(f"Raw position content: '{raw_content}'")
         
         # Convert newlines to spaces but preserve all actual content
-        content = re.sub(r'[\n\r]+', ' ', raw_content)
-        content = re.sub(r'\s+', ' ', content)  # Multiple spaces to single space
+        content = self.newline_rule.sub(' ', raw_content)
+        content = self.whitespace_rule.sub(' ', content)  # Multiple spaces to single space
         content = content.strip()
         
         # ONLY remove characters at very start/end, not in middle
-        content = re.sub(r'^[:\-\s\.,;]+', '', content)
-        content = re.sub(r'[:\-\s\.,;]+$', '', content)
+        content = self.leading_punct_rule.sub('', content)
+        content = self.trailing_punct_rule.sub('', content)
         
         # MINIMAL filtering - only remove obvious non-position elements
         # Remove standalone numbers (but keep words with numbers like "K1", "P1")
-        content = re.sub(r'\b\d{1,10}\b(?!\w)', ' ', content)
+        content = self.standalone_number_rule.sub(' ', content)
         
         # Remove common header/footer words but be very conservative
-        very_specific_skip = [
-            r'\bmã\s*số\b',
-            r'\bhộ\s*khẩu\s*thường\s*trú\b',
-            r'\bnơi\s*ở\s*hiện\s*tại\b',
-            r'\bthông\s*tin\s*người\s*liên\s*hệ\b',
-            r'\btình\s*trạng\s*hôn\s*nhân\b',
-            r'\bsức\s*khỏe\b',
-            r'\bchiều\s*cao\b',
-            r'\bcân\s*nặng\b'
-        ]
-        
-        for pattern in very_specific_skip:
-            content = re.sub(pattern, ' ', content, flags=re.IGNORECASE)
+        for rule in self.rules.get('position:skip'):
+            content = rule.sub(' ', content)
         
         # Clean up extra spaces
-        content = re.sub(r'\s+', ' ', content)
+        content = self.whitespace_rule.sub(' ', content)
         content = content.strip()
         
         # Handle joined Vietnamese words - separate them
         content = self.separate_vietnamese_words(content)
         
         # If result has reasonable content, return it
-        if len(content) >= 1 and re.search(r'[A-Za-zÀ-ỹ]', content):
+        if len(content) >= 1 and self.letter_rule.search(content):
             logger.info(f"Processed position content: '{content}'")
             return content
         
@@ -428,58 +951,107 @@ class SimpleCVProcessor:
         if not text:
             return text
             
-        # Common position-related words that might be joined
-        word_mappings = {
-            'marketing': 'Marketing',
-            'Marketing': 'Marketing',
-            'MARKETING': 'Marketing',
-            'tổchứcnhânsự': 'Tổ chức nhân sự',
-            'Tổchứcnhânsự': 'Tổ chức nhân sự', 
-            'TỔCHỨCNHÂNSỰ': 'Tổ chức nhân sự',
-            'tochucnhansu': 'Tổ chức nhân sự',
-            'TOCHUCNHANSU': 'Tổ chức nhân sự',
-            'nhânsự': 'nhân sự',
-            'nhansu': 'nhân sự',
-            'NHANSU': 'nhân sự',
-            'kếtoán': 'kế toán',
-            'ketoan': 'kế toán',
-            'KETOAN': 'kế toán',
-            'kinhdoanh': 'kinh doanh',
-            'KINHDOANH': 'kinh doanh'
-        }
-        
         result = text
-        for joined, separated in word_mappings.items():
-            result = re.sub(re.escape(joined), separated, result, flags=re.IGNORECASE)
+        for rule, separated in self.position_word_rules:
+            result = rule.sub(separated, result)
         
         return result
     
 
     
-    def process_cv(self, file_path, file_type):
-        try:
-            if file_type == 'docx':
-                raw_text = self.extract_text_from_docx(file_path)
-            elif file_type == 'pdf':
-                raw_text = self.extract_text_from_pdf(file_path)
+    def extract_fields(self, text, budget=None, tables=None, wanted=None):
+        """Extract every field, resolving the regex-only fields through the scanner.
+
+        With the `tables` of a DOCX form, fields whose label cell is found take
+        the neighbouring cell's value and the patterns are only a fallback.
+        With `wanted`, only those fields are extracted and returned.
+        """
+        shadow = ShadowText(text, self.label_index)
+        text = shadow.original
+        budget = budget or self.regex_guard.budget()
+        names = [field_name for field_name in self.field_patterns if wanted is None or field_name in wanted]
+        from_grid = self.extract_grid_fields(self.form_grid(tables), budget) if tables else {}
+        scanned = self.scanner.scan(shadow, budget, set(from_grid) | (set(self.scanner.field_rules) - set(names)))
+        fields = {}
+        confidence = {}
+        for field_name in names:
+            if field_name in from_grid:
+                fields[field_name], confidence[field_name] = from_grid[field_name]
+            elif field_name in self.scanner.field_rules:
+                value = scanned.get(field_name, "")
+                fields[field_name] = value
+                confidence[field_name] = 0.8 if value else 0.0
             else:
+                fields[field_name], confidence[field_name] = self.extract_field_value(text, field_name, shadow, budget)
+        return fields, confidence
+
+    def process_cv(self, source, file_type, requested_fields=None, max_pages=None):
+        """Process a DOCX/PDF given as a path, bytes or an upload stream.
+
+        PDFs are read page by page; reading stops after `max_pages`, or as soon
+        as every field in `requested_fields` is confident. Without requested
+        fields the whole document is read.
+        """
+        try:
+            if file_type not in ('docx', 'pdf'):
                 return {"error": "Unsupported file type"}
 
+            max_pages = max_pages or self.MAX_PDF_PAGES
+            extracted = None
+            pages = None
+            tables = []
+            with document_stream(source) as stream:
+                # Level 1: extracted text (and DOCX table cells) by upload content
+                text_key = f"{self.TEXT_REVISION}:{file_type}:{content_hash(stream)}"
+                cached_text = self.text_cache.get(text_key)
+                text_cached = cached_text is not None
+                if text_cached:
+                    raw_text, tables = cached_text['text'], cached_text['tables']
+                else:
+                    if file_type == 'docx':
+                        raw_text, tables = self.extract_docx_form(stream)
+                    else:
+                        # Files on disk go by path, so page workers can memory-map them instead of receiving a copy
+                        pdf_source = source if isinstance(source, (str, os.PathLike)) else stream
+                        raw_text, extracted, pages = self.extract_pdf_until_confident(pdf_source, requested_fields, max_pages)
+                    # Only the text of a fully read document stands for the whole upload
+                    if raw_text and (pages is None or pages['read'] == pages['total']):
+                        self.text_cache.set(text_key, {'text': raw_text, 'tables': tables})
+
             if not raw_text:
                 return {"error": "Could not extract text from file"}
 
-            extracted_data = {
-                'fields': {},
-                'confidence': {},
-                'rawContent': raw_text[:1000]
-            }
-
-            for field_name in self.field_patterns.keys():
-                value, confidence = self.extract_field_value(raw_text, field_name)
-                extracted_data['fields'][field_name] = value
-                extracted_data['confidence'][field_name] = confidence
+            # Level 2: fields by normalized text, table cells and pattern set. Extraction
+            # works on the NFC form of the text, so texts with the same NFC form share results.
+            field_key = f"{self.rules_version}:{content_hash(unicodedata.normalize('NFC', raw_text))}"
+            if tables:
+                field_key += f":{content_hash(json.dumps(tables, ensure_ascii=False))}"
+            cached = self.field_cache.get(field_key) if extracted is None else None
+            timeouts = []
+            if cached is not None:
+                fields, confidence = cached['fields'], cached['confidence']
+            else:
+                if extracted is not None:
+                    # Already extracted while reading the pages
+                    fields, confidence, timeouts = extracted
+                else:
+                    budget = self.regex_guard.budget()
+                    fields, confidence = self.extract_fields(raw_text, budget, tables)
+                    timeouts = budget.events
+                # Results cut short by the regex budget are not worth keeping
+                if not timeouts:
+                    self.field_cache.set(field_key, {'fields': fields, 'confidence': confidence})
 
-            return extracted_data
+            result = {
+                'fields': fields,
+                'confidence': confidence,
+                'rawContent': raw_text[:1000],
+                'regexTimeouts': timeouts,
+                'cached': {'text': text_cached, 'fields': cached is not None}
+            }
+            if pages is not None:
+                result['pages'] = pages
+            return result
 
         except Exception as e:
             logger.error(f"Error processing CV: {e}")
@@ -488,6 +1060,113 @@ class SimpleCVProcessor:
 # Initialize processor
 cv_processor = SimpleCVProcessor()
 
+# Batch processing: a pool of processes that each hold a warm processor.
+# The pool is created on first use so it is never forked along with a gunicorn worker.
+BATCH_WORKERS = int(os.environ.get('BATCH_WORKERS', os.cpu_count() or 1))
+BATCH_MAX_FILES = int(os.environ.get('BATCH_MAX_FILES', 500))
+SUPPORTED_EXTENSIONS = ('.docx', '.pdf')
+batch_pool = None
+batch_pool_lock = threading.Lock()
+batch_processor = None
+
+def init_batch_worker():
+    global batch_processor
+    batch_processor = SimpleCVProcessor()
+    # Batches already spread files over processes; do not nest a page pool inside them
+    batch_processor.pdf_parallel_min_pages = 0
+
+def process_batch_file(filename, data, requested_fields=None, max_pages=None):
+    """Process one uploaded CV inside a pool process"""
+    return batch_processor.process_cv(data, os.path.splitext(filename)[1].lower()[1:], requested_fields, max_pages)
+
+def get_batch_pool():
+    global batch_pool
+    with batch_pool_lock:
+        if batch_pool is None:
+            batch_pool = ProcessPoolExecutor(max_workers=BATCH_WORKERS, mp_context=POOL_CONTEXT, initializer=init_batch_worker)
+        return batch_pool
+
+def reset_batch_pool(broken_pool):
+    """Drop a pool whose worker died so the next batch starts a fresh one"""
+    global batch_pool
+    with batch_pool_lock:
+        if batch_pool is broken_pool:
+            batch_pool = None
+    broken_pool.shutdown(wait=False, cancel_futures=True)
+
+def read_batch_member(archive, info):
+    """Read one zip member as (bytes, error), refusing oversized or mislabeled files"""
+    limit = IntakeRequest.max_file_bytes
+    if info.file_size > limit:
+        return None, f"File is larger than {limit // (1024 * 1024)} MB"
+    with archive.open(info) as member:
+        # The header size can lie; never decompress more than the limit
+        data = member.read(limit + 1)
+    if len(data) > limit:
+        return None, f"File is larger than {limit // (1024 * 1024)} MB"
+    kind = UPLOAD_KINDS[os.path.splitext(info.filename)[1].lower()]
+    try:
+        check_magic(kind, data[:SNIFF_BYTES])
+        if kind == 'docx':
+            check_docx(io.BytesIO(data))
+    except UnsupportedMediaType as e:
+        return None, e.description
+    return data, None
+
+def collect_batch_files(uploads):
+    """Read uploads into (filename, bytes, error) entries, unpacking zip archives.
+
+    Files the intake already rejected (see UploadRequest) and archives that
+    are not valid zips become error entries. Zip members get the checks
+    direct uploads get while streaming in: at most UPLOAD_MAX_FILE_MB each,
+    and content matching the extension. Too many members, or more
+    decompressed data than MAX_UPLOAD_MB, rejects the whole batch before
+    anything past the limit is decompressed.
+    """
+    batch = []
+    total_bytes = 0
+    max_total = app.config['MAX_CONTENT_LENGTH']
+    for upload in uploads:
+        error = getattr(upload.stream, 'error', None)
+        if error or not upload.filename.lower().endswith('.zip'):
+            batch.append((upload.filename, None if error else upload.read(), error))
+            continue
+        try:
+            archive = zipfile.ZipFile(upload.stream)
+        except zipfile.BadZipFile:
+            batch.append((upload.filename, None, 'Invalid zip archive'))
+            continue
+        with archive:
+            # Archives often carry folders and OS metadata next to the CVs
+            members = [
+                info for info in archive.infolist()
+                if not (info.is_dir() or info.filename.startswith('__MACOSX/') or not info.filename.lower().endswith(SUPPORTED_EXTENSIONS))
+            ]
+            if len(batch) + len(members) > BATCH_MAX_FILES:
+                raise BadRequest(f'Too many files, the limit is {BATCH_MAX_FILES}')
+            for info in members:
+                if info.file_size <= IntakeRequest.max_file_bytes:
+                    total_bytes += info.file_size
+                if max_total and total_bytes > max_total:
+                    raise RequestEntityTooLarge(f"Unpacked files exceed {max_total // (1024 * 1024)} MB")
+                data, error = read_batch_member(archive, info)
+                batch.append((info.filename, data, error))
+    return batch
+
+def ndjson_line(record):
+    return json.dumps(record, ensure_ascii=False) + '\n'
+
+@app.before_request
+def intake_uploads():
+    """Parse multipart uploads before the view, so oversized or mismatched files get 413/415"""
+    if request.method == 'POST' and request.mimetype == 'multipart/form-data':
+        request.files
+
+@app.errorhandler(RequestEntityTooLarge)
+@app.errorhandler(UnsupportedMediaType)
+def rejected_upload(e):
+    return jsonify({'error': e.description}), e.code
+
 @app.route('/health', methods=['GET', 'OPTIONS'])
 def health():
     if request.method == 'OPTIONS':
@@ -495,7 +1174,12 @@ def health():
     return jsonify({
         'status': 'healthy',
         'message': 'CV Backend is running',
-        'port': os.environ.get('PORT', 5000)
+        'port': os.environ.get('PORT', 5000),
+        'cache': {
+            'rulesVersion': cv_processor.rules_version,
+            'text': cv_processor.text_cache.stats(),
+            'fields': cv_processor.field_cache.stats()
+        }
     })
 
 @app.route('/test', methods=['GET'])
@@ -518,25 +1202,70 @@ def process_cv():
         if not file.filename.lower().endswith(('.docx', '.pdf')):
             return jsonify({'error': 'Unsupported file type'}), 400
         
-        with tempfile.NamedTemporaryFile(delete=False, suffix=f".{file.filename.split('.')[-1]}") as temp_file:
-            file.save(temp_file.name)
-            temp_file_path = temp_file.name
+        # Optional: only wait for these fields, and read at most this many PDF pages
+        requested_fields = [field for field in request.form.get('fields', '').split(',') if field in cv_processor.field_patterns]
+        max_pages = request.form.get('max_pages', type=int)
         
-        try:
-            file_type = 'docx' if file.filename.lower().endswith('.docx') else 'pdf'
-            result = cv_processor.process_cv(temp_file_path, file_type)
-            return jsonify(result)
-        
-        finally:
-            try:
-                os.unlink(temp_file_path)
-            except:
-                pass
+        file_type = 'docx' if file.filename.lower().endswith('.docx') else 'pdf'
+        result = cv_processor.process_cv(file.stream, file_type, requested_fields, max_pages)
+        return jsonify(result)
                 
     except Exception as e:
         logger.error(f"Error in process_cv endpoint: {e}")
         return jsonify({'error': 'Internal server error'}), 500
 
+@app.route('/process-cv/batch', methods=['POST', 'OPTIONS'])
+def process_cv_batch():
+    """Process many CVs at once, streaming one NDJSON line per file as each finishes"""
+    if request.method == 'OPTIONS':
+        return '', 200
+
+    try:
+        uploads = [upload for upload in request.files.getlist('files') + request.files.getlist('file') if upload.filename]
+        if not uploads:
+            return jsonify({'error': 'No files uploaded'}), 400
+
+        try:
+            batch = collect_batch_files(uploads)
+        except HTTPException as e:
+            return jsonify({'error': e.description}), e.code
+
+        if not batch:
+            return jsonify({'error': 'No DOCX or PDF files found'}), 400
+        if len(batch) > BATCH_MAX_FILES:
+            return jsonify({'error': f'Too many files, the limit is {BATCH_MAX_FILES}'}), 400
+
+    except Exception as e:
+        logger.error(f"Error in process_cv_batch endpoint: {e}")
+        return jsonify({'error': 'Internal server error'}), 500
+
+    def generate():
+        pool = get_batch_pool()
+        pending = {}
+        for index, (filename, data, error) in enumerate(batch):
+            if not (error or filename.lower().endswith(SUPPORTED_EXTENSIONS)):
+                error = 'Unsupported file type'
+            if error:
+                yield ndjson_line({'index': index, 'filename': filename, 'error': error})
+                continue
+            pending[pool.submit(process_batch_file, filename, data)] = (index, filename)
+
+        for future in as_completed(pending):
+            index, filename = pending[future]
+            try:
+                result = future.result()
+            except BrokenProcessPool as e:
+                logger.error(f"Batch worker died while processing {filename}: {e}")
+                reset_batch_pool(pool)
+                result = {'error': 'Worker process failed'}
+            except Exception as e:
+                logger.error(f"Error processing {filename} in batch: {e}")
+                result = {'error': str(e)}
+            yield ndjson_line({'index': index, 'filename': filename, **result})
+
+    logger.info(f"Processing batch of {len(batch)} files")
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+
 @app.route('/verify-field', methods=['POST', 'OPTIONS'])
 def verify_field():
     if request.method == 'OPTIONS':
@@ -611,6 +1340,17 @@ def process_image():
         logger.error(f"Error in process_image endpoint: {e}")
         return jsonify({'error': 'Internal server error'}), 500
 
+def create_app():
+    """App factory for preforking servers (gunicorn --preload, see gunicorn.conf.py).
+
+    Called once in the master: compiled rules, lookup tables and label
+    indexes are finished here and frozen out of the garbage collector, so
+    forked workers share them copy-on-write instead of building their own.
+    """
+    cv_processor.precompile()
+    gc.freeze()
+    return app
+
 if __name__ == '__main__':
     port = int(os.environ.get('PORT', 5000))
     app.run(host='0.0.0.0', port=port, debug=False)
\ No newline at end of file
@@ -1,26 +1,38 @@
 from flask import Flask, request, jsonify
 from flask_cors import CORS
 import os
+import io
 import tempfile
 import logging
 from datetime import datetime
 import re
 import json
+import threading
+from regex_guard import RegexGuard
+from job_queue import JobQueue
+from ingest import SpoolingRequest, document_stream
+from docx_stream import extract_docx_text
+from ocr_engine import OCREngine
+from progressive_ocr import ProgressiveOCR
+from ocr_cache import OCRCache
+from PIL import Image
 
 # Import libraries for document processing
 try:
     import docx2txt
     import PyPDF2
-    import spacy
-    from PIL import Image
-    import easyocr
-    import io
-    import zipfile
-    import xml.etree.ElementTree as ET
 except ImportError as e:
     print(f"Warning: Some libraries not available: {e}")
 
+# Only the image path needs numpy; import it on its own so a missing document library does not unbind it
+try:
+    import numpy as np
+except ImportError as e:
+    np = None
+    print(f"Warning: numpy not available, image OCR disabled: {e}")
+
 app = Flask(__name__)
+app.request_class = SpoolingRequest  # Parse uploads from memory instead of a temp file
 CORS(app)  # Allow cross-origin requests
 
 # Configure logging
@@ -82,36 +94,42 @@ class AdvancedCVProcessor:
             ]
         }
 
-    def extract_text_from_docx(self, file_path):
-        """Extract text from DOCX file"""
+        # Document-wide patterns run through the guard so one pathological
+        # document cannot tie up a worker
+        self.regex_guard = RegexGuard()
+        self.field_rules = {
+            field: [re.compile(pattern, re.IGNORECASE | re.MULTILINE | re.DOTALL) for pattern in patterns]
+            for field, patterns in self.field_patterns.items()
+        }
+        self.applied_position_rule = re.compile(
+            r'vị\s*trí\s*ứng\s*tuyển.*?nơi\s*làm\s*việc(.*?)(?:i\.\s*thông\s*tin\s*bản\s*thân|thông\s*tin\s*bản\s*thân|kinh\s*nghiệm)',
+            re.IGNORECASE | re.DOTALL
+        )
+
+        # Image path: OCR the form header first, the rest only for missing header fields
+        self.progressive_ocr = ProgressiveOCR(available=self.field_rules)
+
+    def extract_text_from_docx(self, source):
+        """Extract text from a DOCX path, bytes or stream"""
         try:
-            # Method 1: Using docx2txt
-            text = docx2txt.process(file_path)
+            # Method 1: Streaming parse of the document body (media is never decompressed)
+            text = extract_docx_text(source)
             if text.strip():
                 return text
-            
-            # Method 2: Manual XML parsing
-            with zipfile.ZipFile(file_path, 'r') as zip_file:
-                xml_content = zip_file.read('word/document.xml')
-                root = ET.fromstring(xml_content)
-                
-                # Extract text from all text nodes
-                text_elements = []
-                for elem in root.iter():
-                    if elem.text:
-                        text_elements.append(elem.text)
-                
-                return ' '.join(text_elements)
-                
+
+            # Method 2: docx2txt, which also reads headers and footers
+            with document_stream(source) as stream:
+                return docx2txt.process(stream)
+
         except Exception as e:
             logger.error(f"Error extracting DOCX: {e}")
             return ""
 
-    def extract_text_from_pdf(self, file_path):
-        """Extract text from PDF file"""
+    def extract_text_from_pdf(self, source):
+        """Extract text from a PDF path, bytes or stream"""
         try:
             text = ""
-            with open(file_path, 'rb') as file:
+            with document_stream(source) as file:
                 pdf_reader = PyPDF2.PdfReader(file)
                 for page in pdf_reader.pages:
                     text += page.extract_text() + "\n"
@@ -120,26 +138,45 @@ class AdvancedCVProcessor:
             logger.error(f"Error extracting PDF: {e}")
             return ""
 
-    def extract_text_from_image(self, image_data):
-        """Extract text from image using OCR"""
+    def extract_text_from_image(self, image_data, stats=None):
+        """Extract text from image using OCR, header region first.
+
+        Lower regions are only read while a header field is still missing; the
+        regions read, and whether the text came from the cache, are added to
+        `stats` if given.
+        """
         try:
-            # Initialize EasyOCR reader
-            reader = easyocr.Reader(['vi', 'en'])
+            cache_key = ocr_cache.key(image_data)
+            cached = ocr_cache.get(cache_key)
+            if cached is not None:
+                if stats is not None:
+                    stats.update({'regions': cached['regions'], 'cached': True})
+                return cached['text']
+
+            if np is None:
+                logger.error("Image OCR needs numpy: pip install numpy")
+                return ""
+
+            # Convert image data to a grayscale array that can be cut into regions
+            image = np.array(Image.open(io.BytesIO(image_data)).convert('L'))
             
-            # Convert image data to PIL Image
-            image = Image.open(io.BytesIO(image_data))
-            
-            # Perform OCR
-            results = reader.readtext(image)
-            
-            # Extract text
-            text_lines = [result[1] for result in results]
-            return ' '.join(text_lines)
+            # Perform OCR on a shared, already loaded reader
+            text, _, _, regions = self.progressive_ocr.run(image, ocr_engine.readtext, self.extract_fields_for_ocr)
+            if stats is not None:
+                stats.update({'regions': regions, 'cached': False})
+            if text.strip():
+                ocr_cache.set(cache_key, {'text': text, 'regions': regions})
+            return text
             
         except Exception as e:
             logger.error(f"Error extracting text from image: {e}")
             return ""
 
+    def extract_fields_for_ocr(self, text):
+        """(fields, confidence) of partially read OCR text"""
+        result = self.process_cv(text)
+        return result['fields'], result['confidence']
+
     def clean_text(self, text):
         """Clean and normalize text"""
         # Remove extra whitespace
@@ -148,12 +185,13 @@ class AdvancedCVProcessor:
         text = re.sub(r'[^\w\s@\.\/\-():,áàảãạăắằẳẵặâấầẩẫậéèẻẽẹêếềểễệíìỉĩịóòỏõọôốồổỗộơớờởỡợúùủũụưứừửữựýỳỷỹỵđÁÀẢÃẠĂẮẰẲẴẶÂẤẦẨẪẬÉÈẺẼẸÊẾỀỂỄỆÍÌỈĨỊÓÒỎÕỌÔỐỒỔỖỘƠỚỜỞỠỢÚÙỦŨỤƯỨỪỬỮỰÝỲỶỸỴĐ]', ' ', text)
         return text.strip()
 
-    def extract_field(self, text, patterns, field_name):
+    def extract_field(self, text, rules, field_name, budget=None):
         """Extract field using multiple patterns"""
-        for i, pattern in enumerate(patterns):
-            matches = re.findall(pattern, text, re.IGNORECASE | re.MULTILINE | re.DOTALL)
-            if matches:
-                value = matches[0].strip() if isinstance(matches[0], str) else matches[0][0].strip()
+        budget = budget or self.regex_guard.budget()
+        for i, rule in enumerate(rules):
+            match = budget.search(rule, text)
+            if match:
+                value = match.group(1).strip()
                 if value and len(value) > 1:
                     confidence = self.calculate_confidence(value, field_name, i)
                     return value, confidence
@@ -179,11 +217,11 @@ class AdvancedCVProcessor:
         
         return min(base_confidence, 0.99)
 
-    def advanced_processing(self, text, results, confidence):
+    def advanced_processing(self, text, results, confidence, budget=None):
         """Advanced processing for complex fields"""
         # Special processing for applied position
         if not results.get('appliedPosition') or confidence.get('appliedPosition', 0) < 0.7:
-            special_result = self.extract_applied_position_special(text)
+            special_result = self.extract_applied_position_special(text, budget)
             if special_result[1] > confidence.get('appliedPosition', 0):
                 results['appliedPosition'] = special_result[0]
                 confidence['appliedPosition'] = special_result[1]
@@ -194,10 +232,10 @@ class AdvancedCVProcessor:
                 results['education'] = 'Đại học'
                 confidence['education'] = max(confidence.get('education', 0), 0.8)
 
-    def extract_applied_position_special(self, text):
+    def extract_applied_position_special(self, text, budget=None):
         """Special extraction for applied position between specific markers"""
-        pattern = r'vị\s*trí\s*ứng\s*tuyển.*?nơi\s*làm\s*việc(.*?)(?:i\.\s*thông\s*tin\s*bản\s*thân|thông\s*tin\s*bản\s*thân|kinh\s*nghiệm)'
-        match = re.search(pattern, text, re.IGNORECASE | re.DOTALL)
+        budget = budget or self.regex_guard.budget()
+        match = budget.search(self.applied_position_rule, text)
         
         if match:
             extracted = match.group(1).strip()
@@ -215,10 +253,11 @@ class AdvancedCVProcessor:
         
         results = {}
         confidence = {}
+        budget = self.regex_guard.budget()
         
         # Extract each field
-        for field, patterns in self.field_patterns.items():
-            value, conf = self.extract_field(cleaned_text, patterns, field)
+        for field, rules in self.field_rules.items():
+            value, conf = self.extract_field(cleaned_text, rules, field, budget)
             results[field] = value
             confidence[field] = conf
             
@@ -226,11 +265,12 @@ class AdvancedCVProcessor:
                 logger.info(f"Extracted {field}: {value} (confidence: {conf:.2f})")
 
         # Advanced processing
-        self.advanced_processing(cleaned_text, results, confidence)
+        self.advanced_processing(cleaned_text, results, confidence, budget)
         
         return {
             'fields': results,
             'confidence': confidence,
+            'regexTimeouts': budget.events,
             'rawContent': text[:2000] + '...' if len(text) > 2000 else text,
             'timestamp': datetime.now().isoformat(),
             'method': 'python_backend'
@@ -239,15 +279,80 @@ class AdvancedCVProcessor:
 # Initialize CV processor
 cv_processor = AdvancedCVProcessor()
 
+# OCR models are loaded once per process, on the first image or by create_app()
+ocr_engine = OCREngine()
+
+# Repeated uploads of the same image skip OCR entirely
+ocr_cache = OCRCache()
+
 @app.route('/health', methods=['GET'])
 def health_check():
-    """Health check endpoint"""
+    """Health check endpoint; 'ready' turns true once the OCR engine is loaded"""
     return jsonify({
         'status': 'healthy',
+        'ready': ocr_engine.ready,
+        'ocr': ocr_engine.status(),
+        'ocrCache': ocr_cache.stats(),
         'timestamp': datetime.now().isoformat(),
         'version': '1.0.0'
     })
 
+def process_document(filename, source):
+    """Extract and process an uploaded DOCX/PDF (bytes or stream); failures are returned under 'error'"""
+    filename_lower = filename.lower()
+    if not filename_lower.endswith(('.docx', '.pdf')):
+        return {'error': 'Unsupported file type'}
+
+    # Extract text based on file type
+    if filename_lower.endswith('.docx'):
+        text = cv_processor.extract_text_from_docx(source)
+    else:
+        text = cv_processor.extract_text_from_pdf(source)
+
+    if not text.strip():
+        return {'error': 'Could not extract text from file'}
+
+    # Process CV
+    return cv_processor.process_cv(text)
+
+def process_image_data(filename, data):
+    """OCR an uploaded image and process the text; failures are returned under 'error'"""
+    # Extract text using OCR
+    stats = {}
+    text = cv_processor.extract_text_from_image(data, stats)
+    
+    if not text.strip():
+        return {'error': 'Could not extract text from image'}
+
+    # Process CV
+    result = cv_processor.process_cv(text)
+    result['method'] = 'python_ocr'
+    result['ocrRegions'] = stats.get('regions')
+    result['ocrCached'] = stats.get('cached', False)
+    return result
+
+# Heavy extractions can also be queued and polled through /jobs/<id>;
+# the queue database is opened by create_app() or the first /jobs request
+job_queue = None
+job_queue_lock = threading.Lock()
+fork_hooks_registered = False
+
+def get_job_queue():
+    global job_queue
+    with job_queue_lock:
+        if job_queue is None:
+            job_queue = JobQueue(
+                os.environ.get('JOB_DB_PATH', os.path.join(tempfile.gettempdir(), 'cv_jobs_full.sqlite3')),
+                {
+                    'process-cv': lambda filename, data, params: process_document(filename, data),
+                    'process-image': lambda filename, data, params: process_image_data(filename, data)
+                }
+            )
+        return job_queue
+
+def start_job_workers():
+    get_job_queue().start()
+
 @app.route('/process-cv', methods=['POST'])
 def process_cv():
     """Process CV file"""
@@ -259,35 +364,12 @@ def process_cv():
         if file.filename == '':
             return jsonify({'error': 'No file selected'}), 400
 
-        # Create temporary file
-        with tempfile.NamedTemporaryFile(delete=False, suffix=os.path.splitext(file.filename)[1]) as temp_file:
-            file.save(temp_file.name)
-            temp_path = temp_file.name
-
-        try:
-            # Extract text based on file type
-            filename_lower = file.filename.lower()
-            
-            if filename_lower.endswith('.docx'):
-                text = cv_processor.extract_text_from_docx(temp_path)
-            elif filename_lower.endswith('.pdf'):
-                text = cv_processor.extract_text_from_pdf(temp_path)
-            else:
-                return jsonify({'error': 'Unsupported file type'}), 400
-
-            if not text.strip():
-                return jsonify({'error': 'Could not extract text from file'}), 400
-
-            # Process CV
-            result = cv_processor.process_cv(text)
-            
-            logger.info(f"Successfully processed CV: {file.filename}")
-            return jsonify(result)
-
-        finally:
-            # Clean up temporary file
-            if os.path.exists(temp_path):
-                os.unlink(temp_path)
+        result = process_document(file.filename, file.stream)
+        if 'error' in result:
+            return jsonify(result), 400
+        
+        logger.info(f"Successfully processed CV: {file.filename}")
+        return jsonify(result)
 
     except Exception as e:
         logger.error(f"Error processing CV: {e}")
@@ -304,18 +386,9 @@ def process_image():
         if image_file.filename == '':
             return jsonify({'error': 'No image selected'}), 400
 
-        # Read image data
-        image_data = image_file.read()
-        
-        # Extract text using OCR
-        text = cv_processor.extract_text_from_image(image_data)
-        
-        if not text.strip():
-            return jsonify({'error': 'Could not extract text from image'}), 400
-
-        # Process CV
-        result = cv_processor.process_cv(text)
-        result['method'] = 'python_ocr'
+        result = process_image_data(image_file.filename, image_file.read())
+        if 'error' in result:
+            return jsonify(result), 400
         
         logger.info(f"Successfully processed image: {image_file.filename}")
         return jsonify(result)
@@ -324,6 +397,47 @@ def process_image():
         logger.error(f"Error processing image: {e}")
         return jsonify({'error': str(e)}), 500
 
+@app.route('/jobs/process-cv', methods=['POST'])
+@app.route('/jobs/process-image', methods=['POST'])
+def submit_job():
+    """Queue a CV or image for background processing and return its job id"""
+    try:
+        kind = request.path.rsplit('/', 1)[-1]
+        field = 'image' if kind == 'process-image' else 'file'
+        if field not in request.files:
+            return jsonify({'error': f'No {field} provided'}), 400
+
+        upload = request.files[field]
+        if upload.filename == '':
+            return jsonify({'error': f'No {field} selected'}), 400
+        if kind == 'process-cv' and not upload.filename.lower().endswith(('.docx', '.pdf')):
+            return jsonify({'error': 'Unsupported file type'}), 400
+
+        job_id = get_job_queue().submit(kind, upload.read(), upload.filename)
+        logger.info(f"Queued {kind} job {job_id} for {upload.filename}")
+        return jsonify({
+            'jobId': job_id,
+            'status': 'queued',
+            'statusUrl': f'/jobs/{job_id}'
+        }), 202
+
+    except Exception as e:
+        logger.error(f"Error queueing job: {e}")
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/jobs/<job_id>', methods=['GET'])
+def get_job(job_id):
+    """Status of a queued job, with the result once it has finished"""
+    try:
+        job = get_job_queue().get(job_id)
+        if job is None:
+            return jsonify({'error': 'Job not found or expired'}), 404
+        return jsonify(job)
+
+    except Exception as e:
+        logger.error(f"Error reading job {job_id}: {e}")
+        return jsonify({'error': str(e)}), 500
+
 @app.route('/verify-field', methods=['POST'])
 def verify_field():
     """Verify a specific field"""
@@ -385,6 +499,25 @@ def save_cv():
         logger.error(f"Error saving CV: {e}")
         return jsonify({'error': str(e)}), 500
 
+def create_app():
+    """The app, with the OCR readers loading in the background unless OCR_WARMUP is off.
+
+    Importing this module has no side effects; servers start it through
+    here, e.g. gunicorn 'app_full:create_app()'. Job workers start here too,
+    so queued jobs left by a previous run resume without waiting for a /jobs
+    request; under gunicorn this is the master, so each forked worker starts
+    its own instead.
+    """
+    if os.environ.get('OCR_WARMUP', 'true').lower() in ('1', 'true', 'yes'):
+        ocr_engine.start_warmup()
+    global fork_hooks_registered
+    if not fork_hooks_registered:
+        os.register_at_fork(after_in_child=start_job_workers)
+        fork_hooks_registered = True
+    if not os.environ.get('SERVER_SOFTWARE', '').startswith('gunicorn'):
+        start_job_workers()
+    return app
+
 if __name__ == '__main__':
     port = int(os.environ.get('PORT', 5000))
-    app.run(host='0.0.0.0', port=port, debug=False)
\ No newline at end of file
+    create_app().run(host='0.0.0.0', port=port, debug=False)
\ No newline at end of file
@@ -0,0 +1,178 @@
+"""ASGI variant of the CV API: uvicorn asgi:app
+
+Uploads are received on the event loop, so a slow client costs a coroutine
+instead of a worker thread; parsing and OCR run in bounded process pools.
+Needs the packages in requirements-asgi.txt.
+"""
+import os
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime
+
+from starlette.applications import Starlette
+from starlette.middleware import Middleware
+from starlette.middleware.cors import CORSMiddleware
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+
+# CV parsing reuses the Flask app's processor and batch pool (BATCH_WORKERS processes)
+import app as flask_backend
+
+logger = logging.getLogger(__name__)
+
+OCR_WORKERS = int(os.environ.get('ASGI_OCR_WORKERS', 1))
+# Uploads handed to the pools but not finished yet; further requests wait for a slot
+MAX_PENDING = int(os.environ.get('ASGI_MAX_PENDING', 4 * (os.cpu_count() or 1)))
+pending = None
+in_flight = 0
+ocr_pool = None
+
+def process_image_data(data):
+    """OCR one image inside an OCR pool process; the OCR engine loads once per process.
+
+    Importing app_full starts no threads and opens no job database (both wait
+    for create_app() or a /jobs request), so pool processes only build its
+    processor.
+    """
+    from app_full import process_image_data
+    return process_image_data('', data)
+
+def get_ocr_pool():
+    global ocr_pool
+    if ocr_pool is None:
+        ocr_pool = ProcessPoolExecutor(max_workers=OCR_WORKERS, mp_context=flask_backend.POOL_CONTEXT)
+    return ocr_pool
+
+def reset_ocr_pool(broken_pool):
+    global ocr_pool
+    if ocr_pool is broken_pool:
+        ocr_pool = None
+    broken_pool.shutdown(wait=False, cancel_futures=True)
+
+async def run_in_pool(get_pool, reset_pool, function, *args):
+    """Run `function` in a pool process, holding one of MAX_PENDING slots while it does"""
+    global pending, in_flight
+    if pending is None:
+        pending = asyncio.Semaphore(MAX_PENDING)
+    async with pending:
+        in_flight += 1
+        pool = get_pool()
+        try:
+            return await asyncio.get_running_loop().run_in_executor(pool, function, *args)
+        except BrokenProcessPool as e:
+            logger.error(f"Pool process died: {e}")
+            reset_pool(pool)
+            return {'error': 'Worker process failed'}
+        finally:
+            in_flight -= 1
+
+async def health(request):
+    return JSONResponse({
+        'status': 'healthy',
+        'message': 'CV Backend is running (ASGI)',
+        'port': os.environ.get('PORT', 5000),
+        'pool': {
+            'inFlight': in_flight,
+            'maxPending': MAX_PENDING,
+            'batchWorkers': flask_backend.BATCH_WORKERS,
+            'ocrWorkers': OCR_WORKERS
+        }
+    })
+
+async def process_cv(request):
+    try:
+        form = await request.form()
+        file = form.get('file')
+        if file is None or isinstance(file, str):
+            return JSONResponse({'error': 'No file uploaded'}, status_code=400)
+        if file.filename == '':
+            return JSONResponse({'error': 'No file selected'}, status_code=400)
+        if not file.filename.lower().endswith(('.docx', '.pdf')):
+            return JSONResponse({'error': 'Unsupported file type'}, status_code=400)
+
+        # Optional: only wait for these fields, and read at most this many PDF pages
+        requested_fields = [field for field in form.get('fields', '').split(',') if field in flask_backend.cv_processor.field_patterns]
+        max_pages = int(form['max_pages']) if form.get('max_pages', '').isdigit() else None
+
+        data = await file.read()
+        result = await run_in_pool(flask_backend.get_batch_pool, flask_backend.reset_batch_pool, flask_backend.process_batch_file, file.filename, data, requested_fields, max_pages)
+        return JSONResponse(result)
+
+    except Exception as e:
+        logger.error(f"Error in process_cv endpoint: {e}")
+        return JSONResponse({'error': 'Internal server error'}, status_code=500)
+
+async def process_image(request):
+    try:
+        form = await request.form()
+        image = form.get('image')
+        if image is None or isinstance(image, str):
+            return JSONResponse({'error': 'No image uploaded'}, status_code=400)
+
+        data = await image.read()
+        result = await run_in_pool(get_ocr_pool, reset_ocr_pool, process_image_data, data)
+        return JSONResponse(result, status_code=400 if 'error' in result else 200)
+
+    except Exception as e:
+        logger.error(f"Error in process_image endpoint: {e}")
+        return JSONResponse({'error': 'Internal server error'}, status_code=500)
+
+async def verify_field(request):
+    try:
+        data = await request.json()
+        field = data.get('field')
+        value = data.get('value')
+        raw_content = data.get('rawContent', '')
+
+        # Simple verification - check if value appears in raw content
+        verified = value.lower() in raw_content.lower() if value and raw_content else False
+
+        return JSONResponse({
+            'field': field,
+            'value': value,
+            'verified': verified,
+            'confidence': 0.8 if verified else 0.3
+        })
+
+    except Exception as e:
+        logger.error(f"Error in verify_field endpoint: {e}")
+        return JSONResponse({'error': 'Internal server error'}, status_code=500)
+
+async def save_cv(request):
+    try:
+        data = await request.json()
+
+        # In a real application, save to database here
+        logger.info(f"CV data received for saving: {data.get('fields', {}).get('name', 'Unknown')}")
+
+        return JSONResponse({
+            'success': True,
+            'message': 'CV data saved successfully',
+            'timestamp': datetime.now().isoformat()
+        })
+
+    except Exception as e:
+        logger.error(f"Error in save_cv endpoint: {e}")
+        return JSONResponse({'error': 'Internal server error'}, status_code=500)
+
+@asynccontextmanager
+async def lifespan(app):
+    yield
+    for pool in (flask_backend.batch_pool, ocr_pool):
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+app = Starlette(
+    routes=[
+        Route('/health', health),
+        Route('/process-cv', process_cv, methods=['POST']),
+        Route('/process-image', process_image, methods=['POST']),
+        Route('/verify-field', verify_field, methods=['POST']),
+        Route('/save-cv', save_cv, methods=['POST'])
+    ],
+    middleware=[Middleware(CORSMiddleware, allow_origins=['*'], allow_methods=['*'], allow_headers=['*'])],
+    lifespan=lifespan
+)
@@ -0,0 +1,188 @@
+"""Field extraction and long-PDF benchmark of backend/app.py.
+
+    python benchmark.py [--save-baseline FILE] [--baseline FILE] [--tolerance 0.25]
+
+--save-baseline writes the medians and p95s to FILE; --baseline compares
+the run against such a file and exits non-zero on regressions (same
+rules as microbench.py).
+"""
+import io
+import os
+import sys
+import json
+import time
+import logging
+import argparse
+import statistics
+
+import PyPDF2
+
+# Silence per-field logging so it does not dominate the timings
+logging.disable(logging.CRITICAL)
+
+# Measure uncached work; the processors below read these when they are built
+os.environ['CV_CACHE_TEXT_MB'] = '0'
+os.environ['CV_CACHE_FIELDS_MB'] = '0'
+os.environ.pop('CV_CACHE_DIR', None)
+
+import app
+from app import SimpleCVProcessor
+from microbench import compare
+
+# Benchmark configuration
+FIXTURE_PDF = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "Phạm Yến Linh.pdf")
+ITERATIONS = int(os.environ.get("BENCH_ITERATIONS", 200))
+PDF_ITERATIONS = int(os.environ.get("BENCH_PDF_ITERATIONS", 3))
+PDF_COPIES = (4, 10, 25)  # fixture repeated into 16, 40 and 100 page documents
+
+SAMPLE_CV = """
+NGUYỄN VĂN TEST
+
+Thông tin cá nhân:
+Email: test@example.com
+Điện thoại: 0987654321
+Ngày sinh: 15/05/1995
+Giới tính: Nam
+
+Học vấn: Đại học
+Trường: Đại học Bách Khoa Hà Nội
+Chuyên ngành: Công nghệ thông tin
+
+Vị trí ứng tuyển: Senior Developer
+Kinh nghiệm: 5 năm kinh nghiệm lập trình
+"""
+
+# Free-form resume without the form labels most patterns anchor on
+PLAIN_CV = """
+John Smith
+Software engineer with a background in distributed systems and data pipelines.
+Skills: Python, Go, Kubernetes, PostgreSQL, Kafka
+Projects: built an ingestion service processing millions of events per day.
+""" * 40
+
+def load_fixture_text():
+    """Extract the raw text of the fixture PDF once, outside of the timed loop"""
+    text = ""
+    with open(FIXTURE_PDF, 'rb') as file:
+        pdf_reader = PyPDF2.PdfReader(file)
+        for page in pdf_reader.pages:
+            text += page.extract_text() + "\n"
+    return text
+
+def bench(label, processor, text, iterations=ITERATIONS):
+    """Time per-CV field extraction (as run by process_cv); prints and returns latency statistics"""
+    processor.extract_fields(text)  # warm up
+
+    timings = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        processor.extract_fields(text)
+        timings.append((time.perf_counter() - start) * 1000)
+
+    timings.sort()
+    p95 = timings[min(len(timings) - 1, int(len(timings) * 0.95))]
+    print(f"  • {label:<12} median {statistics.median(timings):7.3f} ms   "
+          f"mean {statistics.mean(timings):7.3f} ms   p95 {p95:7.3f} ms")
+    return {'samples': len(timings), 'median_ms': round(statistics.median(timings), 4), 'p95_ms': round(p95, 4)}
+
+def build_long_pdf(copies):
+    """Concatenate the fixture `copies` times into one in-memory PDF"""
+    pdf_writer = PyPDF2.PdfWriter()
+    for _ in range(copies):
+        for page in PyPDF2.PdfReader(FIXTURE_PDF).pages:
+            pdf_writer.add_page(page)
+    buffer = io.BytesIO()
+    pdf_writer.write(buffer)
+    return buffer.getvalue()
+
+def bench_pdf(label, processor, data, iterations=PDF_ITERATIONS):
+    """Median wall time of full PDF text extraction"""
+    processor.extract_text_from_pdf(data)  # warm up (also starts the page pool)
+    timings = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        processor.extract_text_from_pdf(data)
+        timings.append((time.perf_counter() - start) * 1000)
+    median = statistics.median(timings)
+    print(f"  • {label:<12} median {median:9.1f} ms")
+    return {'samples': len(timings), 'median_ms': round(median, 2)}
+
+def set_pdf_workers(workers):
+    """Replace the page pool so the next extraction uses `workers` processes"""
+    if app.pdf_page_pool is not None:
+        app.pdf_page_pool.shutdown()
+    app.pdf_page_pool = None
+    app.PDF_WORKERS = workers
+
+def bench_parallel_pdf(processor, results):
+    """Serial vs. process-pool page extraction for long PDFs"""
+    cpus = os.cpu_count() or 1
+    worker_counts = [count for count in (2, 4, 8, 16) if count <= cpus] or [2]
+    print(f"📚 PDF text extraction, serial vs. parallel ({cpus} CPUs):")
+    for copies in PDF_COPIES:
+        data = build_long_pdf(copies)
+        pages = len(PyPDF2.PdfReader(io.BytesIO(data)).pages)
+        print(f"  {pages} pages, {len(data) / 1024 / 1024:.1f} MB")
+        processor.pdf_parallel_min_pages = 0
+        serial = results[f'pdf/{pages}p/serial'] = bench_pdf('serial', processor, data)
+        processor.pdf_parallel_min_pages = 1
+        for workers in worker_counts:
+            set_pdf_workers(workers)
+            parallel = results[f'pdf/{pages}p/{workers}w'] = bench_pdf(f'{workers} workers', processor, data)
+            print(f"    speedup x{serial['median_ms'] / parallel['median_ms']:.2f}")
+    set_pdf_workers(1)
+
+def main():
+    """Run the extraction latency benchmark"""
+    parser = argparse.ArgumentParser(description="Field extraction and long-PDF benchmark")
+    parser.add_argument('--save-baseline', metavar='FILE')
+    parser.add_argument('--baseline', metavar='FILE')
+    parser.add_argument('--tolerance', type=float, default=0.25, help="Allowed slowdown, as a fraction")
+    args = parser.parse_args()
+
+    print("⏱️  CV Extraction Benchmark")
+    print("=" * 40)
+    print(f"Iterations per corpus: {ITERATIONS}")
+    print()
+
+    processor = SimpleCVProcessor()
+    corpus = {'sample': SAMPLE_CV, 'plain': PLAIN_CV}
+    if os.path.exists(FIXTURE_PDF):
+        corpus['fixture_pdf'] = load_fixture_text()
+        corpus['fixture_x8'] = corpus['fixture_pdf'] * 8  # long multi-page document
+    else:
+        print(f"⚠️  Fixture not found, skipping: {FIXTURE_PDF}")
+
+    results = {}
+    print("📄 Per-CV field extraction latency:")
+    for label, text in corpus.items():
+        results[f'extract/{label}'] = bench(label, processor, text)
+
+    if os.path.exists(FIXTURE_PDF):
+        print()
+        bench_parallel_pdf(processor, results)
+
+    if args.save_baseline:
+        with open(args.save_baseline, 'w') as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+        print(f"\n💾 Baseline saved to {args.save_baseline}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        print(f"\n📊 Median vs. {args.baseline}:")
+        for key, result in results.items():
+            before = baseline.get(key)
+            if before and before['median_ms']:
+                print(f"  • {key:<24} {before['median_ms']:9.3f} -> {result['median_ms']:9.3f} ms ({(result['median_ms'] / before['median_ms'] - 1) * 100:+.0f}%)")
+        regressions = compare(results, baseline, args.tolerance)
+        if regressions:
+            print(f"\n❌ {len(regressions)} regression(s) over {args.tolerance:.0%}:")
+            for line in regressions:
+                print(f"  • {line}")
+            return 1
+        print(f"\n✅ No regressions over {args.tolerance:.0%}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
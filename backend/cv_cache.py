@@ -0,0 +1,140 @@
+import os
+import json
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+def content_hash(data):
+    """SHA-256 hex digest of bytes, text or a seekable binary stream (rewound afterwards)"""
+    if isinstance(data, str):
+        data = data.encode('utf-8')
+    if not hasattr(data, 'read'):
+        return hashlib.sha256(data).hexdigest()
+    # Checked uploads are hashed while they are received
+    if hasattr(data, 'content_sha256'):
+        return data.content_sha256
+    digest = hashlib.sha256()
+    data.seek(0)
+    for chunk in iter(lambda: data.read(1024 * 1024), b''):
+        digest.update(chunk)
+    data.seek(0)
+    return digest.hexdigest()
+
+class LRUCache:
+    """Size-capped LRU cache of JSON-serialisable values with an optional disk tier.
+
+    Values are stored serialised, so the cap is measured in encoded bytes
+    and callers always get a fresh copy back. With `disk_dir` set, every
+    value is also written there; a memory miss falls back to disk and
+    promotes the entry, and the directory is trimmed oldest-first to
+    `disk_max_bytes`.
+    """
+    def __init__(self, name, max_bytes, disk_dir=None, disk_max_bytes=0):
+        self.name = name
+        self.max_bytes = max_bytes
+        self.disk_dir = os.path.join(disk_dir, name) if disk_dir else None
+        self.disk_max_bytes = disk_max_bytes
+        self.entries = OrderedDict()
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+        self.disk_size = 0
+        if self.disk_dir:
+            os.makedirs(self.disk_dir, exist_ok=True)
+            self.disk_size = sum(size for _, size, _ in self.disk_entries())
+
+    def get(self, key):
+        with self.lock:
+            encoded = self.entries.get(key)
+            if encoded is not None:
+                self.entries.move_to_end(key)
+        if encoded is None and self.disk_dir:
+            encoded = self.read_disk(key)
+            if encoded is not None:
+                self.remember(key, encoded)
+        with self.lock:
+            if encoded is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+        return json.loads(encoded)
+
+    def set(self, key, value):
+        encoded = json.dumps(value, ensure_ascii=False).encode('utf-8')
+        self.remember(key, encoded)
+        if self.disk_dir:
+            self.write_disk(key, encoded)
+
+    def remember(self, key, encoded):
+        if len(encoded) > self.max_bytes:
+            return
+        with self.lock:
+            previous = self.entries.pop(key, None)
+            if previous is not None:
+                self.size -= len(previous)
+            self.entries[key] = encoded
+            self.size += len(encoded)
+            while self.size > self.max_bytes:
+                _, evicted = self.entries.popitem(last=False)
+                self.size -= len(evicted)
+
+    def disk_path(self, key):
+        return os.path.join(self.disk_dir, f"{content_hash(key)}.json")
+
+    def read_disk(self, key):
+        path = self.disk_path(key)
+        try:
+            with open(path, 'rb') as f:
+                encoded = f.read()
+            os.utime(path)  # Keep recently used entries last in line for trimming
+            return encoded
+        except OSError:
+            return None
+
+    def write_disk(self, key, encoded):
+        path = self.disk_path(key)
+        try:
+            temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(temp_path, 'wb') as f:
+                f.write(encoded)
+            os.replace(temp_path, path)
+            self.disk_size += len(encoded)
+            if self.disk_size > self.disk_max_bytes:
+                self.trim_disk()
+        except OSError as e:
+            logger.error(f"Error writing {self.name} cache entry: {e}")
+
+    def disk_entries(self):
+        entries = []
+        for entry in os.scandir(self.disk_dir):
+            if entry.name.endswith('.json'):
+                stat = entry.stat()
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+        return entries
+
+    def trim_disk(self):
+        # Other processes may share the directory, so recount before deleting
+        entries = self.disk_entries()
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.disk_max_bytes:
+                break
+            try:
+                os.unlink(path)
+                total -= size
+            except OSError:
+                pass
+        self.disk_size = total
+
+    def stats(self):
+        with self.lock:
+            return {
+                'entries': len(self.entries),
+                'bytes': self.size,
+                'hits': self.hits,
+                'misses': self.misses
+            }
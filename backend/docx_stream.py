@@ -0,0 +1,177 @@
+import re
+import zipfile
+import xml.etree.ElementTree as ET
+
+from ingest import document_stream
+
+W_NS = '{http://schemas.openxmlformats.org/wordprocessingml/2006/main}'
+W_T = W_NS + 't'
+W_TAB = W_NS + 'tab'
+W_BREAKS = (W_NS + 'br', W_NS + 'cr')
+W_P = W_NS + 'p'
+W_TC = W_NS + 'tc'
+W_TR = W_NS + 'tr'
+W_TBL = W_NS + 'tbl'
+W_BODY = W_NS + 'body'
+W_TCPR = W_NS + 'tcPr'
+W_GRID_SPAN = W_NS + 'gridSpan'
+W_VMERGE = W_NS + 'vMerge'
+W_VAL = W_NS + 'val'
+
+DOCUMENT_PART = 'word/document.xml'
+
+def cell_layout(tc):
+    """(column span, continues the cell above) from a finished w:tc"""
+    properties = tc.find(W_TCPR)
+    if properties is None:
+        return 1, False
+    span = properties.find(W_GRID_SPAN)
+    merge = properties.find(W_VMERGE)
+    return (
+        int(span.get(W_VAL, 1)) if span is not None else 1,
+        merge is not None and merge.get(W_VAL, 'continue') == 'continue'
+    )
+
+def iter_docx_text(stream, tables=None):
+    """Yield the text of a DOCX body piece by piece.
+
+    Only `word/document.xml` is opened, so images and other parts of the
+    package are never decompressed. The XML is parsed incrementally and
+    every finished paragraph, row and table is cleared and detached from
+    `w:body` straight away, which keeps memory flat however large the
+    document is. Paragraph and table cell ends are emitted as newlines.
+
+    If a `tables` list is given, every table is also appended to it once the
+    generator is exhausted, as rows of `[text, first column, column span,
+    continues the cell above]` cells.
+    """
+    collect = tables is not None
+    open_tables = []
+    open_cells = []
+    with zipfile.ZipFile(stream) as zip_file, zip_file.open(DOCUMENT_PART) as xml_file:
+        at_line_start = True
+        body = None
+        for event, elem in ET.iterparse(xml_file, events=('start', 'end')):
+            tag = elem.tag
+            if event == 'start':
+                if body is None and tag == W_BODY:
+                    body = elem
+                elif collect:
+                    if tag == W_TBL:
+                        open_tables.append([])
+                    elif tag == W_TR and open_tables:
+                        open_tables[-1].append([])
+                    elif tag == W_TC:
+                        open_cells.append([])
+                continue
+            if tag == W_T:
+                if elem.text:
+                    at_line_start = False
+                    if open_cells:
+                        open_cells[-1].append(elem.text)
+                    yield elem.text
+            elif tag == W_TAB:
+                at_line_start = False
+                if open_cells:
+                    open_cells[-1].append('\t')
+                yield '\t'
+            elif tag in W_BREAKS:
+                at_line_start = True
+                if open_cells:
+                    open_cells[-1].append('\n')
+                yield '\n'
+            elif tag == W_P or tag == W_TC:
+                # A cell always ends with its last paragraph's newline already
+                if tag == W_P or not at_line_start:
+                    yield '\n'
+                at_line_start = True
+                if tag == W_P and open_cells:
+                    open_cells[-1].append('\n')
+                elif tag == W_TC and open_cells:
+                    row = open_tables[-1][-1]
+                    span, continued = cell_layout(elem)
+                    column = row[-1][1] + row[-1][2] if row else 0
+                    row.append([''.join(open_cells.pop()).strip(), column, span, continued])
+                elem.clear()
+            elif tag == W_TR or tag == W_TBL:
+                if tag == W_TBL and open_tables:
+                    tables.append(open_tables.pop())
+                elem.clear()
+            else:
+                continue
+            if body is not None:
+                # The parser keeps its own reference to an open table
+                del body[:]
+
+def extract_docx_text(source):
+    """Text of a DOCX path, bytes or stream, read without building the XML tree"""
+    with document_stream(source) as stream:
+        return ''.join(iter_docx_text(stream))
+
+def read_docx_form(source):
+    """(text, tables) of a DOCX path, bytes or stream in a single streaming pass"""
+    tables = []
+    with document_stream(source) as stream:
+        text = ''.join(iter_docx_text(stream, tables))
+    return text, tables
+
+class FormGrid:
+    """Label -> value lookups over the table cells of a DOCX form.
+
+    Every short cell is indexed by its normalized label text, so finding a
+    label is one dict lookup. Its value is the text after a colon in the
+    same cell, else the next cell to the right unless that is another
+    label, else the cell below it. `fold` must map text to the same form
+    the label keys are written in and keep newlines; all candidate labels
+    are folded together in one call.
+    """
+    PARENTHESIS = re.compile(r'\([^)\n]*\)')
+    NON_WORD = re.compile(r'[^\w\n]+|_+')
+    MAX_LABEL_LENGTH = 80  # Longer cells are content, not labels, and are not indexed
+
+    def __init__(self, tables, fold, labels=()):
+        self.tables = tables
+        self.labels = set(labels)
+        self.keys = {}
+        self.index = {}
+        positions = []
+        candidates = []
+        for table_number, table in enumerate(tables):
+            for row_number, row in enumerate(table):
+                for cell_number, cell in enumerate(row):
+                    label = cell[0].partition(':')[0]
+                    if label and len(label) <= self.MAX_LABEL_LENGTH:
+                        positions.append((table_number, row_number, cell_number))
+                        candidates.append(label.replace('\n', ' '))
+        folded = self.NON_WORD.sub(' ', self.PARENTHESIS.sub(' ', fold('\n'.join(candidates))))
+        for position, key in zip(positions, folded.split('\n')):
+            key = key.strip()
+            if key:
+                self.keys[position] = key
+                self.index.setdefault(key, position)
+
+    def is_label(self, position):
+        return self.keys.get(position) in self.labels
+
+    def value(self, keys):
+        """Value for the first of `keys` present as a label cell, or None"""
+        position = next((self.index[key] for key in keys if key in self.index), None)
+        if position is None:
+            return None
+        table_number, row_number, cell_number = position
+        table = self.tables[table_number]
+        row = table[row_number]
+        inline = row[cell_number][0].partition(':')[2].strip()
+        if inline:
+            return inline
+        right = (table_number, row_number, cell_number + 1)
+        if cell_number + 1 < len(row) and row[cell_number + 1][0] and not self.is_label(right):
+            return row[cell_number + 1][0]
+        column = row[cell_number][1]
+        for below_row in table[row_number + 1:]:
+            below = next((cell for cell in below_row if cell[1] <= column < cell[1] + cell[2]), None)
+            if below is None:
+                return None
+            if not below[3]:
+                return below[0] or None
+        return None
@@ -0,0 +1,580 @@
+"""Synthetic corpus of Vietnamese application forms for scale testing.
+
+    python form_corpus.py OUT_DIR [--count 2000] [--seed 42] [--formats docx,pdf] [--font FILE.ttf]
+
+Every document follows the layout of the real application form (code /
+applied position / workplace header, "I. THÔNG TIN BẢN THÂN", name in
+capitals, date of birth, education and work history, then a variable
+number of free-text sections) and is written next to a `<name>.json`
+with its ground truth. Documents are built from `random.Random(seed, index)`
+alone and packed with fixed timestamps, so the same seed and index always
+give byte-identical files, whatever --count is.
+
+Variation per document: names and contact data, how many jobs, bullets
+and essay paragraphs (and so page count and size), date separators,
+phone formatting, values typed without diacritics or the whole document
+in decomposed (NFD) Unicode, and in PDFs words placed without space glyphs
+so extracted text comes out joined ("Họvàtên", "PHẠMYẾNLINH") as in the
+scanned-in template. Ground-truth values are NFC with normal spacing,
+i.e. what a correct extractor should return.
+
+Both formats are written without third-party libraries. PDFs get a
+Type0 font with a ToUnicode map, so their text layer is exact; without
+--font the font is not embedded and viewers may draw the wrong glyphs.
+Pass a TrueType font covering Vietnamese (e.g. DejaVuSans.ttf) to embed it.
+"""
+import io
+import os
+import sys
+import json
+import struct
+import zipfile
+import argparse
+import unicodedata
+from random import Random
+from xml.sax.saxutils import escape
+
+SURNAMES = (('Nguyễn', 38), ('Trần', 11), ('Lê', 9), ('Phạm', 7), ('Hoàng', 5), ('Huỳnh', 4), ('Phan', 4),
+            ('Vũ', 4), ('Võ', 3), ('Đặng', 2), ('Bùi', 2), ('Đỗ', 2), ('Hồ', 2), ('Ngô', 2), ('Dương', 2), ('Lý', 1))
+MIDDLE_NAMES = {
+    'Nam': ('Văn', 'Hữu', 'Đức', 'Minh', 'Quốc', 'Thành', 'Công', 'Xuân', 'Gia', 'Đình', 'Quang', 'Hoàng'),
+    'Nữ': ('Thị', 'Ngọc', 'Thu', 'Thanh', 'Minh', 'Phương', 'Mai', 'Hồng', 'Yến', 'Bảo', 'Khánh', 'Diệu')
+}
+GIVEN_NAMES = {
+    'Nam': ('An', 'Bình', 'Dũng', 'Hải', 'Hùng', 'Khoa', 'Long', 'Nam', 'Phúc', 'Quân', 'Sơn', 'Thắng',
+            'Trung', 'Tuấn', 'Việt', 'Đạt', 'Hiếu', 'Huy', 'Kiên', 'Lâm', 'Nghĩa', 'Vũ'),
+    'Nữ': ('Anh', 'Chi', 'Dung', 'Giang', 'Hà', 'Hằng', 'Hương', 'Lan', 'Linh', 'Ly', 'My', 'Ngân', 'Nhi',
+           'Oanh', 'Phương', 'Quỳnh', 'Thảo', 'Trang', 'Uyên', 'Vy', 'Yến', 'Hạnh')
+}
+PLACES = ('Hà Nội', 'Hải Phòng', 'Nam Định', 'Thái Bình', 'Nghệ An', 'Thanh Hóa', 'Đà Nẵng', 'Huế',
+          'TP. Hồ Chí Minh', 'Cần Thơ', 'Bắc Ninh', 'Quảng Ninh')
+STREETS = ('Đức Giang', 'Nguyễn Trãi', 'Lê Lợi', 'Trần Hưng Đạo', 'Cầu Giấy', 'Láng Hạ', 'Hoàng Quốc Việt',
+           'Kim Mã', 'Phạm Văn Đồng', 'Giải Phóng')
+WARDS = ('Phường Việt Hưng', 'Phường Dịch Vọng', 'Phường Bến Nghé', 'Phường Láng Thượng', 'Xã Liên Minh',
+         'Phường Tân Định')
+POSITIONS = ('Marketing', 'Chuyên viên Digital Marketing', 'Nhân viên kinh doanh', 'Kế toán tổng hợp',
+             'Chuyên viên tuyển dụng', 'Lập trình viên Java', 'Chuyên viên phân tích dữ liệu', 'Giao dịch viên',
+             'Chăm sóc khách hàng', 'Trưởng nhóm bán hàng', 'Chuyên viên pháp chế', 'Thực tập sinh nhân sự')
+WORKPLACES = ('Tổ chức nhân sự', 'Hội sở Hà Nội', 'Chi nhánh Đà Nẵng', 'Chi nhánh TP. Hồ Chí Minh',
+              'Khối Công nghệ', 'Phòng Kinh doanh', 'Phòng Tài chính kế toán')
+COMPANIES = ('Tập Đoàn MAMA Sữa Non', 'Công ty CP Thế Giới Di Động', 'Ngân hàng TMCP Quân Đội',
+             'Công ty TNHH Samsung Electronics Việt Nam', 'Công ty CP FPT Software', 'Công ty TNHH Unilever Việt Nam',
+             'Tổng Công ty Viettel', 'Công ty CP Sữa Việt Nam', 'Công ty TNHH Shopee', 'Công ty CP Tiki')
+JOB_TITLES = ('Nhân viên Digital Marketing', 'Nhân viên kinh doanh', 'Kế toán viên', 'Chuyên viên nhân sự',
+              'Lập trình viên', 'Nhân viên chăm sóc khách hàng', 'Thực tập sinh', 'Trưởng nhóm')
+SCHOOLS = ('Đại học FPT Hà Nội', 'Đại học Bách khoa Hà Nội', 'Đại học Kinh tế Quốc dân', 'Đại học Ngoại thương',
+           'Học viện Ngân hàng', 'Đại học Quốc gia TP. Hồ Chí Minh', 'Đại học Kinh tế TP. Hồ Chí Minh',
+           'Học viện Công nghệ Bưu chính Viễn thông', 'Cao đẳng FPT Polytechnic')
+MAJORS = ('Digital Marketing', 'Quản trị kinh doanh', 'Kế toán', 'Tài chính ngân hàng', 'Công nghệ thông tin',
+          'Quản trị nhân lực', 'Luật kinh tế', 'Ngôn ngữ Anh')
+DEGREES = ('Cử nhân', 'Kỹ sư', 'Thạc sĩ', 'Cao đẳng')
+RANKS = ('Xuất sắc', 'Giỏi', 'Khá', 'Trung bình khá')
+EMAIL_DOMAINS = ('gmail.com', 'yahoo.com', 'outlook.com', 'hotmail.com')
+TASKS = (
+    'Phụ trách lên kế hoạch và triển khai các chiến dịch quảng cáo trên Facebook Ads',
+    'Thống kê, phân tích, theo dõi và đánh giá các số liệu quảng cáo, hiệu quả và chi phí chiến dịch',
+    'Nghiên cứu các đối tượng khách hàng và nhu cầu của từng đối tượng',
+    'Tư vấn sản phẩm và chăm sóc khách hàng qua điện thoại và email',
+    'Lập báo cáo doanh thu hằng tuần, hằng tháng cho trưởng phòng',
+    'Phối hợp với các phòng ban liên quan để hoàn thành mục tiêu chung',
+    'Tìm kiếm và phát triển khách hàng tiềm năng',
+    'Quản lý hồ sơ nhân sự, chấm công và tính lương',
+    'Xây dựng và bảo trì các module của hệ thống nội bộ',
+    'Đối chiếu công nợ và hạch toán chứng từ kế toán'
+)
+STRENGTHS = (
+    'Tư duy sáng tạo', 'Kỹ năng phân tích và đọc dữ liệu', 'Khả năng giao tiếp, làm việc nhóm và phối hợp tốt',
+    'Tinh thần trách nhiệm và học hỏi cao', 'Khả năng tổ chức và quản lý thời gian', 'Chịu được áp lực công việc',
+    'Thành thạo tin học văn phòng', 'Tiếng Anh giao tiếp tốt'
+)
+SENTENCES = (
+    'Tôi quan tâm đến vị trí ứng tuyển này vì đây là lĩnh vực tôi thực sự yêu thích.',
+    'Tôi luôn tìm kiếm cơ hội làm việc trong một môi trường chuyên nghiệp, có định hướng phát triển rõ ràng.',
+    'Với nền tảng kiến thức phù hợp và tinh thần học hỏi không ngừng, tôi tin rằng mình có thể nhanh chóng thích nghi.',
+    'Tôi là người có trách nhiệm, chủ động trong công việc và luôn sẵn sàng tiếp nhận phản hồi.',
+    'Tôi hy vọng mình có thể được đồng hành lâu dài cùng tổ chức.',
+    'Nếu được trao cơ hội, tôi cam kết sẽ nỗ lực hết mình để hoàn thành tốt nhất các nhiệm vụ được giao.',
+    'Làm quen với công việc, môi trường làm việc và văn hóa tổ chức.',
+    'Vận hành công việc một cách độc lập và hiệu quả, đề xuất các sáng kiến cải tiến phù hợp.'
+)
+UNCHECKED, CHECKED = '¨', 'þ'  # Wingdings check boxes as they come out of the real form
+
+def strip_diacritics(text):
+    text = unicodedata.normalize('NFD', text.replace('đ', 'd').replace('Đ', 'D'))
+    return unicodedata.normalize('NFC', ''.join(char for char in text if unicodedata.category(char) != 'Mn'))
+
+def month_year(rng, start_year, end_year):
+    return rng.randint(1, 12), rng.randint(start_year, end_year)
+
+def make_applicant(rng):
+    """Ground-truth values of one applicant"""
+    gender = rng.choice(('Nam', 'Nữ'))
+    surname = rng.choices([name for name, _ in SURNAMES], [weight for _, weight in SURNAMES])[0]
+    middle = rng.sample(MIDDLE_NAMES[gender], rng.choices((1, 2), (4, 1))[0])
+    name = ' '.join([surname, *middle, rng.choice(GIVEN_NAMES[gender])])
+    birth_year = rng.randint(1975, 2004)
+    separator = rng.choices(('/', '-', '.'), (8, 1, 1))[0]
+    dob = f"{rng.randint(1, 28):02d}{separator}{rng.randint(1, 12):02d}{separator}{birth_year}"
+    digits = '0' + rng.choice('35789') + ''.join(rng.choice('0123456789') for _ in range(8))
+    phone = rng.choices((digits, f"{digits[:4]} {digits[4:7]} {digits[7:]}", f"{digits[:4]}.{digits[4:7]}.{digits[7:]}"), (6, 2, 1))[0]
+    email_name = strip_diacritics(name).lower().split()
+    email = f"{email_name[-1]}{email_name[0]}{rng.choice(('', '.work', str(birth_year)[2:], str(rng.randint(1, 99))))}@{rng.choice(EMAIL_DOMAINS)}"
+
+    jobs = []
+    year = 2025
+    for _ in range(rng.choices((0, 1, 2, 3, 4, 6), (1, 4, 4, 3, 2, 1))[0]):
+        end_month, end_year = month_year(rng, year - 1, year)
+        start_month, start_year = month_year(rng, end_year - 3, end_year - 1)
+        jobs.append({
+            'from': f"{start_month:02d}/{start_year}",
+            'to': f"{end_month:02d}/{end_year}",
+            'company': rng.choice(COMPANIES),
+            'position': rng.choice(JOB_TITLES),
+            'tasks': rng.sample(TASKS, rng.randint(2, 6))
+        })
+        year = start_year
+
+    study_start = birth_year + 18
+    return {
+        'code': f"{rng.choice(('MB', 'HR', 'IT', 'KD'))}{rng.randint(100, 999)}" if rng.random() < 0.5 else '',
+        'appliedPosition': rng.choice(POSITIONS),
+        'workplace': rng.choice(WORKPLACES),
+        'name': name.upper() if rng.random() < 0.85 else name,
+        'dob': dob,
+        'birthPlace': rng.choice(PLACES),
+        'gender': gender,
+        'phone': phone,
+        'email': email,
+        'address': f"{rng.randint(1, 200)} {rng.choice(STREETS)}, {rng.choice(WARDS)}, {rng.choice(PLACES)}",
+        'school': rng.choice(SCHOOLS),
+        'major': rng.choice(MAJORS),
+        'education': rng.choice(DEGREES),
+        'studyFrom': f"09/{study_start}",
+        'studyTo': f"06/{study_start + 4}",
+        'rank': rng.choice(RANKS),
+        'experience': jobs,
+        'strengths': rng.sample(STRENGTHS, rng.randint(2, len(STRENGTHS))),
+        'essay': [' '.join(rng.choices(SENTENCES, k=rng.randint(3, 8))) for _ in range(rng.choices((1, 2, 4, 8, 16), (4, 4, 3, 2, 1))[0])]
+    }
+
+def form_blocks(applicant, rng):
+    """The form as layout blocks shared by both writers:
+    ('heading', text), ('row', [label, value, ...]), ('para', text), ('bullet', text), ('page',)
+    """
+    a = applicant
+    checkbox = lambda options, chosen: ' '.join((CHECKED if option == chosen else UNCHECKED) + option for option in options)
+    blocks = [
+        ('heading', 'THÔNG TIN ỨNG VIÊN'),
+        ('row', ['Mã số', 'Vị trí ứng tuyển', 'Nơi làm việc']),
+        ('row', [a['code'], a['appliedPosition'], a['workplace']]),
+        ('heading', 'I. THÔNG TIN BẢN THÂN'),
+        ('row', ['Họ và tên (chữ in hoa)', a['name']]),
+        ('row', ['Ngày sinh', a['dob'], 'Nơi sinh', a['birthPlace'].upper()]),
+        ('row', ['Giới tính', checkbox(('Nam', 'Nữ', 'Khác'), a['gender']), 'Dân tộc', 'Kinh']),
+        ('row', ['Điện thoại', a['phone']]),
+        ('row', ['Email', a['email']]),
+        ('row', ['Hộ khẩu thường trú', a['address']]),
+        ('row', ['Nơi ở hiện tại', a['address']]),
+        ('row', ['Tình trạng hôn nhân', checkbox(('Chưa kết hôn', 'Đã kết hôn'), rng.choice(('Chưa kết hôn', 'Đã kết hôn')))]),
+        ('page',),
+        ('heading', 'II. QUÁ TRÌNH HỌC TẬP'),
+        ('row', ['Từ', 'Đến', 'Tên trường', 'Chuyên ngành', 'Bằng cấp', 'Xếp loại']),
+        ('row', [a['studyFrom'], a['studyTo'], a['school'], a['major'], a['education'], a['rank']]),
+        ('heading', 'III. QUÁ TRÌNH CÔNG TÁC'),
+        ('para', 'Vui lòng liệt kê theo thứ tự công việc hiện tại kể trước')
+    ]
+    for job in a['experience']:
+        if rng.random() < 0.5:
+            blocks.append(('row', ['Từ', job['from'], 'Đến', job['to'], 'Tên công ty', job['company']]))
+            blocks.append(('row', ['Vị trí', job['position']]))
+        else:
+            blocks.append(('para', f"{job['from']} - {job['to']}: {job['position']} tại {job['company']}"))
+        blocks.append(('para', 'Mô tả công việc:'))
+        blocks.extend(('bullet', task) for task in job['tasks'])
+    blocks += [('page',), ('heading', 'VI. NĂNG LỰC'), ('para', 'Ưu điểm (phẩm chất, khả năng, kỹ năng nổi bật)')]
+    blocks.extend(('bullet', strength) for strength in a['strengths'])
+    blocks.append(('heading', 'VIII. VÌ SAO BẠN QUAN TÂM ĐẾN VỊ TRÍ ỨNG TUYỂN'))
+    blocks.extend(('para', paragraph) for paragraph in a['essay'])
+    blocks += [('heading', 'IX. CAM KẾT'), ('para', 'Tôi cam kết rằng tất cả các thông tin cung cấp trên là đúng sự thật.')]
+    return blocks
+
+def apply_text_variant(blocks, applicant, variant):
+    """Typed without diacritics (values only) or decomposed Unicode (whole document)"""
+    if variant == 'none':
+        values = {applicant[key]: strip_diacritics(applicant[key]) for key in ('name', 'address', 'birthPlace')}
+        values[applicant['birthPlace'].upper()] = strip_diacritics(applicant['birthPlace']).upper()
+        blocks = [(kind, *[[values.get(cell, cell) for cell in part] if isinstance(part, list) else values.get(part, part) for part in rest])
+                  for kind, *rest in blocks]
+    elif variant == 'nfd':
+        blocks = [(kind, *[[unicodedata.normalize('NFD', cell) for cell in part] if isinstance(part, list) else unicodedata.normalize('NFD', part) for part in rest])
+                  for kind, *rest in blocks]
+    return blocks
+
+def ground_truth(applicant, variant):
+    truth = {key: applicant[key] for key in ('name', 'dob', 'gender', 'phone', 'email', 'appliedPosition', 'workplace',
+                                             'code', 'school', 'major', 'education', 'address')}
+    if variant == 'none':
+        truth['name'] = strip_diacritics(truth['name'])
+        truth['address'] = strip_diacritics(truth['address'])
+    truth['experience'] = [{key: job[key] for key in ('from', 'to', 'company', 'position')} for job in applicant['experience']]
+    truth['currentPosition'] = applicant['experience'][0]['position'] if applicant['experience'] else ''
+    return truth
+
+# DOCX
+
+DOCX_PARTS = {
+    '[Content_Types].xml': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+        '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+        '<Default Extension="xml" ContentType="application/xml"/>'
+        '<Override PartName="/word/document.xml" ContentType="application/vnd.openxmlformats-officedocument.wordprocessingml.document.main+xml"/>'
+        '</Types>'
+    ),
+    '_rels/.rels': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" Target="word/document.xml"/>'
+        '</Relationships>'
+    )
+}
+GRID_COLUMNS = 6
+
+def docx_runs(text, rng):
+    """Text split into several runs at random points, as Word does after edits"""
+    cuts = sorted(rng.sample(range(1, len(text)), min(len(text) - 1, rng.randint(0, 2)))) if len(text) > 1 else []
+    pieces = [text[start:end] for start, end in zip([0] + cuts, cuts + [len(text)])]
+    return ''.join(f'<w:r><w:t xml:space="preserve">{escape(piece)}</w:t></w:r>' for piece in pieces)
+
+def docx_paragraph(text, rng, bold=False, bullet=False):
+    properties = '<w:rPr><w:b/></w:rPr>' if bold else ''
+    runs = docx_runs(('- ' if bullet else '') + text, rng)
+    if bold:
+        runs = runs.replace('<w:r>', f'<w:r>{properties}')
+    return f'<w:p>{runs}</w:p>'
+
+def docx_row(cells, rng):
+    """Table row on a 6-column grid; the last cell spans the columns left over"""
+    parts = []
+    for index, cell in enumerate(cells):
+        span = GRID_COLUMNS - index if index == len(cells) - 1 else 1
+        properties = f'<w:tcPr><w:gridSpan w:val="{span}"/></w:tcPr>' if span > 1 else ''
+        parts.append(f'<w:tc>{properties}<w:p>{docx_runs(cell, rng) if cell else ""}</w:p></w:tc>')
+    return f'<w:tr>{"".join(parts)}</w:tr>'
+
+def write_docx(blocks, rng, page_count):
+    body = []
+    rows = []
+    page = 1
+
+    def flush_rows():
+        if rows:
+            grid = ''.join('<w:gridCol w:w="1500"/>' for _ in range(GRID_COLUMNS))
+            body.append(f'<w:tbl><w:tblGrid>{grid}</w:tblGrid>{"".join(rows)}</w:tbl>')
+            rows.clear()
+
+    body.append(docx_paragraph(f'Trang {page}/{page_count} QT.NS.01/MB02.V1', rng))
+    for kind, *rest in blocks:
+        if kind == 'row':
+            rows.append(docx_row(rest[0], rng))
+            continue
+        flush_rows()
+        if kind == 'page':
+            page += 1
+            body.append('<w:p><w:r><w:br w:type="page"/></w:r></w:p>')
+            body.append(docx_paragraph(f'Trang {page}/{page_count}', rng))
+        else:
+            body.append(docx_paragraph(rest[0], rng, bold=kind == 'heading', bullet=kind == 'bullet'))
+    flush_rows()
+
+    document = (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<w:document xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main">'
+        f'<w:body>{"".join(body)}</w:body></w:document>'
+    )
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, 'w', zipfile.ZIP_DEFLATED) as package:
+        for name, content in [*DOCX_PARTS.items(), ('word/document.xml', document)]:
+            # Fixed timestamps keep the output byte-identical between runs
+            package.writestr(zipfile.ZipInfo(name, date_time=(1980, 1, 1, 0, 0, 0)), content.encode('utf-8'), zipfile.ZIP_DEFLATED)
+    return buffer.getvalue()
+
+# PDF
+
+class TrueTypeFont:
+    """Glyph ids and advance widths from a TrueType file, for embedding"""
+    def __init__(self, path):
+        with open(path, 'rb') as f:
+            self.data = f.read()
+        count = struct.unpack_from('>H', self.data, 4)[0]
+        tables = {}
+        for index in range(count):
+            tag, _, offset, length = struct.unpack_from('>4sIII', self.data, 12 + 16 * index)
+            tables[tag.decode('latin-1')] = offset
+        head, hhea = tables['head'], tables['hhea']
+        units = struct.unpack_from('>H', self.data, head + 18)[0]
+        self.scale = 1000 / units
+        self.bbox = [round(value * self.scale) for value in struct.unpack_from('>hhhh', self.data, head + 36)]
+        self.ascent, self.descent = (round(value * self.scale) for value in struct.unpack_from('>hh', self.data, hhea + 4))
+        metrics = struct.unpack_from('>H', self.data, hhea + 34)[0]
+        self.advances = struct.unpack_from(f'>{metrics * 2}H', self.data, tables['hmtx'])[::2]
+        self.cmap = self.read_cmap(tables['cmap'])
+
+    def read_cmap(self, offset):
+        """Unicode BMP mapping from the (3,1) or (0,x) format 4 subtable"""
+        count = struct.unpack_from('>H', self.data, offset + 2)[0]
+        for index in range(count):
+            platform, encoding, sub = struct.unpack_from('>HHI', self.data, offset + 4 + 8 * index)
+            start = offset + sub
+            if (platform, encoding) in ((3, 1), (0, 3), (0, 4)) and struct.unpack_from('>H', self.data, start)[0] == 4:
+                break
+        else:
+            raise ValueError("Font has no Unicode format 4 cmap")
+        segments = struct.unpack_from('>H', self.data, start + 6)[0] // 2
+        ends = struct.unpack_from(f'>{segments}H', self.data, start + 14)
+        starts = struct.unpack_from(f'>{segments}H', self.data, start + 16 + 2 * segments)
+        deltas = struct.unpack_from(f'>{segments}h', self.data, start + 16 + 4 * segments)
+        range_base = start + 16 + 6 * segments
+        range_offsets = struct.unpack_from(f'>{segments}H', self.data, range_base)
+        return {'segments': (ends, starts, deltas, range_offsets), 'range_base': range_base}
+
+    def glyph(self, char):
+        code = ord(char)
+        ends, starts, deltas, range_offsets = self.cmap['segments']
+        for index, end in enumerate(ends):
+            if code <= end:
+                if code < starts[index]:
+                    return 0
+                if range_offsets[index] == 0:
+                    return (code + deltas[index]) & 0xFFFF
+                address = self.cmap['range_base'] + 2 * index + range_offsets[index] + 2 * (code - starts[index])
+                glyph = struct.unpack_from('>H', self.data, address)[0]
+                return (glyph + deltas[index]) & 0xFFFF if glyph else 0
+        return 0
+
+    def width(self, glyph):
+        return round(self.advances[min(glyph, len(self.advances) - 1)] * self.scale)
+
+class PDFWriter:
+    """Minimal PDF: A4 pages of positioned text in one Type0 (Identity-H) font"""
+    WIDTH, HEIGHT, MARGIN = 595, 842, 50
+    FONT_SIZE, LEADING = 10, 14
+    DEFAULT_WIDTH = 500
+
+    def __init__(self, font=None, joined=0.0, rng=None):
+        self.font = font
+        self.joined = joined
+        self.rng = rng
+        self.cids = {}
+        self.pages = []
+
+    def cid(self, char):
+        if char not in self.cids:
+            if self.font:
+                glyph = self.font.glyph(char)
+                if not glyph:
+                    raise ValueError(f"Font has no glyph for {char!r}")
+                self.cids[char] = glyph
+            else:
+                self.cids[char] = len(self.cids) + 1
+        return self.cids[char]
+
+    def text_width(self, text):
+        if not self.font:
+            return len(text) * self.DEFAULT_WIDTH * self.FONT_SIZE / 1000
+        return sum(self.font.width(self.cid(char)) for char in text) * self.FONT_SIZE / 1000
+
+    def show(self, text, x, y):
+        """Draw `text`; in joined mode words are placed one by one with no space glyph between them"""
+        if self.rng.random() >= self.joined:
+            hex_text = ''.join(f'{self.cid(char):04X}' for char in text)
+            return [f'1 0 0 1 {x:.2f} {y} Tm <{hex_text}> Tj']
+        operations = []
+        for word in text.split(' '):
+            if word:
+                operations.append(f'1 0 0 1 {x:.2f} {y} Tm <{"".join(f"{self.cid(char):04X}" for char in word)}> Tj')
+            x += self.text_width(word) + 0.5
+        return operations
+
+    def wrap(self, text, width):
+        lines, line = [], ''
+        for word in text.split(' '):
+            candidate = f'{line} {word}' if line else word
+            if line and self.text_width(candidate) > width:
+                lines.append(line)
+                line = word
+            else:
+                line = candidate
+        return lines + [line]
+
+    def layout(self, blocks):
+        """Lay the blocks out into pages of (x, y, text) runs"""
+        pages, runs = [], []
+        usable = self.WIDTH - 2 * self.MARGIN
+        y = self.HEIGHT - self.MARGIN
+
+        def new_page():
+            nonlocal runs, y
+            runs = []
+            pages.append(runs)
+            y = self.HEIGHT - self.MARGIN - self.LEADING  # first line holds the page label
+
+        new_page()
+        for kind, *rest in blocks:
+            if kind == 'page':
+                new_page()
+                continue
+            if kind == 'row':
+                cells = rest[0]
+                column = usable / len(cells)
+                wrapped = [self.wrap(cell, column - 6) if cell else [] for cell in cells]
+                height = max(len(lines) for lines in wrapped) or 1
+                if y - height * self.LEADING < self.MARGIN:
+                    new_page()
+                for index, lines in enumerate(wrapped):
+                    for offset, line in enumerate(lines):
+                        runs.append((self.MARGIN + index * column, y - offset * self.LEADING, line))
+                y -= height * self.LEADING
+                continue
+            indent = 12 if kind == 'bullet' else 0
+            text = ('- ' if kind == 'bullet' else '') + rest[0]
+            for line in self.wrap(text, usable - indent):
+                if y < self.MARGIN:
+                    new_page()
+                runs.append((self.MARGIN + indent, y, line))
+                y -= self.LEADING
+            if kind == 'heading':
+                y -= self.LEADING / 2
+        return pages
+
+    def render(self, pages):
+        streams = []
+        for number, runs in enumerate(pages, 1):
+            label = f'Trang {number}/{len(pages)} QT.NS.01/MB02.V1' if number == 1 else f'Trang {number}/{len(pages)}'
+            operations = ['BT', f'/F1 {self.FONT_SIZE} Tf']
+            operations += self.show(label, self.MARGIN, self.HEIGHT - self.MARGIN)
+            for x, y, text in runs:
+                operations += self.show(text, x, y)
+            operations.append('ET')
+            streams.append('\n'.join(operations).encode('ascii'))
+        return streams
+
+    def to_unicode(self):
+        mapping = sorted((cid, char) for char, cid in self.cids.items())
+        lines = ['/CIDInit /ProcSet findresource begin', '12 dict begin', 'begincmap',
+                 '/CIDSystemInfo << /Registry (Adobe) /Ordering (UCS) /Supplement 0 >> def',
+                 '/CMapName /Adobe-Identity-UCS def', '/CMapType 2 def',
+                 '1 begincodespacerange', '<0000> <FFFF>', 'endcodespacerange']
+        for start in range(0, len(mapping), 100):
+            chunk = mapping[start:start + 100]
+            lines.append(f'{len(chunk)} beginbfchar')
+            lines += [f'<{cid:04X}> <{char.encode("utf-16-be").hex().upper()}>' for cid, char in chunk]
+            lines.append('endbfchar')
+        lines += ['endcmap', 'CMapName currentdict /CMap defineresource pop', 'end', 'end']
+        return '\n'.join(lines).encode('ascii')
+
+    def write(self, blocks):
+        pages = self.layout(blocks)
+        streams = self.render(pages)
+        objects = {}
+        page_ids = [6 + 2 * index for index in range(len(pages))]
+        objects[1] = b'<< /Type /Catalog /Pages 2 0 R >>'
+        objects[2] = f'<< /Type /Pages /Kids [{" ".join(f"{page} 0 R" for page in page_ids)}] /Count {len(pages)} >>'.encode()
+        objects[3] = b'<< /Type /Font /Subtype /Type0 /BaseFont /FormFont /Encoding /Identity-H /DescendantFonts [4 0 R] /ToUnicode 5 0 R >>'
+        cid_font = (f'<< /Type /Font /Subtype /CIDFontType2 /BaseFont /FormFont '
+                    f'/CIDSystemInfo << /Registry (Adobe) /Ordering (Identity) /Supplement 0 >> ')
+        if self.font:
+            widths = ' '.join(f'{cid} [{self.font.width(cid)}]' for cid in sorted(self.cids.values()))
+            cid_font += f'/W [{widths}] /CIDToGIDMap /Identity /FontDescriptor {6 + 2 * len(pages)} 0 R >>'
+        else:
+            cid_font += f'/DW {self.DEFAULT_WIDTH} >>'
+        objects[4] = cid_font.encode()
+        objects[5] = self.to_unicode()
+        for page_id, stream in zip(page_ids, streams):
+            objects[page_id] = (f'<< /Type /Page /Parent 2 0 R /MediaBox [0 0 {self.WIDTH} {self.HEIGHT}] '
+                                f'/Resources << /Font << /F1 3 0 R >> >> /Contents {page_id + 1} 0 R >>').encode()
+            objects[page_id + 1] = stream
+        if self.font:
+            descriptor = 6 + 2 * len(pages)
+            objects[descriptor] = (f'<< /Type /FontDescriptor /FontName /FormFont /Flags 32 /FontBBox [{" ".join(map(str, self.font.bbox))}] '
+                                   f'/ItalicAngle 0 /Ascent {self.font.ascent} /Descent {self.font.descent} /CapHeight {self.font.ascent} '
+                                   f'/StemV 80 /FontFile2 {descriptor + 1} 0 R >>').encode()
+            objects[descriptor + 1] = self.font.data
+
+        streams_ids = {5, *(page_id + 1 for page_id in page_ids)} | ({6 + 2 * len(pages) + 1} if self.font else set())
+        out = io.BytesIO()
+        out.write(b'%PDF-1.4\n%\xe2\xe3\xcf\xd3\n')
+        offsets = {}
+        for number in sorted(objects):
+            offsets[number] = out.tell()
+            body = objects[number]
+            if number in streams_ids:
+                extra = f' /Length1 {len(body)}' if self.font and number == 6 + 2 * len(pages) + 1 else ''
+                body = f'<< /Length {len(body)}{extra} >>\nstream\n'.encode() + body + b'\nendstream'
+            out.write(f'{number} 0 obj\n'.encode() + body + b'\nendobj\n')
+        xref = out.tell()
+        count = max(objects) + 1
+        out.write(f'xref\n0 {count}\n0000000000 65535 f \n'.encode())
+        for number in range(1, count):
+            out.write(f'{offsets[number]:010d} 00000 n \n'.encode())
+        out.write(f'trailer\n<< /Size {count} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n'.encode())
+        return out.getvalue(), len(pages)
+
+def generate(index, seed, formats, font=None):
+    """(file extension, document bytes, ground truth) of document `index`"""
+    rng = Random(f"{seed}:{index}")
+    applicant = make_applicant(rng)
+    file_format = rng.choice(formats)
+    variant = rng.choices(('nfc', 'none', 'nfd'), (8, 1, 1))[0]
+    blocks = apply_text_variant(form_blocks(applicant, rng), applicant, variant)
+    joined = rng.choice((0.0, 0.5, 0.9)) if file_format == 'pdf' else 0.0
+    if file_format == 'pdf':
+        data, pages = PDFWriter(font, joined, rng).write(blocks)
+    else:
+        pages = 1 + sum(1 for block in blocks if block[0] == 'page')
+        data = write_docx(blocks, rng, pages)
+    truth = {
+        'index': index,
+        'seed': seed,
+        'format': file_format,
+        'pages': pages,
+        'bytes': len(data),
+        'variant': {'diacritics': variant, 'joinedWords': joined},
+        'fields': ground_truth(applicant, variant)
+    }
+    return file_format, data, truth
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate synthetic Vietnamese application forms with ground truth")
+    parser.add_argument('out_dir')
+    parser.add_argument('--count', type=int, default=1000)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--start', type=int, default=1, help="First document index (to extend an existing corpus)")
+    parser.add_argument('--formats', default='docx,pdf')
+    parser.add_argument('--font', help="TrueType font with Vietnamese glyphs to embed in the PDFs")
+    args = parser.parse_args()
+
+    formats = tuple(name.strip() for name in args.formats.split(',') if name.strip())
+    if not formats or set(formats) - {'docx', 'pdf'}:
+        parser.error("--formats takes docx and/or pdf")
+    font = TrueTypeFont(args.font) if args.font else None
+
+    os.makedirs(args.out_dir, exist_ok=True)
+    total_bytes = 0
+    for index in range(args.start, args.start + args.count):
+        try:
+            file_format, data, truth = generate(index, args.seed, formats, font)
+        except ValueError as e:
+            print(f"❌ Document {index}: {e}")
+            return 2
+        stem = os.path.join(args.out_dir, f"form-{index:05d}")
+        with open(f"{stem}.{file_format}", 'wb') as f:
+            f.write(data)
+        with open(f"{stem}.json", 'w', encoding='utf-8') as f:
+            json.dump(truth, f, ensure_ascii=False, indent=2)
+        total_bytes += len(data)
+    print(f"✅ {args.count} forms ({total_bytes / 1024 / 1024:.1f} MB) written to {args.out_dir}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,64 @@
+# Gunicorn settings for the preforking deployment (see start.sh).
+#
+# The app is imported once in the master (preload_app) through its
+# create_app() factory and the workers are forked from it, so compiled rules
+# and preloaded models are shared copy-on-write. Workers and threads are sized
+# from the CPUs this process may use and the memory it is allowed:
+#   workers = min(cores, (memory - GUNICORN_SHARED_MB) / GUNICORN_WORKER_MB)
+#   threads = enough to keep 2 threads per core when memory caps the workers
+# WEB_CONCURRENCY and GUNICORN_THREADS override the computed values.
+import os
+import math
+
+def available_cores():
+    try:
+        cores = len(os.sched_getaffinity(0))
+    except AttributeError:  # Not available on macOS
+        cores = os.cpu_count() or 1
+    # A container CPU quota is usually stricter than the affinity mask
+    try:
+        with open('/sys/fs/cgroup/cpu.max') as f:
+            quota, period = f.read().split()
+        if quota != 'max':
+            cores = min(cores, max(1, math.ceil(int(quota) / int(period))))
+    except (OSError, ValueError):
+        pass
+    return cores
+
+def available_memory_mb():
+    """Container memory limit if there is one, else physical memory"""
+    limits = []
+    for path in ('/sys/fs/cgroup/memory.max', '/sys/fs/cgroup/memory/memory.limit_in_bytes'):
+        try:
+            with open(path) as f:
+                value = f.read().strip()
+            if value != 'max':
+                limits.append(int(value) // (1024 * 1024))
+        except (OSError, ValueError):
+            pass
+    try:
+        limits.append(os.sysconf('SC_PAGE_SIZE') * os.sysconf('SC_PHYS_PAGES') // (1024 * 1024))
+    except (ValueError, OSError, AttributeError):
+        pass
+    return min(limits) if limits else None
+
+cores = available_cores()
+memory_mb = available_memory_mb()
+shared_mb = int(os.environ.get('GUNICORN_SHARED_MB', 200))
+worker_mb = int(os.environ.get('GUNICORN_WORKER_MB', 150))
+
+workers = cores
+if memory_mb:
+    workers = min(workers, max(1, (memory_mb - shared_mb) // worker_mb))
+workers = int(os.environ.get('WEB_CONCURRENCY', workers))
+threads = int(os.environ.get('GUNICORN_THREADS', max(2, math.ceil(2 * cores / workers))))
+
+bind = f"0.0.0.0:{os.environ.get('PORT', 5000)}"
+preload_app = True
+worker_class = 'gthread'
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', 120))
+max_requests = int(os.environ.get('GUNICORN_MAX_REQUESTS', 0))
+max_requests_jitter = max_requests // 10
+
+def when_ready(server):
+    server.log.info(f"{workers} worker(s) x {threads} thread(s) for {cores} core(s), {memory_mb or '?'} MB")
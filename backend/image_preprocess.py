@@ -0,0 +1,143 @@
+import os
+import math
+import time
+
+import cv2
+import numpy as np
+
+class ImagePreprocessor:
+    """OCR preprocessing for photographed and scanned forms.
+
+    Everything is decided on a small analysis thumbnail first: the document
+    outline, the skew angle and the typical text height. The full-resolution
+    image is then only cropped (a view, no copy), resized once with
+    INTER_AREA so text ends up `text_height` pixels tall, rotated and
+    binarized at that reduced size. The image is decoded straight to
+    grayscale, which already divides decode memory by three for photos.
+
+    Stages: 'crop', 'downscale', 'deskew', 'threshold'; each can be switched
+    off through OCR_PREPROCESS. `run` returns the processed image and the
+    time spent in every stage in milliseconds.
+    """
+    STAGES = ('crop', 'downscale', 'deskew', 'threshold')
+    ANALYSIS_SIDE = 1000
+
+    def __init__(self, stages=None, text_height=None, max_side=None, max_skew=None, block_size=None):
+        configured = os.environ.get('OCR_PREPROCESS', ','.join(self.STAGES))
+        self.stages = set(stages if stages is not None else (stage.strip() for stage in configured.split(',') if stage.strip()))
+        unknown = self.stages - set(self.STAGES)
+        if unknown:
+            raise ValueError(f"Unknown preprocessing stages: {', '.join(sorted(unknown))}")
+        self.text_height = text_height or int(os.environ.get('OCR_TEXT_HEIGHT', 32))
+        self.max_side = max_side or int(os.environ.get('OCR_MAX_SIDE', 2560))
+        self.max_skew = max_skew if max_skew is not None else float(os.environ.get('OCR_MAX_SKEW_DEGREES', 15))
+        self.block_size = (block_size or int(os.environ.get('OCR_THRESHOLD_BLOCK', 31))) | 1  # Must be odd
+
+    def decode(self, data):
+        image = cv2.imdecode(np.frombuffer(data, np.uint8), cv2.IMREAD_GRAYSCALE)
+        if image is None:
+            raise ValueError("Could not decode image")
+        return image
+
+    def run(self, data):
+        timings = {}
+        started = time.perf_counter()
+
+        def lap(stage):
+            nonlocal started
+            now = time.perf_counter()
+            timings[stage] = round((now - started) * 1000, 2)
+            started = now
+
+        gray = self.decode(data)
+        lap('decode')
+
+        # Analysis thumbnail, binarized with dark text as foreground
+        analysis_scale = min(1.0, self.ANALYSIS_SIDE / max(gray.shape))
+        thumb = cv2.resize(gray, None, fx=analysis_scale, fy=analysis_scale, interpolation=cv2.INTER_AREA) if analysis_scale < 1 else gray
+        ink = cv2.adaptiveThreshold(thumb, 255, cv2.ADAPTIVE_THRESH_MEAN_C, cv2.THRESH_BINARY_INV, 25, 15)
+        lap('analyze')
+
+        if 'crop' in self.stages:
+            x, y, w, h = self.document_bounds(thumb)
+            if (w, h) != thumb.shape[::-1]:
+                left, top = int(x / analysis_scale), int(y / analysis_scale)
+                gray = gray[top:top + int(h / analysis_scale), left:left + int(w / analysis_scale)]
+                ink = ink[y:y + h, x:x + w]
+            lap('crop')
+
+        if 'downscale' in self.stages:
+            scale = self.target_scale(ink, analysis_scale, gray.shape)
+            if scale < 1:
+                gray = cv2.resize(gray, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+            lap('downscale')
+
+        if 'deskew' in self.stages:
+            angle = self.skew_angle(ink)
+            if angle:
+                height, width = gray.shape
+                rotation = cv2.getRotationMatrix2D((width / 2, height / 2), angle, 1.0)
+                gray = cv2.warpAffine(gray, rotation, (width, height), flags=cv2.INTER_LINEAR, borderMode=cv2.BORDER_REPLICATE)
+            lap('deskew')
+
+        if 'threshold' in self.stages:
+            gray = cv2.adaptiveThreshold(gray, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C, cv2.THRESH_BINARY, self.block_size, 10)
+            lap('threshold')
+
+        timings['total'] = round(sum(timings.values()), 2)
+        return gray, timings
+
+    def document_bounds(self, thumb):
+        """Bounding box of the largest paper-like outline, or the whole thumbnail"""
+        edges = cv2.Canny(cv2.GaussianBlur(thumb, (5, 5), 0), 50, 150)
+        edges = cv2.dilate(edges, np.ones((3, 3), np.uint8))
+        contours, _ = cv2.findContours(edges, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+        height, width = thumb.shape
+        if contours:
+            x, y, w, h = cv2.boundingRect(max(contours, key=cv2.contourArea))
+            # Anything smaller than a third of the frame is a photo or a stamp, not the page
+            if w * h >= width * height / 3:
+                return x, y, w, h
+        return 0, 0, width, height
+
+    def target_scale(self, ink, analysis_scale, shape):
+        """Scale that brings the median text height down to `text_height`, never enlarging"""
+        scale = min(1.0, self.max_side / max(shape))
+        count, _, stats, _ = cv2.connectedComponentsWithStats(ink, connectivity=8)
+        heights = stats[1:count, cv2.CC_STAT_HEIGHT]
+        widths = stats[1:count, cv2.CC_STAT_WIDTH]
+        # Glyph-sized blobs only: not specks, not table rules or photos
+        glyphs = heights[(heights >= 4) & (heights <= ink.shape[0] / 10) & (widths <= heights * 4)]
+        if glyphs.size >= 20:
+            text_height = float(np.median(glyphs)) / analysis_scale
+            scale = min(scale, self.text_height / text_height)
+        return scale
+
+    def skew_angle(self, ink):
+        """Rotation in degrees that levels the text lines; 0 when negligible or implausible.
+
+        Specks are opened away and the glyphs of each line smeared together
+        horizontally; the median direction of the long line blobs is the skew.
+        A rectangle around all the ink would follow noise and the page border.
+        """
+        width = ink.shape[1]
+        clean = cv2.morphologyEx(ink, cv2.MORPH_OPEN, np.ones((2, 2), np.uint8))
+        lines = cv2.dilate(clean, cv2.getStructuringElement(cv2.MORPH_RECT, (max(3, width // 40), 1)))
+        contours, _ = cv2.findContours(lines, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+        angles = []
+        for contour in contours:
+            rect = cv2.minAreaRect(contour)
+            long_side, short_side = max(rect[1]), min(rect[1])
+            if long_side < width / 10 or long_side < 5 * short_side:
+                continue
+            box = cv2.boxPoints(rect)
+            dx, dy = max((box[1] - box[0], box[2] - box[1]), key=lambda edge: math.hypot(*edge))
+            # Direction of the long side in image coordinates, folded into (-90, 90]
+            angle = math.degrees(math.atan2(dy, dx))
+            angles.append(angle - 180 if angle > 90 else angle + 180 if angle <= -90 else angle)
+        if len(angles) < 3:
+            return 0.0
+        angle = float(np.median(angles))
+        if abs(angle) < 0.5 or abs(angle) > self.max_skew:
+            return 0.0
+        return angle
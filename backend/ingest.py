@@ -0,0 +1,182 @@
+import io
+import os
+import hashlib
+import zipfile
+import tempfile
+from contextlib import contextmanager
+
+from flask import Request
+from werkzeug.exceptions import HTTPException, RequestEntityTooLarge, UnsupportedMediaType
+
+# Uploads up to this size stay in memory; larger ones spill to a temporary file
+UPLOAD_SPILL_BYTES = int(os.environ.get('UPLOAD_SPILL_MB', 16)) * 1024 * 1024
+
+class SpoolingRequest(Request):
+    """Request whose file uploads are buffered in memory up to UPLOAD_SPILL_MB.
+
+    Werkzeug spools every upload above 500 KB to disk by default; a typical
+    application form is larger than that, so each request paid a disk write
+    and a re-read before parsing even started.
+    """
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        return tempfile.SpooledTemporaryFile(max_size=UPLOAD_SPILL_BYTES, mode='rb+')
+
+# Upload kinds by file extension, and the leading bytes each kind must start with
+UPLOAD_KINDS = {'.pdf': 'pdf', '.docx': 'docx', '.zip': 'zip', '.jpg': 'jpeg', '.jpeg': 'jpeg', '.png': 'png'}
+MAGIC_BYTES = {
+    'pdf': (b'%PDF',),
+    'docx': (b'PK\x03\x04',),
+    'zip': (b'PK\x03\x04', b'PK\x05\x06'),
+    'jpeg': (b'\xff\xd8\xff',),
+    'png': (b'\x89PNG\r\n\x1a\n',)
+}
+SNIFF_BYTES = 8
+
+def check_magic(kind, head):
+    """Raise 415 unless `head` starts with the magic bytes of `kind`"""
+    if not head.startswith(MAGIC_BYTES[kind]):
+        raise UnsupportedMediaType(f"File content is not {kind.upper()}")
+
+def check_docx(stream):
+    """Raise 415 unless the seekable `stream` is a ZIP holding word/document.xml"""
+    try:
+        # Reads only the central directory at the end of the stream
+        if 'word/document.xml' not in zipfile.ZipFile(stream).namelist():
+            raise UnsupportedMediaType("File is not a Word document")
+    except zipfile.BadZipFile:
+        raise UnsupportedMediaType("File is not a valid DOCX")
+
+class CheckedUpload(tempfile.SpooledTemporaryFile):
+    """Upload buffer that checks the file while Werkzeug is still receiving it.
+
+    The first bytes must match the kind promised by the file extension and
+    the running size must stay under `max_bytes`; otherwise an HTTP error is
+    raised from inside the multipart parser, so the rest of the body is
+    never read or spooled to disk. With `strict=False` the failure is kept
+    in `error` instead and the rest of the file is discarded, so the other
+    files of the request still get processed. The SHA-256 used as cache key
+    is taken on the way in as well (see cv_cache.content_hash).
+    """
+    def __init__(self, kind, max_bytes, strict=True, error=None):
+        super().__init__(max_size=UPLOAD_SPILL_BYTES, mode='rb+')
+        self.kind = kind
+        self.max_bytes = max_bytes
+        self.strict = strict
+        self.error = error
+        self.size = 0
+        self.head = b''
+        self.digest = hashlib.sha256()
+
+    @property
+    def content_sha256(self):
+        return self.digest.hexdigest()
+
+    def write(self, data):
+        if self.error:
+            return len(data)
+        try:
+            self.size += len(data)
+            if self.max_bytes and self.size > self.max_bytes:
+                raise RequestEntityTooLarge(f"File is larger than {self.max_bytes // (1024 * 1024)} MB")
+            if len(self.head) < SNIFF_BYTES:
+                self.head += data[:SNIFF_BYTES - len(self.head)]
+                if len(self.head) == SNIFF_BYTES:
+                    self.check_magic()
+        except HTTPException as e:
+            self.reject(e)
+            return len(data)
+        self.digest.update(data)
+        return super().write(data)
+
+    def reject(self, e):
+        if self.strict:
+            raise e
+        self.error = e.description
+        self.seek(0)
+        self.truncate()
+
+    def check_magic(self):
+        check_magic(self.kind, self.head)
+
+    def finish(self):
+        """Checks that need the whole file: short files, and DOCX structure"""
+        if not self.error:
+            try:
+                if len(self.head) < SNIFF_BYTES:
+                    self.check_magic()
+                if self.kind == 'docx':
+                    check_docx(self)
+            except HTTPException as e:
+                self.reject(e)
+        self.seek(0)
+
+class IntakeRequest(SpoolingRequest):
+    """SpoolingRequest that only accepts the upload kinds in `upload_kinds`.
+
+    The kind comes from the file extension and is confirmed by magic bytes as
+    the upload streams in; each file is limited to UPLOAD_MAX_FILE_MB, except
+    ZIP archives, which only the request size limit (MAX_CONTENT_LENGTH)
+    bounds. Rejections raise 413/415 while parsing the form, except on the
+    endpoints in `per_file_endpoints`, which report each rejected file
+    themselves through its stream's `error`.
+    """
+    upload_kinds = tuple(MAGIC_BYTES)
+    max_file_bytes = int(os.environ.get('UPLOAD_MAX_FILE_MB', 10)) * 1024 * 1024
+    per_file_endpoints = ()
+
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        if not filename:
+            # Empty file input; the route reports that nothing was selected
+            return super()._get_file_stream(total_content_length, content_type, filename, content_length)
+        strict = self.endpoint not in self.per_file_endpoints
+        kind = UPLOAD_KINDS.get(os.path.splitext(filename)[1].lower())
+        if kind not in self.upload_kinds:
+            if strict:
+                raise UnsupportedMediaType(f"Unsupported file type: {filename}")
+            return CheckedUpload(None, None, strict, error='Unsupported file type')
+        return CheckedUpload(kind, None if kind == 'zip' else self.max_file_bytes, strict)
+
+    def _load_form_data(self):
+        if 'form' in self.__dict__:
+            return
+        super()._load_form_data()
+        for _, upload in self.files.items(multi=True):
+            if isinstance(upload.stream, CheckedUpload):
+                upload.stream.finish()
+
+@contextmanager
+def document_stream(source):
+    """Seekable binary stream for a file path, raw bytes or an open upload stream"""
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, 'rb') as file:
+            yield file
+        return
+    stream = io.BytesIO(source) if isinstance(source, (bytes, bytearray, memoryview)) else source
+    stream.seek(0)
+    yield stream
+
+@contextmanager
+def spilled_path(source, suffix=''):
+    """Filesystem path for a source, writing a temporary copy only when it is not already a file.
+
+    Only for tools that insist on a path (textract); everything else reads
+    the stream directly.
+    """
+    if isinstance(source, (str, os.PathLike)):
+        yield source
+        return
+    with tempfile.NamedTemporaryFile(delete=False, suffix=suffix) as temp_file:
+        with document_stream(source) as stream:
+            while True:
+                chunk = stream.read(1024 * 1024)
+                if not chunk:
+                    break
+                temp_file.write(chunk)
+        temp_path = temp_file.name
+    try:
+        yield temp_path
+    finally:
+        try:
+            os.unlink(temp_path)
+        except OSError:
+            pass
@@ -0,0 +1,190 @@
+import os
+import json
+import time
+import uuid
+import sqlite3
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+class JobQueue:
+    """Durable local job queue backed by SQLite.
+
+    Submitting a job stores the uploaded bytes and returns an id at once;
+    background worker threads claim queued jobs, run the handler registered
+    for their kind and store the JSON result until it expires. Every process
+    that opens the same database file contributes its workers to the pool.
+    A running job renews its lease while the handler works, so only jobs left
+    behind by a process that died are picked up again once the lease runs out,
+    at most MAX_ATTEMPTS starts in all.
+    """
+    POLL_INTERVAL = 0.5
+    MAX_ATTEMPTS = 3
+
+    def __init__(self, path, handlers, workers=None, ttl=None, lease=None):
+        self.path = path
+        self.handlers = handlers
+        self.workers = workers if workers is not None else int(os.environ.get('JOB_WORKERS', 2))
+        self.ttl = ttl if ttl is not None else int(os.environ.get('JOB_TTL_SECONDS', 3600))
+        self.lease = lease if lease is not None else int(os.environ.get('JOB_LEASE_SECONDS', 600))
+        self.wakeup = threading.Event()
+        self.lock = threading.Lock()
+        self.started_pid = None
+        self.local = threading.local()
+
+        with self.connect() as db:
+            db.execute('PRAGMA journal_mode=WAL')
+            db.execute('''
+                CREATE TABLE IF NOT EXISTS jobs (
+                    id TEXT PRIMARY KEY,
+                    kind TEXT NOT NULL,
+                    status TEXT NOT NULL,
+                    filename TEXT,
+                    data BLOB,
+                    params TEXT,
+                    result TEXT,
+                    error TEXT,
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    created REAL NOT NULL,
+                    updated REAL NOT NULL,
+                    expires REAL
+                )
+            ''')
+            db.execute('CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, created)')
+
+    def connect(self):
+        """One connection per thread; sqlite3 connections are not shared across threads"""
+        db = getattr(self.local, 'db', None)
+        if db is None or getattr(self.local, 'pid', None) != os.getpid():
+            db = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            db.row_factory = sqlite3.Row
+            self.local.db, self.local.pid = db, os.getpid()
+        return db
+
+    def start(self):
+        """Start the worker threads once per process (a forked child starts its own)"""
+        with self.lock:
+            if self.started_pid == os.getpid():
+                return
+            self.started_pid = os.getpid()
+            for index in range(self.workers):
+                threading.Thread(target=self.work, name=f'job-worker-{index}', daemon=True).start()
+        logger.info(f"Started {self.workers} job workers on {self.path}")
+
+    def submit(self, kind, data, filename='', params=None):
+        if kind not in self.handlers:
+            raise ValueError(f"Unknown job kind: {kind}")
+        self.start()
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        self.connect().execute(
+            'INSERT INTO jobs (id, kind, status, filename, data, params, created, updated) VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+            (job_id, kind, 'queued', filename, data, json.dumps(params or {}), now, now)
+        )
+        self.wakeup.set()
+        return job_id
+
+    def get(self, job_id):
+        """Status and, once finished, the result of a job; None if unknown or expired"""
+        self.start()
+        row = self.connect().execute(
+            'SELECT id, kind, status, filename, result, error, created, updated, expires FROM jobs WHERE id = ?',
+            (job_id,)
+        ).fetchone()
+        if row is None or (row['expires'] is not None and row['expires'] < time.time()):
+            return None
+        job = {
+            'jobId': row['id'],
+            'type': row['kind'],
+            'status': row['status'],
+            'filename': row['filename'],
+            'created': row['created'],
+            'updated': row['updated']
+        }
+        if row['result'] is not None:
+            job['result'] = json.loads(row['result'])
+        if row['error'] is not None:
+            job['error'] = row['error']
+        if row['expires'] is not None:
+            job['expires'] = row['expires']
+        return job
+
+    def claim(self):
+        """Atomically move the oldest runnable job to 'running'; `attempt` is 1 on its first start"""
+        db = self.connect()
+        now = time.time()
+        db.execute('BEGIN IMMEDIATE')
+        try:
+            row = db.execute(
+                f'''SELECT id, kind, filename, data, params, attempts + 1 AS attempt FROM jobs
+                    WHERE kind IN ({', '.join('?' * len(self.handlers))})
+                    AND (status = 'queued' OR (status = 'running' AND updated < ?))
+                    ORDER BY created LIMIT 1''',
+                (*self.handlers, now - self.lease)
+            ).fetchone()
+            if row is not None:
+                db.execute(
+                    "UPDATE jobs SET status = 'running', attempts = attempts + 1, updated = ? WHERE id = ?",
+                    (now, row['id'])
+                )
+            db.execute('COMMIT')
+        except Exception:
+            db.execute('ROLLBACK')
+            raise
+        return row
+
+    def finish(self, job_id, status, result=None, error=None):
+        now = time.time()
+        # The uploaded bytes are not needed once a job has finished
+        self.connect().execute(
+            'UPDATE jobs SET status = ?, result = ?, error = ?, data = NULL, updated = ?, expires = ? WHERE id = ?',
+            (status, json.dumps(result, ensure_ascii=False) if result is not None else None, error, now, now + self.ttl, job_id)
+        )
+
+    def purge(self):
+        self.connect().execute('DELETE FROM jobs WHERE expires IS NOT NULL AND expires < ?', (time.time(),))
+
+    def work(self):
+        while True:
+            try:
+                job = self.claim()
+                if job is None:
+                    self.purge()
+                    self.wakeup.wait(self.POLL_INTERVAL)
+                    self.wakeup.clear()
+                    continue
+                if job['attempt'] > self.MAX_ATTEMPTS:
+                    self.finish(job['id'], 'failed', error='Job was interrupted too many times')
+                    continue
+                self.run(job)
+            except Exception as e:
+                logger.error(f"Job worker error: {e}")
+                time.sleep(self.POLL_INTERVAL)
+
+    def renew(self, job_id, done):
+        """Keep the lease of a running job fresh until `done` is set"""
+        while not done.wait(self.lease / 3):
+            try:
+                self.connect().execute(
+                    "UPDATE jobs SET updated = ? WHERE id = ? AND status = 'running'",
+                    (time.time(), job_id)
+                )
+            except Exception as e:
+                logger.error(f"Could not renew lease of job {job_id}: {e}")
+
+    def run(self, job):
+        started = time.time()
+        done = threading.Event()
+        threading.Thread(target=self.renew, args=(job['id'], done), name=f"job-lease-{job['id'][:8]}", daemon=True).start()
+        try:
+            result = self.handlers[job['kind']](job['filename'], job['data'], json.loads(job['params']))
+        except Exception as e:
+            logger.error(f"Job {job['id']} ({job['kind']}) failed: {e}")
+            self.finish(job['id'], 'failed', error=str(e))
+            return
+        finally:
+            done.set()
+        status = 'failed' if isinstance(result, dict) and 'error' in result else 'done'
+        self.finish(job['id'], status, result=result, error=result.get('error') if status == 'failed' else None)
+        logger.info(f"Job {job['id']} ({job['kind']}) {status} in {time.time() - started:.2f}s")
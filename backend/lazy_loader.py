@@ -0,0 +1,63 @@
+import time
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+class LazyComponent:
+    """A heavy dependency or model that is loaded on first use.
+
+    `loader` imports and builds the component; it runs at most once, on the
+    first `get()` or in a background thread started by `start_warmup()`.
+    A component that fails to load stays 'failed' and `get()` returns None,
+    so callers treat it as an optional feature.
+    """
+    def __init__(self, name, loader):
+        self.name = name
+        self.loader = loader
+        self.value = None
+        self.state = 'not_loaded'
+        self.error = None
+        self.load_seconds = None
+        self.lock = threading.Lock()
+
+    @property
+    def ready(self):
+        return self.state == 'ready'
+
+    def get(self, wait=True):
+        """The loaded component, or None if it failed to load.
+
+        With wait=False a component that is not ready yet is loaded in the
+        background and None is returned straight away.
+        """
+        if self.state in ('ready', 'failed'):
+            return self.value
+        if not wait:
+            self.start_warmup()
+            return None
+        self.load()
+        return self.value
+
+    def load(self):
+        with self.lock:
+            if self.state in ('ready', 'failed'):
+                return
+            self.state = 'loading'
+            started = time.monotonic()
+            try:
+                self.value = self.loader()
+            except Exception as e:
+                self.state, self.error = 'failed', str(e)
+                logger.warning(f"{self.name} not available: {e}")
+                return
+            self.load_seconds = round(time.monotonic() - started, 2)
+            self.state = 'ready'
+        logger.info(f"{self.name} loaded in {self.load_seconds}s")
+
+    def start_warmup(self):
+        if self.state == 'not_loaded':
+            threading.Thread(target=self.load, name=f'{self.name}-warmup', daemon=True).start()
+
+    def status(self):
+        return {'state': self.state, 'loadSeconds': self.load_seconds, 'error': self.error}
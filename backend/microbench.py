@@ -0,0 +1,285 @@
+"""Stage-by-stage microbenchmarks of every CV processor variant.
+
+    python microbench.py [--corpus DIR] [--variants app,app_simple,app_full,cv_processor_api]
+                         [--iterations N] [--save-baseline FILE] [--baseline FILE] [--tolerance 0.25]
+
+Each stage (text extraction, each field, the name and position helpers and
+the whole process_cv) is timed over every DOCX/PDF in the corpus and
+reported as median and p99 latency plus the peak memory allocated by one
+call (tracemalloc, measured in a separate untimed run). With --baseline the
+results are compared against a file written by --save-baseline and the run
+exits non-zero if any stage's median got slower or it allocates more than the
+tolerance; p99 is only compared once a stage has MIN_TAIL_SAMPLES samples, as
+with fewer it is just the slowest call. Result caches are disabled so every
+call does the full work.
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import logging
+import tempfile
+import statistics
+import tracemalloc
+
+# Measure uncached work, and keep model loading out of the timings
+os.environ['CV_CACHE_TEXT_MB'] = '0'
+os.environ['CV_CACHE_FIELDS_MB'] = '0'
+os.environ.pop('CV_CACHE_DIR', None)
+os.environ.setdefault('OCR_WARMUP', 'false')
+
+import PyPDF2
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(BACKEND_DIR)
+sys.path.insert(0, REPO_DIR)  # cv_processor_api.py lives at the repository root
+
+FIXTURE_PDF = os.path.join(REPO_DIR, "Phạm Yến Linh.pdf")
+VARIANTS = ('app', 'app_simple', 'app_full', 'cv_processor_api')
+HELPERS = ('clean_extracted_name', 'separate_joined_name', 'process_applied_position_content')
+
+# Differences below these are noise, whatever the ratio
+MIN_TIME_DELTA_MS = 0.05
+MIN_PEAK_DELTA_KB = 64
+# Below this many samples p95/p99 are the slowest calls, too noisy to gate on
+MIN_TAIL_SAMPLES = 100
+# cv_processor_api returns placeholder text at or below this confidence when its document libraries are missing
+PLACEHOLDER_CONFIDENCE = 0.3
+
+def build_default_corpus(directory):
+    """The fixture PDF and a DOCX with the same lines"""
+    import docx
+    text = "".join(page.extract_text() + "\n" for page in PyPDF2.PdfReader(FIXTURE_PDF).pages)
+    document = docx.Document()
+    for line in text.splitlines():
+        document.add_paragraph(line)
+    docx_path = os.path.join(directory, "fixture.docx")
+    document.save(docx_path)
+    return [FIXTURE_PDF, docx_path]
+
+def corpus_files(directory):
+    return sorted(
+        os.path.join(root, name)
+        for root, _, names in os.walk(directory)
+        for name in names
+        if name.lower().endswith(('.docx', '.pdf'))
+    )
+
+def capture_calls(processor, methods, run):
+    """Arguments `processor` passes to `methods` while `run()` executes"""
+    calls = []
+    for method in methods:
+        original = getattr(processor, method)
+        def recorder(*args, _method=method, _original=original):
+            calls.append((_method, args))
+            return _original(*args)
+        setattr(processor, method, recorder)
+    try:
+        run()
+    finally:
+        for method in methods:
+            delattr(processor, method)
+    return calls
+
+def app_stages(module, doc):
+    """backend/app.py SimpleCVProcessor"""
+    processor = module.processor
+    path, kind = doc['path'], doc['kind']
+    extract = processor.extract_text_from_docx if kind == 'docx' else processor.extract_text_from_pdf
+    text = extract(path)
+    yield f'text:{kind}', lambda: extract(path)
+    for field in processor.field_patterns:
+        yield f'field:{field}', lambda field=field: processor.extract_field_value(text, field)
+    for method, args in capture_calls(processor, HELPERS, lambda: processor.extract_fields(text)):
+        yield method, lambda method=method, args=args: getattr(processor, method)(*args)
+    yield 'process_cv', lambda: processor.process_cv(path, kind)
+
+def app_simple_stages(module, doc):
+    """backend/app_simple.py SimpleCVProcessor"""
+    processor = module.processor
+    path, kind = doc['path'], doc['kind']
+    extract = processor.extract_text_from_docx if kind == 'docx' else processor.extract_text_from_pdf
+    text = extract(path)
+    yield f'text:{kind}', lambda: extract(path)
+    for field in processor.field_patterns:
+        yield f'field:{field}', lambda field=field: processor.extract_field_value(text, field)
+    yield 'process_cv', lambda: processor.process_cv(path, kind)
+
+def app_full_stages(module, doc):
+    """backend/app_full.py AdvancedCVProcessor; process_cv takes text, so extraction is included"""
+    processor = module.processor
+    path, kind = doc['path'], doc['kind']
+    extract = processor.extract_text_from_docx if kind == 'docx' else processor.extract_text_from_pdf
+    text = processor.clean_text(extract(path))
+    yield f'text:{kind}', lambda: extract(path)
+    for field, rules in processor.field_rules.items():
+        yield f'field:{field}', lambda field=field, rules=rules: processor.extract_field(text, rules, field)
+    yield 'process_cv', lambda: processor.process_cv(extract(path))
+
+def cv_processor_api_stages(module, doc):
+    """cv_processor_api.py CVProcessor; fields come from one regex loop, so there are no per-field stages"""
+    processor = module.processor
+    path, kind = doc['path'], doc['kind']
+    extract = processor.extract_text_from_docx if kind == 'docx' else processor.extract_text_from_pdf
+    text, confidence = extract(path)
+    if confidence <= PLACEHOLDER_CONFIDENCE:
+        print(f"⚠️  Skipping cv_processor_api on {os.path.basename(path)}: {text}")
+        return
+    yield f'text:{kind}', lambda: extract(path)
+    yield 'extract_fields', lambda: processor.extract_fields(text)
+    yield 'process_cv', lambda: module.process_document(path, os.path.basename(path))
+
+STAGES = {
+    'app': app_stages,
+    'app_simple': app_simple_stages,
+    'app_full': app_full_stages,
+    'cv_processor_api': cv_processor_api_stages
+}
+
+def load_variant(name):
+    """Import a variant with a fresh processor, or None if its dependencies are missing"""
+    try:
+        if name == 'app':
+            import app as module
+            module.processor = module.SimpleCVProcessor()
+            module.processor.pdf_parallel_min_pages = 0  # Stages are timed in-process
+        elif name == 'app_simple':
+            import app_simple as module
+            module.processor = module.SimpleCVProcessor()
+        elif name == 'app_full':
+            import app_full as module
+            module.processor = module.AdvancedCVProcessor()
+        else:
+            import cv_processor_api as module
+            module.processor = module.cv_processor
+        return module
+    except Exception as e:
+        print(f"⚠️  Skipping {name}: {e}")
+        return None
+
+def measure(function, iterations):
+    """Wall times in ms of `iterations` calls, and the peak KB allocated by one call"""
+    function()  # warm up
+    timings = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        function()
+        timings.append((time.perf_counter() - start) * 1000)
+
+    tracemalloc.start()
+    baseline, _ = tracemalloc.get_traced_memory()
+    function()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return timings, (peak - baseline) / 1024
+
+def percentile(sorted_values, fraction):
+    """Nearest-rank percentile of an ascending list"""
+    index = max(0, min(len(sorted_values) - 1, int(round(fraction * len(sorted_values))) - 1))
+    return sorted_values[index]
+
+def run(variants, paths, iterations):
+    """{'variant/stage': {'samples', 'median_ms', 'p99_ms', 'peak_kb'}} over all documents"""
+    docs = [{'path': path, 'kind': os.path.splitext(path)[1].lower()[1:]} for path in paths]
+    timings, peaks = {}, {}
+    for name in variants:
+        module = load_variant(name)
+        if module is None:
+            continue
+        for doc in docs:
+            for stage, function in STAGES[name](module, doc):
+                key = f"{name}/{stage}"
+                stage_timings, peak_kb = measure(function, iterations)
+                timings.setdefault(key, []).extend(stage_timings)
+                peaks[key] = max(peaks.get(key, 0), peak_kb)
+
+    results = {}
+    for key, values in timings.items():
+        values.sort()
+        results[key] = {
+            'samples': len(values),
+            'median_ms': round(statistics.median(values), 4),
+            'p99_ms': round(percentile(values, 0.99), 4),
+            'peak_kb': round(peaks[key], 1)
+        }
+    return results
+
+def compare(results, baseline, tolerance):
+    """Lines describing stages that regressed against `baseline` in median time, peak memory or, with enough samples, p95/p99"""
+    regressions = []
+    for key, result in results.items():
+        before = baseline.get(key)
+        if before is None:
+            continue
+        metrics = ['median_ms', 'peak_kb']
+        if min(result['samples'], before.get('samples', 0)) >= MIN_TAIL_SAMPLES:
+            metrics += ['p95_ms', 'p99_ms']
+        for metric in metrics:
+            if metric not in result or metric not in before:
+                continue
+            floor = MIN_PEAK_DELTA_KB if metric.endswith('_kb') else MIN_TIME_DELTA_MS
+            now, then = result[metric], before[metric]
+            if now > then * (1 + tolerance) and now - then > floor:
+                regressions.append(f"{key} {metric}: {then} -> {now} (+{(now / then - 1) * 100 if then else float('inf'):.0f}%)")
+    return regressions
+
+def print_table(results, baseline=None):
+    print(f"{'stage':<48} {'n':>6} {'median ms':>10} {'p99 ms':>10} {'peak KB':>9}  vs baseline")
+    for key, result in results.items():
+        delta = ''
+        before = (baseline or {}).get(key)
+        if before and before['median_ms']:
+            delta = f"{(result['median_ms'] / before['median_ms'] - 1) * 100:+.0f}%"
+        print(f"{key:<48} {result['samples']:>6} {result['median_ms']:>10.3f} {result['p99_ms']:>10.3f} {result['peak_kb']:>9.1f}  {delta}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Microbenchmarks of every CV processor variant")
+    parser.add_argument('--corpus', default=os.environ.get('BENCH_CORPUS'), help="Directory of DOCX/PDF files (default: the repository fixture)")
+    parser.add_argument('--variants', default=','.join(VARIANTS))
+    parser.add_argument('--iterations', type=int, default=int(os.environ.get('BENCH_ITERATIONS', 20)), help="Timed calls per stage and document")
+    parser.add_argument('--save-baseline', metavar='FILE')
+    parser.add_argument('--baseline', metavar='FILE')
+    parser.add_argument('--tolerance', type=float, default=0.25, help="Allowed slowdown or extra allocation, as a fraction")
+    args = parser.parse_args()
+
+    variants = [name.strip() for name in args.variants.split(',') if name.strip()]
+    unknown = set(variants) - set(VARIANTS)
+    if unknown:
+        parser.error(f"unknown variants: {', '.join(sorted(unknown))}")
+
+    # Silence per-field logging so it does not dominate the timings
+    logging.disable(logging.CRITICAL)
+
+    with tempfile.TemporaryDirectory() as scratch:
+        paths = corpus_files(args.corpus) if args.corpus else build_default_corpus(scratch)
+        if not paths:
+            print(f"No DOCX or PDF files in {args.corpus}")
+            return 2
+        print(f"⏱️  {len(paths)} documents, {args.iterations} iterations per stage")
+        results = run(variants, paths, args.iterations)
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+    print()
+    print_table(results, baseline)
+
+    if args.save_baseline:
+        with open(args.save_baseline, 'w') as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+        print(f"\n💾 Baseline saved to {args.save_baseline}")
+
+    if baseline is not None:
+        regressions = compare(results, baseline, args.tolerance)
+        if regressions:
+            print(f"\n❌ {len(regressions)} regression(s) over {args.tolerance:.0%}:")
+            for line in regressions:
+                print(f"  • {line}")
+            return 1
+        print(f"\n✅ No regressions over {args.tolerance:.0%}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,66 @@
+import os
+import re
+
+# Pipes that never feed NER; left out when the model is loaded
+UNUSED_PIPES = ['tagger', 'parser', 'attribute_ruler', 'lemmatizer', 'morphologizer', 'senter', 'textcat']
+EMBEDDING_PIPES = ('tok2vec', 'transformer')
+
+SECTION_LABELS = r'học\s*vấn|trình\s*độ|education|academic|trường|university|college|đại\s*học|cao\s*đẳng'
+
+def load_ner_model(name):
+    """spaCy model with only the components NER needs"""
+    import spacy
+    model = spacy.load(name, exclude=UNUSED_PIPES)
+    for pipe_name in EMBEDDING_PIPES:
+        if pipe_name in model.pipe_names and 'ner' not in getattr(model.get_pipe(pipe_name), 'listening_components', []):
+            # Small/medium models embed their own tok2vec inside NER; a shared one would be wasted work
+            model.disable_pipe(pipe_name)
+    return model
+
+class NERStage:
+    """Named-entity pass restricted to the parts of a CV that hold entities we use.
+
+    Only the header (first `header_chars` characters, where the name is) and
+    a `window_chars` window after each education/school label are sent to
+    the model, so NER time no longer grows with the length of the CV.
+    Windows that overlap are merged, but a merged window never grows past
+    twice `window_chars`, so a CV full of labels cannot pull in its whole
+    text. The windows are joined into a single doc, header first.
+    """
+    def __init__(self, header_chars=None, window_chars=None, max_windows=None):
+        self.header_chars = header_chars or int(os.environ.get('NLP_HEADER_CHARS', 600))
+        self.window_chars = window_chars or int(os.environ.get('NLP_WINDOW_CHARS', 400))
+        self.max_windows = max_windows or int(os.environ.get('NLP_MAX_WINDOWS', 3))
+        self.section_pattern = re.compile(SECTION_LABELS, re.IGNORECASE)
+
+    def window(self, text):
+        """Header plus section windows of `text`, overlapping spans merged up to twice the window size"""
+        spans = [(0, self.header_chars)]
+        for match in self.section_pattern.finditer(text, self.header_chars):
+            if len(spans) > self.max_windows:
+                break
+            if match.start() >= spans[-1][1]:
+                spans.append((match.start(), match.start() + self.window_chars))
+            else:
+                start = spans[-1][0]
+                spans[-1] = (start, min(match.start() + self.window_chars, start + 2 * self.window_chars))
+        return '\n\n'.join(text[start:end] for start, end in spans)
+
+    def entities(self, model, text):
+        """(entities, confidence) of one CV text"""
+        doc = model(self.window(text))
+        entities, confidence = {}, {}
+
+        # Extract person names
+        persons = [ent.text for ent in doc.ents if ent.label_ == "PERSON"]
+        if persons:
+            entities['name'] = persons[0]
+            confidence['name'] = 0.85
+
+        # Extract organizations (could be schools/companies)
+        orgs = [ent.text for ent in doc.ents if ent.label_ == "ORG"]
+        if orgs:
+            entities['school'] = orgs[0] if 'university' in orgs[0].lower() or 'college' in orgs[0].lower() else None
+            entities['company'] = orgs[0] if not entities.get('school') else orgs[1] if len(orgs) > 1 else None
+
+        return entities, confidence
@@ -0,0 +1,107 @@
+import io
+import os
+import hashlib
+import threading
+from collections import OrderedDict
+
+from PIL import Image, ImageOps
+
+class OCRCache:
+    """LRU cache of OCR results in front of the image endpoints.
+
+    In 'perceptual' mode images are keyed by a 16x16 difference hash (dHash)
+    taken after EXIF rotation, grayscale conversion and contrast stretching:
+    each bit says whether a cell is brighter than its right-hand neighbour.
+    Recompressing or slightly re-framing a photo flips only a few bits, so a
+    lookup returns the closest entry within `max_distance` differing bits.
+
+    Filled-in copies of the same blank form also hash within a bit or two of
+    each other, because handwriting barely changes a 16x16 thumbnail. A hit
+    would then return another applicant's text, so the default 'exact' mode
+    only matches byte-identical uploads; enable perceptual matching where
+    one form is photographed repeatedly and different forms are not mixed.
+    `max_entries` = 0 disables the cache.
+    """
+    MODES = ('exact', 'perceptual')
+    HASH_SIZE = 16
+
+    def __init__(self, max_entries=None, mode=None, max_distance=None):
+        self.max_entries = max_entries if max_entries is not None else int(os.environ.get('OCR_CACHE_ENTRIES', 256))
+        self.mode = mode or os.environ.get('OCR_CACHE_MODE', 'exact')
+        if self.mode not in self.MODES:
+            raise ValueError(f"Unknown OCR cache mode: {self.mode}")
+        self.max_distance = max_distance if max_distance is not None else int(os.environ.get('OCR_CACHE_DISTANCE', 8))
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def enabled(self):
+        return self.max_entries > 0
+
+    def key(self, data):
+        """Cache key of encoded image bytes for the configured mode"""
+        if self.mode == 'exact':
+            return hashlib.sha256(data).hexdigest()
+        return self.image_hash(data)
+
+    @classmethod
+    def image_hash(cls, data):
+        """Perceptual hash of encoded image bytes as an int"""
+        image = Image.open(io.BytesIO(data))
+        # JPEGs can be decoded at a fraction of their size; plenty for a 17x16 thumbnail
+        image.draft('L', (cls.HASH_SIZE * 8, cls.HASH_SIZE * 8))
+        image = ImageOps.exif_transpose(image).convert('L')
+        image = ImageOps.autocontrast(image.resize((cls.HASH_SIZE + 1, cls.HASH_SIZE), Image.BOX))
+        pixels = list(image.getdata())
+        bits = 0
+        for row in range(cls.HASH_SIZE):
+            offset = row * (cls.HASH_SIZE + 1)
+            for column in range(cls.HASH_SIZE):
+                bits = (bits << 1) | (pixels[offset + column] > pixels[offset + column + 1])
+        return bits
+
+    def nearest(self, key):
+        if self.mode == 'exact':
+            return key if key in self.entries else None
+        best_key, best_distance = None, self.max_distance + 1
+        for cached in self.entries:
+            distance = (cached ^ key).bit_count()
+            if distance < best_distance:
+                best_key, best_distance = cached, distance
+                if distance == 0:
+                    break
+        return best_key
+
+    def get(self, key):
+        """Cached value for `key` (or, in perceptual mode, the closest key in range), else None"""
+        if not self.enabled:
+            return None
+        with self.lock:
+            found = self.nearest(key)
+            if found is None:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(found)
+            self.hits += 1
+            return self.entries[found]
+
+    def set(self, key, value):
+        if not self.enabled:
+            return
+        with self.lock:
+            self.entries[key] = value
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+    def stats(self):
+        with self.lock:
+            return {
+                'mode': self.mode,
+                'entries': len(self.entries),
+                'maxEntries': self.max_entries,
+                'hits': self.hits,
+                'misses': self.misses
+            }
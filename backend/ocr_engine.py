@@ -0,0 +1,122 @@
+import os
+import time
+import queue
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+class OCREngine:
+    """Process-wide pool of EasyOCR readers.
+
+    Loading a reader takes seconds and hundreds of MB, so readers are created
+    once per process and then lent out to requests: a request borrows a
+    reader for the duration of one `readtext` call, which keeps concurrent
+    requests from sharing a model. `start_warmup` loads the pool in the
+    background at boot and runs one dummy inference per reader, so the first
+    real image does not pay for lazy initialisation either.
+    """
+    STATES = ('not_loaded', 'loading', 'ready', 'failed')
+
+    def __init__(self, languages=None, readers=None, gpu=None):
+        self.languages = languages or [lang.strip() for lang in os.environ.get('OCR_LANGUAGES', 'vi,en').split(',') if lang.strip()]
+        self.size = readers if readers is not None else int(os.environ.get('OCR_READERS', 1))
+        self.gpu = gpu if gpu is not None else os.environ.get('OCR_GPU', 'false').lower() in ('1', 'true', 'yes')
+        self.pool = queue.Queue()
+        self.lock = threading.Lock()
+        self.state = 'not_loaded'
+        self.error = None
+        self.load_seconds = None
+        self.warmed_pid = None
+        self.warmup_pid = None
+        self.warmup_lock = threading.Lock()
+
+    @property
+    def ready(self):
+        return self.state == 'ready'
+
+    def start_warmup(self):
+        """Load and warm the readers in a background thread, once per process"""
+        with self.warmup_lock:
+            if self.warmup_pid == os.getpid():
+                return
+            self.warmup_pid = os.getpid()
+        threading.Thread(target=self.load, name='ocr-warmup', daemon=True).start()
+
+    def load(self, warm=True):
+        """Create (and warm) every reader; concurrent callers wait for the first one.
+
+        warm=False skips the dummy inference, for loading in a process that is
+        about to fork: inference starts torch's thread pools, which forked
+        children cannot use. A later load() in the child finds the readers
+        ready and only warms them.
+        """
+        with self.lock:
+            if self.state == 'ready':
+                if warm and self.warmed_pid != os.getpid():
+                    self.warm()
+                return True
+            self.state = 'loading'
+            started = time.monotonic()
+            try:
+                import easyocr
+                import numpy as np
+                blank = np.full((64, 256), 255, dtype=np.uint8)
+                # Pooled only once all of them loaded, so a failed load cannot leave strays behind
+                readers = []
+                for _ in range(self.size):
+                    reader = easyocr.Reader(self.languages, gpu=self.gpu)
+                    if warm:
+                        reader.readtext(blank)  # Warm up so the first request does not pay for lazy init
+                    readers.append(reader)
+                for reader in readers:
+                    self.pool.put(reader)
+                if warm:
+                    self.warmed_pid = os.getpid()
+            except Exception as e:
+                self.state, self.error = 'failed', str(e)
+                logger.error(f"Error loading OCR engine: {e}")
+                return False
+            self.state, self.error = 'ready', None
+            self.load_seconds = round(time.monotonic() - started, 2)
+        logger.info(f"OCR engine ready: {self.size} reader(s) for {self.languages} in {self.load_seconds}s")
+        return True
+
+    def warm(self):
+        """Run one dummy inference on every pooled reader in this process"""
+        started = time.monotonic()
+        readers = [self.pool.get() for _ in range(self.size)]
+        try:
+            import numpy as np
+            blank = np.full((64, 256), 255, dtype=np.uint8)
+            for reader in readers:
+                reader.readtext(blank)
+        except Exception as e:
+            logger.error(f"Error warming OCR engine: {e}")
+            return
+        finally:
+            for reader in readers:
+                self.pool.put(reader)
+        self.warmed_pid = os.getpid()
+        logger.info(f"OCR engine warmed in {round(time.monotonic() - started, 2)}s")
+
+    def readtext(self, image, **kwargs):
+        """Run `readtext` on a pooled reader, loading the pool first if needed"""
+        if not self.ready and not self.load():
+            raise RuntimeError(f"OCR engine unavailable: {self.error}")
+        reader = self.pool.get()
+        try:
+            return reader.readtext(image, **kwargs)
+        finally:
+            self.pool.put(reader)
+
+    def status(self):
+        return {
+            'state': self.state,
+            'readers': self.size,
+            'available': self.pool.qsize(),
+            'languages': self.languages,
+            'gpu': self.gpu,
+            'loadSeconds': self.load_seconds,
+            'error': self.error
+        }
@@ -0,0 +1,66 @@
+import os
+
+HEADER_FIELDS = ('name', 'dob', 'phone', 'appliedPosition')
+
+class ProgressiveOCR:
+    """OCR a form image top-down, region by region, until the wanted fields are found.
+
+    The header region (the top `header_fraction` of the image) is read
+    first, since that is where application forms keep the name, date of
+    birth, phone and applied position. Fields are extracted after every
+    region; the remaining bands are only read while one of `fields` is
+    still missing or below `threshold`. Neighbouring regions overlap a
+    little so that a line on a boundary is read whole by one of them;
+    detections are kept only by the region that owns their centre.
+
+    Fields outside `available` (those the caller cannot extract at all) are
+    not waited for.
+    """
+    def __init__(self, fields=None, threshold=None, header_fraction=None, bands=None, enabled=None, available=None):
+        configured = os.environ.get('OCR_HEADER_FIELDS')
+        fields = fields or ([field.strip() for field in configured.split(',') if field.strip()] if configured else HEADER_FIELDS)
+        self.fields = [field for field in fields if available is None or field in available]
+        self.threshold = threshold if threshold is not None else float(os.environ.get('OCR_EARLY_STOP_CONFIDENCE', 0.7))
+        self.header_fraction = header_fraction or float(os.environ.get('OCR_HEADER_FRACTION', 0.3))
+        self.bands = bands or int(os.environ.get('OCR_BANDS', 3))
+        self.enabled = enabled if enabled is not None else os.environ.get('OCR_PROGRESSIVE', 'true').lower() in ('1', 'true', 'yes')
+
+    def regions(self, height):
+        """(top, bottom) rows of the header region followed by the remaining bands"""
+        if not self.enabled:
+            return [(0, height)]
+        header = int(height * self.header_fraction)
+        step = (height - header) / self.bands
+        bounds = [0, header] + [int(header + step * band) for band in range(1, self.bands)] + [height]
+        return [(top, bottom) for top, bottom in zip(bounds, bounds[1:]) if bottom > top]
+
+    def run(self, image, readtext, extract_fields, min_confidence=0.0):
+        """OCR a 2-D/3-D image array; returns (text, fields, confidence, region stats).
+
+        `readtext` is an EasyOCR-style callable, `extract_fields(text)` returns
+        (fields, confidence) for the text read so far.
+        """
+        height = image.shape[0]
+        regions = self.regions(height)
+        overlap = max(16, height // 50)
+        lines = []
+        fields, confidence = {}, {}
+        rows_read = 0
+        read = 0
+        for top, bottom in regions:
+            start, end = max(0, top - overlap), min(height, bottom + overlap)
+            for box, text, score in readtext(image[start:end]):
+                centre = start + sum(point[1] for point in box) / len(box)
+                if top <= centre < bottom and score > min_confidence:
+                    lines.append(text)
+            rows_read += end - start
+            read += 1
+            fields, confidence = extract_fields(' '.join(lines))
+            if all(confidence.get(field, 0) >= self.threshold for field in self.fields):
+                break
+        stats = {
+            'read': read,
+            'total': len(regions),
+            'coverage': round(min(1.0, rows_read / height), 2) if height else 1.0
+        }
+        return ' '.join(lines), fields, confidence, stats
@@ -0,0 +1,116 @@
+import os
+import re
+import time
+import logging
+
+import regex
+
+# Optional: linear-time engine (pip install google-re2)
+try:
+    import re2
+except ImportError:
+    re2 = None
+
+logger = logging.getLogger(__name__)
+
+class RegexGuard:
+    """Execution layer for document-wide patterns.
+
+    Patterns are compiled once with the `regex` module, which accepts the
+    same syntax as `re` but can abandon a match after a timeout. In linear
+    mode, patterns that RE2 can compile run on RE2 instead and cannot
+    backtrack at all; the rest keep the timeout. RE2 treats \\s and \\b as
+    ASCII-only, which is why linear mode is opt-in.
+    """
+    ENGINES = ('backtracking', 'linear')
+
+    def __init__(self, pattern_budget=None, document_budget=None, engine=None):
+        self.pattern_budget = pattern_budget if pattern_budget is not None else int(os.environ.get('REGEX_PATTERN_BUDGET_MS', 250)) / 1000
+        self.document_budget = document_budget if document_budget is not None else int(os.environ.get('REGEX_DOCUMENT_BUDGET_MS', 2000)) / 1000
+        self.engine = engine or os.environ.get('REGEX_ENGINE', 'backtracking')
+        if self.engine not in self.ENGINES:
+            raise ValueError(f"Unknown regex engine: {self.engine}")
+        if self.engine == 'linear' and re2 is None:
+            logger.warning("REGEX_ENGINE=linear but google-re2 is not installed, using timeouts only")
+        self.compiled = {}
+
+    def compile(self, rule):
+        """Return (engine pattern, is linear) for a compiled `re` pattern"""
+        key = (rule.pattern, rule.flags)
+        if key not in self.compiled:
+            self.compiled[key] = self.compile_linear(rule) or (regex.compile(rule.pattern, rule.flags), False)
+        return self.compiled[key]
+
+    def compile_linear(self, rule):
+        if self.engine != 'linear' or re2 is None:
+            return None
+        inline = ''.join(letter for flag, letter in ((re.IGNORECASE, 'i'), (re.MULTILINE, 'm'), (re.DOTALL, 's')) if rule.flags & flag)
+        try:
+            return re2.compile(f'(?{inline}){rule.pattern}' if inline else rule.pattern), True
+        except Exception:
+            # Backreferences, lookarounds and the like are not supported by RE2
+            return None
+
+    def budget(self):
+        return RegexBudget(self)
+
+class RegexBudget:
+    """Time budget for extracting one document.
+
+    Each pattern gets at most `pattern_budget` seconds, capped by what is
+    left of `document_budget`. A pattern that runs out of time is abandoned
+    as if it had no further matches, so callers simply move on to their
+    next pattern; the event is logged and kept in `events`.
+    """
+    def __init__(self, guard):
+        self.guard = guard
+        self.deadline = time.monotonic() + guard.document_budget
+        self.events = []
+
+    def record(self, rule, reason, started):
+        event = {
+            'pattern': rule.pattern[:80],
+            'reason': reason,
+            'elapsedMs': round((time.monotonic() - started) * 1000, 1)
+        }
+        self.events.append(event)
+        logger.warning(f"Regex {reason}, skipping pattern: {event['pattern']}")
+
+    def finditer(self, rule, text, pos=0, endpos=None):
+        """Matches of `rule` like re.finditer, until the pattern or document runs out of time.
+
+        The engine's timeout only covers one search, so each search is given
+        what is left of the deadline and the clock is checked again between
+        matches, including the time the caller spends on each match.
+        """
+        started = time.monotonic()
+        pattern_deadline = started + self.guard.pattern_budget
+        if self.deadline <= started:
+            self.record(rule, 'document budget exhausted', started)
+            return
+        engine, linear = self.guard.compile(rule)
+        endpos = len(text) if endpos is None else endpos
+        while pos <= endpos:
+            now = time.monotonic()
+            if now >= self.deadline:
+                self.record(rule, 'document budget exhausted', started)
+                return
+            if now >= pattern_deadline:
+                self.record(rule, 'timed out', started)
+                return
+            try:
+                if linear:
+                    match = engine.search(text, pos, endpos)
+                else:
+                    match = engine.search(text, pos, endpos, timeout=min(pattern_deadline, self.deadline) - now)
+            except TimeoutError:
+                self.record(rule, 'timed out' if pattern_deadline <= self.deadline else 'document budget exhausted', started)
+                return
+            if match is None:
+                return
+            yield match
+            # An empty match would be found again at the same position
+            pos = match.end() if match.end() > match.start() else match.end() + 1
+
+    def search(self, rule, text, pos=0, endpos=None):
+        return next(self.finditer(rule, text, pos, endpos), None)
@@ -1,4 +1,5 @@
 #!/bin/bash
 echo "Starting minimal Flask app..."
 echo "PORT: ${PORT:-5000}"
-exec gunicorn app:app --bind 0.0.0.0:${PORT:-5000}
\ No newline at end of file
+# Preforking: create_app() runs once in the master, workers share its state (see gunicorn.conf.py)
+exec gunicorn 'app:create_app()' --config gunicorn.conf.py
\ No newline at end of file
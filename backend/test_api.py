@@ -79,6 +79,40 @@ def test_process_cv():
         if os.path.exists(test_file):
             os.remove(test_file)
 
+def test_process_cv_batch():
+    """Test batch CV processing with streamed NDJSON results"""
+    print("\n📚 Testing batch CV processing...")
+    
+    sample_pdf = os.path.join(TEST_FILES_DIR, "Phạm Yến Linh.pdf")
+    if not os.path.exists(sample_pdf):
+        print(f"⚠️  Sample PDF not found, skipping: {sample_pdf}")
+        return True
+    
+    try:
+        with open(sample_pdf, "rb") as f:
+            data = f.read()
+        files = [("files", (f"cv_{i}.pdf", data, "application/pdf")) for i in range(3)]
+        response = requests.post(f"{BASE_URL}/process-cv/batch", files=files, stream=True)
+        
+        if response.status_code != 200:
+            print(f"❌ Batch processing failed: {response.status_code}")
+            print(f"Response: {response.text}")
+            return False
+        
+        results = [json.loads(line) for line in response.iter_lines() if line]
+        for result in results:
+            print(f"  • {result['filename']}: {result.get('fields', {}).get('name') or result.get('error')}")
+        
+        if len(results) == len(files):
+            print(f"✅ Batch processing successful: {len(results)} results")
+            return True
+        print(f"❌ Expected {len(files)} results, got {len(results)}")
+        return False
+            
+    except Exception as e:
+        print(f"❌ Batch processing error: {e}")
+        return False
+
 def test_verify_field():
     """Test field verification"""
     print("\n✅ Testing field verification...")
@@ -152,6 +186,7 @@ def main():
     tests = [
         test_health,
         test_process_cv,
+        test_process_cv_batch,
         test_verify_field,
         test_save_cv
     ]
@@ -0,0 +1,83 @@
+"""Tests for /process-cv/batch intake: zip members get the checks of direct uploads"""
+import io
+import os
+import json
+import zipfile
+
+import pytest
+
+import app
+from ingest import IntakeRequest
+
+FIXTURE_PDF = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "Phạm Yến Linh.pdf")
+
+def zip_of(members):
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, 'w', zipfile.ZIP_DEFLATED) as archive:
+        for name, data in members:
+            archive.writestr(name, data)
+    buffer.seek(0)
+    return buffer
+
+def batch_lines(client, files):
+    response = client.post('/process-cv/batch', data={'files': files})
+    return response, sorted((json.loads(line) for line in response.get_data(as_text=True).splitlines()), key=lambda line: line['index'])
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(IntakeRequest, 'max_file_bytes', 1024 * 1024)
+    monkeypatch.setattr(app, 'BATCH_MAX_FILES', 5)
+    return app.app.test_client()
+
+def test_zip_members_are_size_and_magic_checked(client):
+    with open(FIXTURE_PDF, 'rb') as file:
+        pdf = file.read()
+    archive = zip_of([
+        ('ok.pdf', pdf),
+        ('text.pdf', b'not a pdf at all'),
+        ('huge.pdf', b'%PDF' + b'0' * (2 * 1024 * 1024)),
+        ('broken.docx', b'PK\x03\x04 not a word file'),
+        ('__MACOSX/ok.pdf', b''),
+        ('notes.txt', b'skipped')
+    ])
+    response, lines = batch_lines(client, (archive, 'forms.zip'))
+    assert response.status_code == 200
+    assert [line['filename'] for line in lines] == ['ok.pdf', 'text.pdf', 'huge.pdf', 'broken.docx']
+    assert lines[0]['fields']['name'] == 'PHẠM YẾN LINH'
+    assert lines[1]['error'] == 'File content is not PDF'
+    assert lines[2]['error'] == 'File is larger than 1 MB'
+    assert lines[3]['error'] == 'File is not a valid DOCX'
+
+def test_zip_with_too_many_members_is_rejected(client):
+    archive = zip_of([(f'{index}.pdf', b'%PDF-1.4') for index in range(6)])
+    response = client.post('/process-cv/batch', data={'files': (archive, 'forms.zip')})
+    assert response.status_code == 400
+    assert response.get_json()['error'] == 'Too many files, the limit is 5'
+
+def test_zip_unpacking_past_request_limit_is_rejected(client, monkeypatch):
+    monkeypatch.setitem(app.app.config, 'MAX_CONTENT_LENGTH', 2 * 1024 * 1024)
+    # Compresses to a few KB but unpacks to 3 MB
+    archive = zip_of([(f'{index}.pdf', b'%PDF' + b'0' * (1024 * 1024 - 4)) for index in range(3)])
+    response = client.post('/process-cv/batch', data={'files': (archive, 'forms.zip')})
+    assert response.status_code == 413
+
+def test_rejected_parts_get_their_own_lines(client):
+    with open(FIXTURE_PDF, 'rb') as file:
+        pdf = file.read()
+    files = [
+        (io.BytesIO(pdf), 'ok.pdf'),
+        (io.BytesIO(b'plain notes'), 'notes.txt'),
+        (io.BytesIO(b'<html>'), 'fake.pdf'),
+        (io.BytesIO(b'%PDF' + b'0' * (2 * 1024 * 1024)), 'huge.pdf'),
+        (io.BytesIO(b'not a zip'), 'forms.zip')
+    ]
+    response, lines = batch_lines(client, files)
+    assert response.status_code == 200
+    assert lines[0]['fields']['name'] == 'PHẠM YẾN LINH'
+    assert [line['error'] for line in lines[1:]] == [
+        'Unsupported file type', 'File content is not PDF', 'File is larger than 1 MB', 'File content is not ZIP'
+    ]
+
+def test_single_file_route_still_rejects_whole_request(client):
+    response = client.post('/process-cv', data={'file': (io.BytesIO(b'plain notes'), 'notes.txt')})
+    assert response.status_code == 415
@@ -0,0 +1,164 @@
+"""Regression tests for the rewritten extraction paths of app.py.
+
+The scanner, label windows and shadow text must return what the plain
+per-pattern search returned; inputs are the repository fixture and forms
+from form_corpus.py (PDF text with joined words, NFD and undiacritized
+variants).
+"""
+import io
+import os
+import re
+import unicodedata
+
+import pytest
+import PyPDF2
+
+import app
+import form_corpus
+
+FIXTURE_PDF = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "Phạm Yến Linh.pdf")
+
+def pdf_text(source):
+    return "".join(page.extract_text() + "\n" for page in PyPDF2.PdfReader(source).pages)
+
+def corpus_texts(count=24, seed=7):
+    texts = []
+    for index in range(1, count + 1):
+        _, data, _ = form_corpus.generate(index, seed, ('pdf',))
+        texts.append(pdf_text(io.BytesIO(data)))
+    return texts
+
+TEXTS = [pdf_text(FIXTURE_PDF)] + corpus_texts()
+
+@pytest.fixture(scope='module')
+def processor():
+    return app.SimpleCVProcessor()
+
+def test_fixture_pdf_fields(processor):
+    result = processor.process_cv(FIXTURE_PDF, 'pdf')
+    fields = result['fields']
+    assert fields['name'] == 'PHẠM YẾN LINH'
+    assert fields['dob'] == '23/11/2003'
+    assert fields['phone'] == '0382739389'
+    assert fields['email'] == 'phamlinh03.work@gmail.com'
+    assert fields['appliedPosition'] == 'Marketing'
+    assert result['confidence']['name'] > 0
+
+def test_early_stop_reads_only_needed_pages(processor, monkeypatch):
+    monkeypatch.setattr(processor, 'text_cache', app.LRUCache('off', 0))
+    monkeypatch.setattr(processor, 'field_cache', app.LRUCache('off', 0))
+    full = processor.process_cv(FIXTURE_PDF, 'pdf')
+    result = processor.process_cv(FIXTURE_PDF, 'pdf', ['name', 'email'])
+    assert result['pages'] == {'read': 1, 'total': 4}
+    assert (result['fields']['name'], result['fields']['email']) == (full['fields']['name'], full['fields']['email'])
+
+def test_early_stop_checks_each_page_window_once(processor, monkeypatch):
+    """Pending fields are looked for in the new page (plus the one before), not the whole text again"""
+    reader = PyPDF2.PdfReader(FIXTURE_PDF)
+    writer = PyPDF2.PdfWriter()
+    for _ in range(12):
+        writer.add_page(reader.pages[3])  # A page without name or email
+    buffer = io.BytesIO()
+    writer.write(buffer)
+    page_length = len(reader.pages[3].extract_text() + "\n")
+    calls = []
+    extract_fields = processor.extract_fields
+    def recording(text, budget=None, tables=None, wanted=None):
+        calls.append((len(text), wanted))
+        return extract_fields(text, budget, tables, wanted)
+    monkeypatch.setattr(processor, 'text_cache', app.LRUCache('off', 0))
+    monkeypatch.setattr(processor, 'extract_fields', recording)
+    result = processor.process_cv(buffer.getvalue(), 'pdf', ['name', 'email'])
+    assert result['pages'] == {'read': 12, 'total': 12}
+    windows, (final,) = calls[:-1], calls[-1:]
+    assert len(windows) == 12 and all(length <= 2 * page_length for length, _ in windows)
+    assert final == (12 * page_length, None)
+
+@pytest.mark.parametrize('text', TEXTS)
+def test_scanner_matches_per_pattern_search(processor, text):
+    """One anchored pass gives what trying every pattern over the whole text gave"""
+    normalized = unicodedata.normalize('NFC', text)
+    expected = {}
+    for field_name in processor.scanner.field_rules:
+        for pattern in processor.field_patterns[field_name]:
+            value = next((
+                app.match_value(match)
+                for match in re.finditer(pattern, normalized, re.IGNORECASE | re.MULTILINE)
+                if len(app.match_value(match)) > 1
+            ), None)
+            if value:
+                expected[field_name] = value
+                break
+    shadow = app.ShadowText(text, processor.label_index)
+    assert processor.scanner.scan(shadow, processor.regex_guard.budget()) == expected
+
+@pytest.mark.parametrize('text', TEXTS)
+def test_label_windows_do_not_change_results(processor, text, monkeypatch):
+    """Name and applied position come out the same when their patterns search the whole text"""
+    windowed = processor.extract_fields(text)[0]
+    monkeypatch.setattr(app.LabelOffsets, 'window', lambda self, opening, closing: (0, len(self.folded)))
+    unbounded = processor.extract_fields(text)[0]
+    assert (windowed['name'], windowed['appliedPosition']) == (unbounded['name'], unbounded['appliedPosition'])
+
+@pytest.mark.parametrize('text', TEXTS)
+def test_nfd_input_gives_nfc_results(processor, text):
+    assert processor.extract_fields(unicodedata.normalize('NFD', text)) == processor.extract_fields(text)
+
+@pytest.mark.parametrize('pattern, anchor', [
+    (r'(?:email|e-mail)\s*:?\s*(\S+)', (['email', 'e-mail'], 0)),
+    (r'([0-9]{1,2}\/[0-9]{4})', (['/'], 2)),
+    (r'([+]?(?:84|0)[1-9][0-9]{7,})', (['84', '0'], 1)),
+    (r'(?:^|\n|\s)(Đại\s*học)', (['dai'], 1)),
+    (r'([a-z0-9.]+@[a-z0-9.]+)', None),
+    (r'\b([0-9]{3,4}[\s\-]?[0-9]{3,4})', None)
+])
+def test_literal_anchors(pattern, anchor):
+    assert app.FieldScanner.literal_anchors(re.compile(pattern, re.IGNORECASE | re.MULTILINE)) == anchor
+
+def test_shadow_text_keeps_offsets():
+    letters = unicodedata.normalize('NFC', ''.join(chr(code) for code in range(0xC0, 0x1EFA) if chr(code).isalpha()))
+    text = f"Họ và tên (chữ in hoa) PHẠM YẾN LINH\nNgày sinh 23/11/2003 {letters} İſ"
+    shadow = app.ShadowText(text)
+    assert len(shadow.text) == len(shadow.original)
+    start = shadow.text.index('ngay sinh')
+    assert shadow.original[start:start + len('ngay sinh')] == 'Ngày sinh'
+    assert shadow.text.startswith('ho va ten (chu in hoa) pham yen linh')
+
+def docx_form(rows):
+    import docx
+    document = docx.Document()
+    table = document.add_table(rows=0, cols=4)
+    for cells in rows:
+        row = table.add_row().cells
+        for index, cell in enumerate(cells):
+            row[index].text = cell
+    document.add_paragraph("Ngày sinh 01/01/1990")  # Loose text the grid must win over
+    buffer = io.BytesIO()
+    document.save(buffer)
+    return buffer.getvalue()
+
+def test_docx_grid_reads_cells_next_to_and_below_labels(processor):
+    data = docx_form([
+        ['Mã số', 'Vị trí ứng tuyển', 'Nơi làm việc', ''],
+        ['', 'Marketing', 'Hội sở Hà Nội', ''],
+        ['Họ và tên (chữ in hoa)', 'NGUYỄN VĂN AN', '', ''],
+        ['Ngày sinh', '15/05/1995', 'Nơi sinh', 'HÀ NỘI'],
+        ['Điện thoại', '0987654321', 'Email', 'an.nguyen@example.com']
+    ])
+    result = processor.process_cv(data, 'docx')
+    fields, confidence = result['fields'], result['confidence']
+    assert fields['name'] == 'NGUYỄN VĂN AN'
+    assert fields['dob'] == '15/05/1995'
+    assert fields['phone'] == '0987654321'
+    assert fields['email'] == 'an.nguyen@example.com'
+    assert fields['appliedPosition'].startswith('Marketing')
+    assert confidence['dob'] == 0.9  # From the grid, not the loose paragraph
+
+@pytest.mark.parametrize('index', range(1, 13))
+def test_generated_docx_forms(processor, index):
+    _, data, truth = form_corpus.generate(index, 11, ('docx',))
+    fields = processor.process_cv(data, 'docx')['fields']
+    expected = truth['fields']
+    assert fields['dob'] == expected['dob']
+    assert fields['email'] == expected['email']
+    assert expected['name'].startswith(fields['name']) and fields['name']
@@ -0,0 +1,45 @@
+import pytest
+
+cv2 = pytest.importorskip('cv2')
+np = pytest.importorskip('numpy')
+
+from image_preprocess import ImagePreprocessor
+
+def form_image(angle, noise=20, seed=0):
+    """PNG of a text-lined page rotated by `angle` degrees, with Gaussian noise"""
+    image = np.full((1400, 1000), 255, np.uint8)
+    for line in range(25):
+        cv2.putText(image, "HO VA TEN NGUYEN VAN AN 0987654321"[:20 + line % 15], (60, 80 + line * 50), cv2.FONT_HERSHEY_SIMPLEX, 1.0, 0, 2)
+    image = cv2.warpAffine(image, cv2.getRotationMatrix2D((500, 700), angle, 1.0), (1000, 1400), borderValue=255)
+    image = np.clip(image + np.random.default_rng(seed).normal(0, noise, image.shape), 0, 255).astype(np.uint8)
+    return cv2.imencode('.png', image)[1].tobytes()
+
+def line_angle(gray):
+    """Rotation that makes the rows of `gray` sharpest, found by brute force"""
+    ink = (gray < 128).astype(np.uint8) * 255
+    height, width = ink.shape
+    def sharpness(angle):
+        rotated = cv2.warpAffine(ink, cv2.getRotationMatrix2D((width / 2, height / 2), angle, 1.0), (width, height))
+        return np.var(rotated.sum(axis=1))
+    return max(np.arange(-10, 10.01, 0.25), key=sharpness)
+
+@pytest.mark.parametrize('angle', [-6, -3, 3, 6])
+def test_deskew_levels_rotated_noisy_page(angle):
+    data = form_image(angle)
+    preprocessor = ImagePreprocessor()
+    assert abs(line_angle(preprocessor.decode(data))) >= abs(angle) - 0.5
+
+    image, timings = preprocessor.run(data)
+
+    assert abs(line_angle(image)) <= 0.5
+    assert set(timings) == {'decode', 'analyze', 'crop', 'downscale', 'deskew', 'threshold', 'total'}
+    assert all(value >= 0 for value in timings.values())
+
+def test_level_page_is_not_rotated():
+    preprocessor = ImagePreprocessor(stages=['deskew'])
+    assert preprocessor.skew_angle(cv2.bitwise_not(preprocessor.decode(form_image(0, noise=0)))) == 0.0
+
+def test_stages_can_be_switched_off():
+    image, timings = ImagePreprocessor(stages=[]).run(form_image(3))
+    assert image.shape == (1400, 1000)
+    assert set(timings) == {'decode', 'analyze', 'total'}
@@ -0,0 +1,68 @@
+"""Tests for job_queue.JobQueue: results, expiry and retries of jobs left by dead processes"""
+import time
+
+import pytest
+
+from job_queue import JobQueue
+
+def echo(filename, data, params):
+    return {'filename': filename, 'size': len(data)}
+
+def wait_for(condition, timeout=5):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        value = condition()
+        if value:
+            return value
+        time.sleep(0.02)
+    raise AssertionError("Condition not met in time")
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / 'jobs.sqlite3')
+
+def test_submitted_job_finishes_and_expires(path):
+    queue = JobQueue(path, {'echo': echo}, workers=1, ttl=0.5)
+    job_id = queue.submit('echo', b'12345', 'cv.pdf')
+    job = wait_for(lambda: (queue.get(job_id) or {}).get('status') == 'done' and queue.get(job_id))
+    assert job['result'] == {'filename': 'cv.pdf', 'size': 5}
+    assert queue.connect().execute('SELECT data FROM jobs WHERE id = ?', (job_id,)).fetchone()['data'] is None
+    time.sleep(0.6)
+    assert queue.get(job_id) is None
+    queue.purge()
+    assert queue.connect().execute('SELECT COUNT(*) FROM jobs').fetchone()[0] == 0
+
+def abandon(queue, times):
+    """Claim the oldest job `times` times without finishing it, as a process dying mid-job would"""
+    for _ in range(times):
+        assert queue.claim() is not None
+        time.sleep(queue.lease * 1.5)
+
+@pytest.mark.parametrize('deaths', range(JobQueue.MAX_ATTEMPTS))
+def test_job_of_a_dead_process_is_retried(path, deaths):
+    # No worker threads; claims below stand in for processes that die mid-job
+    queue = JobQueue(path, {'echo': echo}, workers=0, lease=0.1)
+    job_id = queue.submit('echo', b'12345', 'cv.pdf')
+    abandon(queue, deaths)
+    JobQueue(path, {'echo': echo}, workers=1, lease=0.1).start()
+    job = wait_for(lambda: (queue.get(job_id) or {}).get('status') == 'done' and queue.get(job_id))
+    assert job['result']['size'] == 5
+    assert queue.connect().execute('SELECT attempts FROM jobs WHERE id = ?', (job_id,)).fetchone()['attempts'] == deaths + 1
+
+def test_job_interrupted_max_attempts_times_fails(path):
+    queue = JobQueue(path, {'echo': echo}, workers=0, lease=0.1)
+    job_id = queue.submit('echo', b'12345', 'cv.pdf')
+    abandon(queue, JobQueue.MAX_ATTEMPTS)
+    JobQueue(path, {'echo': echo}, workers=1, lease=0.1).start()
+    job = wait_for(lambda: (queue.get(job_id) or {}).get('status') == 'failed' and queue.get(job_id))
+    assert job['error'] == 'Job was interrupted too many times'
+
+def test_running_job_keeps_its_lease(path):
+    def slow(filename, data, params):
+        time.sleep(0.5)
+        return {'runs': 1}
+    runs = []
+    queue = JobQueue(path, {'slow': lambda *args: runs.append(1) or slow(*args)}, workers=2, lease=0.15)
+    job_id = queue.submit('slow', b'', 'cv.pdf')
+    wait_for(lambda: (queue.get(job_id) or {}).get('status') == 'done')
+    assert runs == [1]
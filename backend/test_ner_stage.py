@@ -0,0 +1,16 @@
+"""Tests for the text windows ner_stage.NERStage sends to the model"""
+from ner_stage import NERStage
+
+def test_windows_cover_header_and_sections():
+    stage = NERStage(header_chars=10, window_chars=20, max_windows=3)
+    text = 'NGUYEN VAN' + '.' * 50 + 'Học vấn: Đại học Bách khoa' + '.' * 50
+    header, section = stage.window(text).split('\n\n')
+    assert header == 'NGUYEN VAN'
+    assert section.startswith('Học vấn: Đại học Bách khoa') and len(section) <= 40
+
+def test_merged_windows_stay_bounded():
+    stage = NERStage(header_chars=10, window_chars=20, max_windows=3)
+    # A label every 17 characters would otherwise merge into one window over the whole text
+    text = 'h' * 10 + ('trường ' + 'x' * 10) * 200
+    window = stage.window(text)
+    assert len(window) <= 10 + 3 * (2 * 20 + 2)
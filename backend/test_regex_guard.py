@@ -0,0 +1,45 @@
+"""Tests for the time budgets of regex_guard.RegexBudget"""
+import re
+import time
+
+from regex_guard import RegexGuard
+
+CATASTROPHIC = re.compile(r'(a|aa)+c')  # Exponential backtracking on a run of 'a' without 'c'
+EVERY_X = re.compile(r'x')
+
+def test_backtracking_pattern_times_out():
+    budget = RegexGuard(pattern_budget=0.05, document_budget=5).budget()
+    started = time.monotonic()
+    assert list(budget.finditer(CATASTROPHIC, 'a' * 40)) == []
+    assert time.monotonic() - started < 1
+    assert [event['reason'] for event in budget.events] == ['timed out']
+
+def test_pattern_budget_covers_time_between_matches():
+    budget = RegexGuard(pattern_budget=0.05, document_budget=5).budget()
+    matches = 0
+    for _ in budget.finditer(EVERY_X, 'x' * 100):
+        matches += 1
+        time.sleep(0.01)
+    assert 0 < matches < 100
+    assert [event['reason'] for event in budget.events] == ['timed out']
+
+def test_document_budget_stops_a_running_pattern_and_later_ones():
+    budget = RegexGuard(pattern_budget=5, document_budget=0.05).budget()
+    matches = 0
+    for _ in budget.finditer(EVERY_X, 'x' * 100):
+        matches += 1
+        time.sleep(0.01)
+    assert 0 < matches < 100
+    assert budget.search(EVERY_X, 'x') is None
+    assert [event['reason'] for event in budget.events] == ['document budget exhausted'] * 2
+
+def test_document_budget_cuts_a_backtracking_search_short():
+    budget = RegexGuard(pattern_budget=5, document_budget=0.05).budget()
+    assert budget.search(CATASTROPHIC, 'a' * 40) is None
+    assert [event['reason'] for event in budget.events] == ['document budget exhausted']
+
+def test_matches_and_bounds_follow_re():
+    budget = RegexGuard(pattern_budget=5, document_budget=5).budget()
+    rule = re.compile(r'\d*')
+    text = 'ab12c345d'
+    assert [match.span() for match in budget.finditer(rule, text, 1, 8)] == [match.span() for match in rule.finditer(text, 1, 8)]
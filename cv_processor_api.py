@@ -1,52 +1,86 @@
 from flask import Flask, request, jsonify, render_template
 from flask_cors import CORS
 import os
+import gc
 import tempfile
-from werkzeug.utils import secure_filename
+import re
 import json
+import time
+import threading
 from datetime import datetime
+from backend.job_queue import JobQueue
+from backend.ingest import SpoolingRequest, document_stream, spilled_path
+from backend.lazy_loader import LazyComponent
+from backend.ner_stage import NERStage, load_ner_model
+from backend.ocr_engine import OCREngine
+from backend.progressive_ocr import ProgressiveOCR
 
-# Import libraries for document processing
+# Import libraries for document processing; the heavy ones (spaCy, EasyOCR,
+# OpenCV, textract) are only imported when first needed, see below
 try:
     import python_docx2txt as docx2txt
     from PyPDF2 import PdfReader
-    import spacy
-    import re
-    from textract import process
-    import easyocr
-    import cv2
-    import numpy as np
+    from backend.ocr_cache import OCRCache
     ADVANCED_LIBS_AVAILABLE = True
 except ImportError:
     print("Advanced libraries not available. Install with: pip install -r requirements.txt")
     ADVANCED_LIBS_AVAILABLE = False
 
 app = Flask(__name__)
+app.request_class = SpoolingRequest  # Parse uploads from memory instead of saving them first
 CORS(app)  # Enable CORS for frontend access
 
 # Configuration
 app.config['MAX_CONTENT_LENGTH'] = 10 * 1024 * 1024  # 10MB max file size
-UPLOAD_FOLDER = 'uploads'
-os.makedirs(UPLOAD_FOLDER, exist_ok=True)
+UPLOAD_FOLDER = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'uploads')  # Created on first save
 
-# Initialize NLP model if available
-nlp = None
-if ADVANCED_LIBS_AVAILABLE:
+def load_nlp():
     try:
-        nlp = spacy.load("en_core_web_sm")
+        return load_ner_model(os.environ.get('SPACY_MODEL', 'en_core_web_sm'))
     except OSError:
         print("English model not found. Install with: python -m spacy download en_core_web_sm")
+        raise
 
-# Initialize OCR reader
-ocr_reader = None
-if ADVANCED_LIBS_AVAILABLE:
-    try:
-        ocr_reader = easyocr.Reader(['vi', 'en'])
-    except:
-        print("EasyOCR not available")
+def load_image_preprocessor():
+    from backend.image_preprocess import ImagePreprocessor
+    return ImagePreprocessor()
+
+def load_textract():
+    from textract import process
+    return process
+
+# Models and heavy libraries, loaded on first use so that importing this module
+# (e.g. from streamlit_app.py) and plain DOCX/PDF extraction stay fast
+nlp = LazyComponent('nlp', load_nlp)
+image_preprocessor = LazyComponent('imaging', load_image_preprocessor)
+textract = LazyComponent('textract', load_textract)
+ocr_engine = OCREngine()
+
+# Optional background warmup, e.g. MODEL_WARMUP=nlp,ocr,imaging
+components = {'nlp': nlp, 'ocr': ocr_engine, 'imaging': image_preprocessor, 'textract': textract}
+
+def configured_components(variable):
+    names = []
+    for component_name in filter(None, (name.strip() for name in os.environ.get(variable, '').split(','))):
+        if component_name in components:
+            names.append(component_name)
+        else:
+            print(f"Unknown {variable} component: {component_name}")
+    return names
+
+fork_hooks_registered = False
+
+def start_warmups():
+    for component_name in configured_components('MODEL_WARMUP'):
+        components[component_name].start_warmup()
+
+# Under gunicorn the master only imports; create_app() warms each worker after the fork
+if not os.environ.get('SERVER_SOFTWARE', '').startswith('gunicorn'):
+    start_warmups()
 
 class CVProcessor:
     def __init__(self):
+        self.ocr_cache = OCRCache() if ADVANCED_LIBS_AVAILABLE else None
         self.field_patterns = {
             'name': [
                 r'(?:họ\s+tên|tên|name)\s*:?\s*([A-ZÁÀẢÃẠĂẮẰẲẴẶÂẤẦẨẪẬĐÉÈẺẼẸÊẾỀỂỄỆÍÌỈĨỊÓÒỎÕỌÔỐỒỔỖỘƠỚỜỞỠỢÚÙỦŨỤƯỨỪỬỮỰÝỲỶỸỴ][a-záàảãạăắằẳẵặâấầẩẫậđéèẻẽẹêếềểễệíìỉĩịóòỏõọôốồổỗộơớờởỡợúùủũụưứừửữựýỳỷỹỵ\s]+)',
@@ -79,19 +113,39 @@ class CVProcessor:
             ]
         }
 
-    def extract_text_from_docx(self, file_path):
-        """Extract text from DOCX file using multiple methods"""
+        # NER only over the header and education windows
+        self.ner_stage = NERStage()
+
+        # Image path: OCR the form header first, the rest only for missing header fields
+        self.progressive_ocr = ProgressiveOCR(available=self.field_patterns)
+
+        # Cascade: regex first; NLP and an OCR re-read of scanned PDF pages only
+        # for fields still below the threshold
+        self.cascade_threshold = float(os.environ.get('CASCADE_CONFIDENCE_THRESHOLD', 0.75))
+        self.cascade_ocr_pages = int(os.environ.get('CASCADE_OCR_MAX_PAGES', 2))
+        # PDFs with more text than this (non-space characters) have a real text layer and are never OCRed
+        self.cascade_ocr_max_text = int(os.environ.get('CASCADE_OCR_MAX_TEXT_CHARS', 100))
+        self.nlp_fields = ('name',)
+        # By default the first request needing NLP waits for the model, so results do not
+        # depend on load timing; opt in to regex-only results (stage 'nlp-skipped') meanwhile
+        self.nlp_skip_while_loading = os.environ.get('NLP_SKIP_WHILE_LOADING', 'false').lower() in ('1', 'true', 'yes')
+
+    def extract_text_from_docx(self, source):
+        """Extract text from a DOCX path, bytes or stream using multiple methods"""
         try:
             if ADVANCED_LIBS_AVAILABLE:
-                # Method 1: python-docx2txt
-                text = docx2txt.process(file_path)
+                # Method 1: python-docx2txt, reading the zip straight from the buffer
+                with document_stream(source) as stream:
+                    text = docx2txt.process(stream)
                 if text.strip():
                     return text, 0.9
             
-            # Method 2: textract (fallback)
-            if ADVANCED_LIBS_AVAILABLE:
+            # Method 2: textract (fallback, needs a real file)
+            process = textract.get()
+            if process:
                 try:
-                    text = process(file_path).decode('utf-8')
+                    with spilled_path(source, '.docx') as file_path:
+                        text = process(file_path).decode('utf-8')
                     return text, 0.8
                 except:
                     pass
@@ -102,12 +156,12 @@ class CVProcessor:
         except Exception as e:
             return f"Error extracting DOCX: {str(e)}", 0.1
 
-    def extract_text_from_pdf(self, file_path):
-        """Extract text from PDF file using multiple methods"""
+    def extract_text_from_pdf(self, source):
+        """Extract text from a PDF path, bytes or stream using multiple methods"""
         try:
             if ADVANCED_LIBS_AVAILABLE:
                 # Method 1: PyPDF2
-                with open(file_path, 'rb') as file:
+                with document_stream(source) as file:
                     pdf_reader = PdfReader(file)
                     text = ""
                     for page in pdf_reader.pages:
@@ -116,10 +170,12 @@ class CVProcessor:
                     if text.strip():
                         return text, 0.8
             
-            # Method 2: textract (fallback)
-            if ADVANCED_LIBS_AVAILABLE:
+            # Method 2: textract (fallback, needs a real file)
+            process = textract.get()
+            if process:
                 try:
-                    text = process(file_path).decode('utf-8')
+                    with spilled_path(source, '.pdf') as file_path:
+                        text = process(file_path).decode('utf-8')
                     return text, 0.7
                 except:
                     pass
@@ -131,28 +187,38 @@ class CVProcessor:
 
     def extract_with_nlp(self, text):
         """Use NLP to extract entities"""
-        entities = {}
-        confidence = {}
-        
-        if nlp:
-            doc = nlp(text)
-            
-            # Extract person names
-            persons = [ent.text for ent in doc.ents if ent.label_ == "PERSON"]
-            if persons:
-                entities['name'] = persons[0]
-                confidence['name'] = 0.85
-            
-            # Extract organizations (could be schools/companies)
-            orgs = [ent.text for ent in doc.ents if ent.label_ == "ORG"]
-            if orgs:
-                entities['school'] = orgs[0] if 'university' in orgs[0].lower() or 'college' in orgs[0].lower() else None
-                entities['company'] = orgs[0] if not entities.get('school') else orgs[1] if len(orgs) > 1 else None
-        
-        return entities, confidence
+        model = nlp.get(wait=not self.nlp_skip_while_loading)
+        if not model:
+            return {}, {}
+        return self.ner_stage.entities(model, text)
+
+    def needs_stage(self, confidence, fields):
+        """Whether any of `fields` is still below the cascade threshold"""
+        return any(confidence.get(field, 0) < self.cascade_threshold for field in fields)
+
+    def extract_fields(self, text, stages=None):
+        """Extract all CV fields from text; the stages that ran are appended to `stages` if given"""
+        stages = stages if stages is not None else []
+        fields, confidence = self.extract_pattern_fields(text)
+        stages.append('regex')
+
+        # NLP only when the regex results are not good enough
+        if self.needs_stage(confidence, self.nlp_fields):
+            if nlp.get(wait=not self.nlp_skip_while_loading):
+                nlp_entities, nlp_confidence = self.extract_with_nlp(text)
+                for key, value in nlp_entities.items():
+                    if key in fields and (not fields[key] or nlp_confidence.get(key, 0) > confidence.get(key, 0)):
+                        fields[key] = value
+                        confidence[key] = nlp_confidence[key]
+                stages.append('nlp')
+            elif nlp.state != 'failed':
+                # Skipped while the model loads in the background (NLP_SKIP_WHILE_LOADING)
+                stages.append('nlp-skipped')
+
+        return self.finish_fields(fields, confidence)
 
-    def extract_fields(self, text):
-        """Extract all CV fields from text"""
+    def extract_pattern_fields(self, text):
+        """Regex pass over the text"""
         fields = {}
         confidence = {}
         
@@ -170,14 +236,9 @@ class CVProcessor:
                 confidence[field] = 0.0
                 fields[field] = ''
         
-        # Use NLP if available
-        if nlp:
-            nlp_entities, nlp_confidence = self.extract_with_nlp(text)
-            for key, value in nlp_entities.items():
-                if key in fields and (not fields[key] or nlp_confidence.get(key, 0) > confidence.get(key, 0)):
-                    fields[key] = value
-                    confidence[key] = nlp_confidence[key]
-        
+        return fields, confidence
+
+    def finish_fields(self, fields, confidence):
         # Post-processing and validation
         fields = self.validate_and_clean_fields(fields)
         
@@ -213,44 +274,192 @@ class CVProcessor:
         
         return fields
 
-    def process_image_ocr(self, image_path):
-        """Process image using OCR"""
-        if not ocr_reader:
+    def process_image_ocr(self, image_source, stats=None):
+        """Process an image path, bytes or stream using OCR.
+
+        The header region is read first and further regions only while a header
+        field is missing. Per-stage times (ms), the regions read and whether the
+        text came from the cache are added to `stats` if given.
+        """
+        preprocessor = image_preprocessor.get()
+        if not preprocessor or not (ocr_engine.ready or ocr_engine.load()):
             return "OCR not available", 0.1
         
         try:
-            # Read image
-            img = cv2.imread(image_path)
-            
-            # Preprocess image for better OCR
-            gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
-            gray = cv2.bilateralFilter(gray, 11, 17, 17)
-            
-            # OCR processing
-            results = ocr_reader.readtext(gray)
+            with document_stream(image_source) as stream:
+                data = stream.read()
+
+            # Repeated uploads of the same image skip OCR entirely
+            cache_key = self.ocr_cache.key(data)
+            cached = self.ocr_cache.get(cache_key)
+            if cached is not None:
+                if stats is not None:
+                    stats.update({'timings': {}, 'regions': cached['regions'], 'cached': True})
+                return cached['text'], 0.7
+
+            # Decode to grayscale, crop, downscale, deskew and binarize
+            image, timings = preprocessor.run(data)
             
-            # Combine text
-            text = ' '.join([result[1] for result in results if result[2] > 0.5])
+            # OCR processing, region by region; low-confidence detections are dropped.
+            # Only the regex pass decides when to stop; callers run the full cascade on the final text once.
+            started = time.perf_counter()
+            text, _, _, regions = self.progressive_ocr.run(image, ocr_engine.readtext, self.extract_pattern_fields, min_confidence=0.5)
+            timings['ocr'] = round((time.perf_counter() - started) * 1000, 2)
+            if stats is not None:
+                stats.update({'timings': timings, 'regions': regions, 'cached': False})
+            if text.strip():
+                self.ocr_cache.set(cache_key, {'text': text, 'regions': regions})
             
             return text, 0.7
             
         except Exception as e:
             return f"OCR Error: {str(e)}", 0.1
 
+    def pdf_page_images(self, source):
+        """Largest embedded image of each of the first pages of a PDF, as encoded bytes"""
+        images = []
+        with document_stream(source) as file:
+            for page in PdfReader(file).pages[:self.cascade_ocr_pages]:
+                try:
+                    page_images = page.images
+                except Exception:
+                    continue  # Unsupported image filter
+                if page_images:
+                    images.append(max(page_images, key=lambda image: len(image.data)).data)
+        return images
+
+    def is_scanned(self, text):
+        """Whether a PDF's extracted text is empty or nearly so, i.e. the pages are images"""
+        return len(''.join(text.split())) <= self.cascade_ocr_max_text
+
+    def reread_with_ocr(self, source, fields, confidence, stages=None):
+        """OCR the page images of a scanned PDF to fill fields the text layer missed.
+
+        `confidence` is already scaled by extraction quality; OCR values replace
+        a field only where their scaled confidence is higher. The OCR engine is
+        not loaded on the request path: until it is ready (MODEL_WARMUP or
+        MODEL_PRELOAD=ocr), it loads in the background and the re-read is
+        skipped, marked as 'ocr-skipped' in `stages`.
+        """
+        if not ocr_engine.ready:
+            ocr_engine.start_warmup()
+            if stages is not None:
+                stages.append('ocr-skipped')
+            return
+        images = self.pdf_page_images(source)
+        if not images:
+            return
+        if stages is not None:
+            stages.append('ocr')
+        for data in images:
+            text, extraction_confidence = self.process_image_ocr(data)
+            ocr_fields, ocr_confidence = self.extract_fields(text)
+            for key, value in ocr_fields.items():
+                score = ocr_confidence.get(key, 0) * extraction_confidence * 0.8  # OCR is less reliable
+                if value and score > confidence.get(key, 0):
+                    fields[key] = value
+                    confidence[key] = score
+            if not self.needs_stage(ocr_confidence, self.progressive_ocr.fields):
+                break
+
 # Initialize processor
 cv_processor = CVProcessor()
 
 @app.route('/health')
 def health_check():
-    """Health check endpoint"""
+    """Health check endpoint; components report not_loaded, loading, ready or failed"""
     return jsonify({
         'status': 'healthy',
         'advanced_libs': ADVANCED_LIBS_AVAILABLE,
-        'nlp': nlp is not None,
-        'ocr': ocr_reader is not None,
+        'nlp': nlp.ready,
+        'ocr': ocr_engine.ready,
+        'components': {name: component.status() for name, component in components.items()},
+        'ocr_cache': cv_processor.ocr_cache.stats() if cv_processor.ocr_cache else None,
         'timestamp': datetime.now().isoformat()
     })
 
+def process_document(source, filename):
+    """Extract fields from a DOCX/PDF upload given as bytes or a stream"""
+    # Extract text based on file type
+    if filename.lower().endswith('.docx'):
+        text, extraction_confidence = cv_processor.extract_text_from_docx(source)
+    elif filename.lower().endswith('.pdf'):
+        text, extraction_confidence = cv_processor.extract_text_from_pdf(source)
+    else:
+        return {'error': 'Unsupported file type'}
+    
+    # Extract fields: regex, then NLP for what is still missing
+    stages = []
+    fields, confidence = cv_processor.extract_fields(text, stages)
+    # Only scanned PDFs: OCRing the images of a text PDF (logos, photos) finds nothing the text layer lacks
+    reread = (
+        ADVANCED_LIBS_AVAILABLE and filename.lower().endswith('.pdf') and cv_processor.is_scanned(text)
+        and cv_processor.needs_stage(confidence, cv_processor.progressive_ocr.fields)
+    )
+    
+    # Adjust confidence based on extraction quality
+    for key in confidence:
+        confidence[key] *= extraction_confidence
+    
+    # Last resort for scanned PDFs: OCR the page images
+    if reread:
+        cv_processor.reread_with_ocr(source, fields, confidence, stages)
+    
+    return {
+        'fields': fields,
+        'confidence': confidence,
+        'rawContent': text[:2000] + ('...' if len(text) > 2000 else ''),
+        'extraction_method': 'python_advanced' if ADVANCED_LIBS_AVAILABLE else 'python_basic',
+        'stages': stages,
+        'processing_time': datetime.now().isoformat()
+    }
+
+def process_image_file(source):
+    """OCR an image upload given as bytes or a stream and extract fields"""
+    # Process with OCR
+    stats = {}
+    text, extraction_confidence = cv_processor.process_image_ocr(source, stats)
+    
+    # Extract fields
+    stages = ['ocr']
+    fields, confidence = cv_processor.extract_fields(text, stages)
+    
+    # Adjust confidence for OCR
+    for key in confidence:
+        confidence[key] *= extraction_confidence * 0.8  # OCR is less reliable
+    
+    return {
+        'fields': fields,
+        'confidence': confidence,
+        'rawContent': text[:2000] + ('...' if len(text) > 2000 else ''),
+        'extraction_method': 'ocr',
+        'stages': stages,
+        'timings': stats.get('timings', {}),
+        'ocrRegions': stats.get('regions'),
+        'ocrCached': stats.get('cached', False),
+        'processing_time': datetime.now().isoformat()
+    }
+
+# Slow OCR and large PDFs can be queued instead of holding a request open.
+# The queue database is opened by create_app() or the first /jobs request, not at import.
+job_queue = None
+job_queue_lock = threading.Lock()
+
+def get_job_queue():
+    global job_queue
+    with job_queue_lock:
+        if job_queue is None:
+            path = os.path.abspath(os.environ.get('JOB_DB_PATH', os.path.join(UPLOAD_FOLDER, 'jobs.sqlite3')))
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            job_queue = JobQueue(path, {
+                'process-cv': lambda filename, data, params: process_document(data, filename),
+                'process-image': lambda filename, data, params: process_image_file(data)
+            })
+        return job_queue
+
+def start_job_workers():
+    get_job_queue().start()
+
 @app.route('/process-cv', methods=['POST'])
 def process_cv():
     """Process CV file (DOCX/PDF)"""
@@ -261,44 +470,15 @@ def process_cv():
     if file.filename == '':
         return jsonify({'error': 'No file selected'}), 400
     
-    # Save uploaded file
-    filename = secure_filename(file.filename)
-    file_path = os.path.join(UPLOAD_FOLDER, filename)
-    file.save(file_path)
-    
     try:
-        # Extract text based on file type
-        if filename.lower().endswith('.docx'):
-            text, extraction_confidence = cv_processor.extract_text_from_docx(file_path)
-        elif filename.lower().endswith('.pdf'):
-            text, extraction_confidence = cv_processor.extract_text_from_pdf(file_path)
-        else:
-            return jsonify({'error': 'Unsupported file type'}), 400
-        
-        # Extract fields
-        fields, confidence = cv_processor.extract_fields(text)
-        
-        # Adjust confidence based on extraction quality
-        for key in confidence:
-            confidence[key] *= extraction_confidence
-        
-        result = {
-            'fields': fields,
-            'confidence': confidence,
-            'rawContent': text[:2000] + ('...' if len(text) > 2000 else ''),
-            'extraction_method': 'python_advanced' if ADVANCED_LIBS_AVAILABLE else 'python_basic',
-            'processing_time': datetime.now().isoformat()
-        }
+        result = process_document(file.stream, file.filename)
+        if 'error' in result:
+            return jsonify(result), 400
         
         return jsonify(result)
         
     except Exception as e:
         return jsonify({'error': f'Processing failed: {str(e)}'}), 500
-    
-    finally:
-        # Clean up uploaded file
-        if os.path.exists(file_path):
-            os.remove(file_path)
 
 @app.route('/process-image', methods=['POST'])
 def process_image():
@@ -308,39 +488,45 @@ def process_image():
     
     file = request.files['image']
     
-    # Save uploaded image
-    filename = secure_filename(f"image_{datetime.now().strftime('%Y%m%d_%H%M%S')}.jpg")
-    file_path = os.path.join(UPLOAD_FOLDER, filename)
-    file.save(file_path)
-    
     try:
-        # Process with OCR
-        text, extraction_confidence = cv_processor.process_image_ocr(file_path)
-        
-        # Extract fields
-        fields, confidence = cv_processor.extract_fields(text)
-        
-        # Adjust confidence for OCR
-        for key in confidence:
-            confidence[key] *= extraction_confidence * 0.8  # OCR is less reliable
-        
-        result = {
-            'fields': fields,
-            'confidence': confidence,
-            'rawContent': text[:2000] + ('...' if len(text) > 2000 else ''),
-            'extraction_method': 'ocr',
-            'processing_time': datetime.now().isoformat()
-        }
-        
-        return jsonify(result)
+        return jsonify(process_image_file(file.stream))
         
     except Exception as e:
         return jsonify({'error': f'OCR processing failed: {str(e)}'}), 500
+
+@app.route('/jobs/process-cv', methods=['POST'])
+@app.route('/jobs/process-image', methods=['POST'])
+def submit_job():
+    """Queue a CV or image for background processing; poll /jobs/<id> for the result"""
+    kind = request.path.rsplit('/', 1)[-1]
+    field = 'image' if kind == 'process-image' else 'file'
+    if field not in request.files:
+        return jsonify({'error': f'No {field} provided'}), 400
     
-    finally:
-        # Clean up uploaded file
-        if os.path.exists(file_path):
-            os.remove(file_path)
+    file = request.files[field]
+    if file.filename == '':
+        return jsonify({'error': f'No {field} selected'}), 400
+    if kind == 'process-cv' and not file.filename.lower().endswith(('.docx', '.pdf')):
+        return jsonify({'error': 'Unsupported file type'}), 400
+    
+    try:
+        job_id = get_job_queue().submit(kind, file.read(), file.filename)
+        return jsonify({
+            'jobId': job_id,
+            'status': 'queued',
+            'statusUrl': f'/jobs/{job_id}'
+        }), 202
+        
+    except Exception as e:
+        return jsonify({'error': f'Queueing failed: {str(e)}'}), 500
+
+@app.route('/jobs/<job_id>', methods=['GET'])
+def get_job(job_id):
+    """Status of a queued job, with the result once it has finished"""
+    job = get_job_queue().get(job_id)
+    if job is None:
+        return jsonify({'error': 'Job not found or expired'}), 404
+    return jsonify(job)
 
 @app.route('/verify-field', methods=['POST'])
 def verify_field():
@@ -388,6 +574,7 @@ def save_cv():
     filepath = os.path.join(UPLOAD_FOLDER, filename)
     
     try:
+        os.makedirs(UPLOAD_FOLDER, exist_ok=True)
         with open(filepath, 'w', encoding='utf-8') as f:
             json.dump(data, f, ensure_ascii=False, indent=2)
         
@@ -405,11 +592,34 @@ def index():
     """Serve the Python version HTML"""
     return app.send_static_file('python_version.html')
 
+def create_app():
+    """App factory for preforking servers: gunicorn -c backend/gunicorn.conf.py 'cv_processor_api:create_app()'
+
+    Runs once in the master. Components listed in MODEL_PRELOAD are loaded
+    here so their read-only weights are shared copy-on-write by all workers.
+    MODEL_WARMUP components warm up, and the job workers start, in each
+    worker after the fork (needs preload_app, as set in gunicorn.conf.py);
+    outside gunicorn the job workers start right away.
+    """
+    for component_name in configured_components('MODEL_PRELOAD'):
+        component = components[component_name]
+        # No dummy OCR inference before forking; see OCREngine.load
+        component.load(warm=False) if component is ocr_engine else component.load()
+    gc.freeze()
+    global fork_hooks_registered
+    if not fork_hooks_registered:
+        os.register_at_fork(after_in_child=start_warmups)
+        os.register_at_fork(after_in_child=start_job_workers)
+        fork_hooks_registered = True
+    if not os.environ.get('SERVER_SOFTWARE', '').startswith('gunicorn'):
+        start_job_workers()
+    return app
+
 if __name__ == '__main__':
     print("🐍 Python CV Processor Server Starting...")
     print("📚 Advanced libraries available:", ADVANCED_LIBS_AVAILABLE)
-    print("🤖 NLP model loaded:", nlp is not None)
-    print("👁️ OCR available:", ocr_reader is not None)
+    print("🤖 NLP model: loaded on first use (MODEL_WARMUP=nlp,ocr to preload)")
+    print("👁️ OCR: loaded on first image")
     print("🌐 Server URL: http://localhost:5000")
     print("🏥 Health check: http://localhost:5000/health")
     
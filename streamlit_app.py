@@ -117,16 +117,11 @@ with col1:
         if st.button("🚀 Xử lý CV", type="primary"):
             with st.spinner("Đang xử lý CV với Python AI..."):
                 try:
-                    # Save uploaded file temporarily
-                    with tempfile.NamedTemporaryFile(delete=False, suffix=f".{uploaded_file.name.split('.')[-1]}") as tmp_file:
-                        tmp_file.write(uploaded_file.getvalue())
-                        tmp_file_path = tmp_file.name
-                    
-                    # Extract text
+                    # Extract text straight from the in-memory upload
                     if uploaded_file.name.lower().endswith('.docx'):
-                        text, extraction_confidence = cv_processor.extract_text_from_docx(tmp_file_path)
+                        text, extraction_confidence = cv_processor.extract_text_from_docx(uploaded_file)
                     elif uploaded_file.name.lower().endswith('.pdf'):
-                        text, extraction_confidence = cv_processor.extract_text_from_pdf(tmp_file_path)
+                        text, extraction_confidence = cv_processor.extract_text_from_pdf(uploaded_file)
                     
                     # Extract fields
                     fields, confidence = cv_processor.extract_fields(text)
@@ -147,9 +142,6 @@ with col1:
                     
                     st.session_state.processed_count += 1
                     
-                    # Clean up
-                    os.unlink(tmp_file_path)
-                    
                     st.success(f"✅ Xử lý thành công! Độ tin cậy: {extraction_confidence:.1%}")
                     
                 except Exception as e: